@@ -2,7 +2,8 @@ extends RefCounted
 class_name MusicLibrary
 
 ## Pre-defined procedural melodies for each MusicTrack.
-## Uses ToneGenerator to create AudioStreamWAV tracks.
+## Uses ToneGenerator to create AudioStreamWAV tracks, unless tools/bake_audio.py
+## has baked them to BAKED_DIR.
 
 # Note frequency constants (octave 4 & 5)
 const C4 := 261.63; const D4 := 293.66; const E4 := 329.63; const F4 := 349.23
@@ -13,16 +14,31 @@ const C3 := 130.81; const E3 := 164.81; const G3 := 196.00; const A3 := 220.00
 const B3 := 246.94; const D3 := 146.83; const F3 := 174.61
 const REST := 0.0
 
+# Baked WAVs, named after AudioManager.MusicTrack
+const BAKED_DIR := "res://assets/audio/music/"
+const BAKED_NAMES := ["menu", "overworld", "battle", "trainer_battle", "victory",
+	"evolution", "shop", "champion"]
+
 # Cache generated tracks
 static var _cache: Dictionary = {}
 
 static func get_track(track_id: int) -> AudioStreamWAV:
 	if _cache.has(track_id):
 		return _cache[track_id]
-	var stream: AudioStreamWAV = _generate_track(track_id)
+	var stream: AudioStreamWAV = _load_baked(track_id)
+	if not stream:
+		stream = _generate_track(track_id)
 	_cache[track_id] = stream
 	return stream
 
+static func _load_baked(track_id: int) -> AudioStreamWAV:
+	if track_id < 0 or track_id >= BAKED_NAMES.size():
+		return null
+	var path: String = BAKED_DIR + BAKED_NAMES[track_id] + ".wav"
+	if not ResourceLoader.exists(path):
+		return null
+	return load(path) as AudioStreamWAV
+
 static func _generate_track(track_id: int) -> AudioStreamWAV:
 	match track_id:
 		0:  # MENU
@@ -2,7 +2,19 @@ extends RefCounted
 class_name SfxLibrary
 
 ## Pre-defined SFX using ToneGenerator. Short procedural sound effects
-## for UI, battle, overworld, and item interactions.
+## for UI, battle, overworld, and item interactions. Loaded from BAKED_DIR
+## instead when tools/bake_audio.py has baked them.
+
+# Baked WAVs, named after AudioManager.SFX
+const BAKED_DIR := "res://assets/audio/sfx/"
+const BAKED_NAMES := [
+	"button_click", "menu_open", "menu_close",
+	"attack_hit", "super_effective", "not_effective", "miss", "faint",
+	"step", "portal_enter", "npc_interact",
+	"use_potion", "ball_throw", "capture_success", "capture_fail",
+	"evolve_sparkle", "evolve_complete", "level_up", "badge_earn",
+	"trade_offer", "trade_complete", "pvp_win", "pvp_lose",
+]
 
 # Cache generated SFX
 static var _cache: Dictionary = {}
@@ -10,10 +22,20 @@ static var _cache: Dictionary = {}
 static func get_sfx(sfx_id: int) -> AudioStreamWAV:
 	if _cache.has(sfx_id):
 		return _cache[sfx_id]
-	var stream: AudioStreamWAV = _generate_sfx(sfx_id)
+	var stream: AudioStreamWAV = _load_baked(sfx_id)
+	if not stream:
+		stream = _generate_sfx(sfx_id)
 	_cache[sfx_id] = stream
 	return stream
 
+static func _load_baked(sfx_id: int) -> AudioStreamWAV:
+	if sfx_id < 0 or sfx_id >= BAKED_NAMES.size():
+		return null
+	var path: String = BAKED_DIR + BAKED_NAMES[sfx_id] + ".wav"
+	if not ResourceLoader.exists(path):
+		return null
+	return load(path) as AudioStreamWAV
+
 static func _generate_sfx(sfx_id: int) -> AudioStreamWAV:
 	match sfx_id:
 		0:   return _button_click()
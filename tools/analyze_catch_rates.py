@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""Expected throws, gold and time to complete each zone's dex, per ball.
+
+Zones come from scripts/world/zones/*.gd and the Starter Meadow of
+overworld.gd (name, level range, species list), balls from the CAPTURE_BALL
+items. Every encounter is a uniform pick from the zone's species list, as
+the spawners' randi() % size, and player_catch succeeds with
+
+    clamp(capture_rate * catch_multiplier * (1 + (1 - hp_ratio) * 1.5), 0.05, 0.99)
+
+Two strategies are reported:
+  full_hp   throw from the first round until it sticks.
+  weaken    attack with the strongest move that cannot knock the enemy out
+            until its HP is at or below --weaken-to, then throw.
+Every failed throw hands the enemy a turn, and the HP path depends on
+damage rolls, statuses and the enemy's moves, so both strategies are
+simulated in the same NumPy batches with simulate_battles' turn rules;
+encounters can be lost to a DoT knockout or a fainted attacker. Only a ball
+that always catches is taken in closed form (one throw, no enemy turn).
+
+Dex completion combines the per-species expectations: an uncaught species
+is engaged until caught (throws / P(caught) per engagement, by Wald) and
+encounters with caught species are skipped, which gives the coupon-collector
+encounter count by inclusion-exclusion. Time sums the battle_manager _delay
+calls at battle speed 1 plus --walk-seconds per encounter. Gold is ball
+cost less the prize for wild creatures that faint.
+
+Results are written to build/balance/catch_rates.json and keyed by a hash
+of the game data, the model code and the parameters, so a rerun on
+unchanged data only reads the report back.
+
+  python3 tools/analyze_catch_rates.py
+  python3 tools/analyze_catch_rates.py --attacker Aquafin --weaken-to 0.25 --trials 5000
+"""
+
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import numpy as np
+import os
+import re
+import sys
+import time
+
+import simulate_battles as sim
+from asset_cache import ROOT, BuildCache, fingerprint
+from tres_loader import load_database, source_files
+
+OUT_PATH = os.path.join(ROOT, "build", "balance", "catch_rates.json")
+SCRIPTS_DIR = os.path.join(ROOT, "scripts")
+ZONE_SCRIPTS = os.path.join(SCRIPTS_DIR, "world", "zones", "*.gd")
+OVERWORLD = os.path.join(SCRIPTS_DIR, "world", "overworld.gd")
+DATA_SCRIPTS = [os.path.join(SCRIPTS_DIR, *parts) for parts in (
+    ("world", "overworld.gd"), ("world", "zone_base.gd"), ("world", "weather_system.gd"),
+    ("creatures", "wild_creature.gd"), ("battle", "battle_manager.gd"))]
+TRIALS = 2000
+WEAKEN_TO = 0.3
+WALK_SECONDS = 10.0
+MAX_ROUNDS = 60
+ATTACKER = "Flamepup"  # PartyManager.give_starter(species_list[0], 5)
+CAUGHT = 3  # result code next to simulate_battles' WIN and LOSE
+
+# battle_manager.gd _delay() seconds at battle_speed 1.0
+START_SECONDS = 1.2        # "A wild ... appeared!"
+THROW_SECONDS = 1.0        # "You threw a ...!"
+BROKE_FREE_SECONDS = 1.0   # "It broke free!"
+CAUGHT_SECONDS = 0.8 + 1.5
+ATTACK_SECONDS = 1.0       # player_fight after _execute_attack
+ENEMY_TURN_SECONDS = 1.0
+WIN_SECONDS = 1.0 + 1.5    # _award_exp_and_gold
+LOSE_SECONDS = 1.5
+
+
+# ── Game data ──
+
+class Zone:
+    """One wild area: level range, species list (res:// paths, repeats
+    weight the pick) and WeatherSystem.ZONE_WEATHER entry."""
+
+    def __init__(self, key, name, level_min, level_max, species, weather="clear", weather_chance=0.0):
+        self.key = key
+        self.name = name
+        self.level_min = level_min
+        self.level_max = level_max
+        self.species = species
+        self.weather = weather
+        self.weather_chance = weather_chance
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def _export_default(text, name):
+    return int(re.search(rf"@export var {name}\s*(?::\s*\w+\s*)?:?=\s*(\d+)", text).group(1))
+
+
+def _species_block(text, var, named=None):
+    """res:// paths of an `var = [load(...), list[i], ...]` array literal."""
+    body = re.search(rf"\b{var}\s*=\s*\[(.*?)\]\s*$", text, re.S | re.M).group(1)
+    paths = []
+    for path, list_name, index in re.findall(r'load\("([^"]+)"\)|(\w+)\[(\d+)\]', body):
+        paths.append(path or named[list_name][int(index)])
+    return paths
+
+
+def zone_weather():
+    """Zone name -> (weather name, chance) from WeatherSystem.ZONE_WEATHER."""
+    text = _read(os.path.join(SCRIPTS_DIR, "world", "weather_system.gd"))
+    return {name: (weather.lower(), float(chance)) for name, weather, chance in re.findall(
+        r'"([^"]+)":\s*\{weather = WeatherType\.(\w+), chance = ([\d.]+)\}', text)}
+
+
+def wild_zones():
+    """The Starter Meadow, then every zone script with wild species, in file order."""
+    weather = zone_weather()
+    wild = _read(os.path.join(SCRIPTS_DIR, "creatures", "wild_creature.gd"))
+    overworld = _read(OVERWORLD)
+    species_list = _species_block(overworld, "species_list")
+    # The meadow sets clear weather and leaves the wild_creature level defaults
+    zones = [Zone("overworld", "Starter Meadow", _export_default(wild, "level_min"),
+                  _export_default(wild, "level_max"),
+                  _species_block(overworld, "meadow_species", {"species_list": species_list}))]
+    base = _read(os.path.join(SCRIPTS_DIR, "world", "zone_base.gd"))
+    for path in sorted(glob.glob(ZONE_SCRIPTS)):
+        text = _read(path)
+        body = re.search(r"func _get_zone_species\(\).*?(?=^func |\Z)", text, re.S | re.M).group(0)
+        species = re.findall(r'load\("(res://resources/creatures/[^"]+)"\)', body)
+        if not species:
+            continue  # trainer-only zones such as the Champion Arena
+        init = re.search(r"func _init\(\).*?(?=^func )", text, re.S | re.M).group(0)
+        levels = [int(m.group(1)) if m else _export_default(base, key)
+                  for key in ("level_min", "level_max")
+                  for m in [re.search(rf"\b{key} = (\d+)", init)]]
+        name = re.search(r'zone_name = "([^"]+)"', init).group(1)
+        zones.append(Zone(os.path.splitext(os.path.basename(path))[0], name, *levels, species,
+                          *weather.get(name, ("clear", 0.0))))
+    return zones
+
+
+def capture_balls(db):
+    """(name, catch_multiplier, price) for every CAPTURE_BALL item, weakest first."""
+    kind = db.enums["ItemData"]["ItemType"]["CAPTURE_BALL"]
+    balls = [(item.item_name, item.catch_multiplier, item.price)
+             for item in db.items if item.item_type == kind]
+    return sorted(balls, key=lambda ball: ball[1])
+
+
+def data_hash(paths=None):
+    """SHA-256 over every resource and the scripts the analysis reads."""
+    h = hashlib.sha256()
+    for path in paths or source_files() + sorted(glob.glob(ZONE_SCRIPTS)) + DATA_SCRIPTS:
+        h.update(os.path.relpath(path, ROOT).encode() + b"\0")
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+# ── Per-encounter expectations ──
+
+def catch_chance(capture_rate, multiplier, hp_ratio):
+    chance = np.clip(capture_rate * multiplier * (1.0 + (1.0 - hp_ratio) * 1.5), 0.05, 0.99)
+    return np.where(multiplier >= 100.0, 1.0, chance)
+
+
+def certain_encounter(price):
+    """Closed-form engagement with a ball that always catches: one throw,
+    no enemy turn, whatever the strategy."""
+    return {"caught": 1.0, "fainted": 0.0, "lost": 0.0, "throws": 1.0,
+            "gold": float(price), "seconds": START_SECONDS + THROW_SECONDS + CAUGHT_SECONDS}
+
+
+def safe_attack(b, t, multipliers):
+    """Per row, the player's attack with the highest expected damage whose
+    largest roll still leaves the enemy standing, or -1 if there is none."""
+    n = len(b.result)
+    best, best_damage = np.full(n, -1), np.zeros(n)
+    attack, defense = b.attack(0), b.defense(1)
+    for slot in range(b.moves.shape[2]):
+        skill = b.moves[0, :, slot]
+        usable = ((slot < b.move_count[0]) & (t.category[skill] == sim.ATTACK)
+                  & ~t.is_protect[skill] & ~t.ends_wild_battle[skill])
+        element = t.element[skill]
+        base = (t.power[skill] * (attack / defense) * sim.TYPE_CHART[element, b.element[1]]
+                * multipliers[element] * 0.5)
+        highest = np.maximum(1, np.trunc(base * 1.15))
+        expected = base * t.accuracy[skill]
+        better = usable & (highest < b.hp[1]) & (expected > best_damage)
+        best = np.where(better, skill, best)
+        best_damage = np.where(better, expected, best_damage)
+    return best
+
+
+def simulate_weaken(t, attacker, species, levels, capture_rate, multiplier, rng, weather="clear",
+                    weaken_to=WEAKEN_TO, max_rounds=MAX_ROUNDS):
+    """Play n weaken-then-throw encounters of the attacker (species, level)
+    against (n,) wild species / levels. Returns (result, throws, attacks,
+    enemy turns) per row; result is CAUGHT, WIN (the enemy fainted), LOSE
+    or 0 when --max-rounds ran out."""
+    b = sim.Battles(t, np.stack([np.full(len(species), attacker[0]), species], 1),
+                    np.stack([np.full(len(species), attacker[1]), levels], 1))
+    multipliers = np.array(sim.WEATHER[weather])
+    n = len(species)
+    throws, attacks, enemy_turns = (np.zeros(n, dtype=np.int64) for _ in range(3))
+    for _ in range(max_rounds):
+        live = b.result == 0
+        if not live.any():
+            break
+        skill = safe_attack(b, t, multipliers)
+        hp_ratio = b.hp[1] / b.max_hp[1]
+
+        # player_catch: a miss goes straight to _enemy_turn
+        throw = live & ((hp_ratio <= weaken_to) | (skill < 0))
+        throws += throw
+        caught = throw & (rng.random(n) <= catch_chance(capture_rate, multiplier, hp_ratio))
+        b.result[caught] = CAUGHT
+        missed = throw & ~caught
+
+        # player_fight, then _check_battle(true) as in simulate_battles.play_round
+        fight = live & ~throw
+        attacks += fight
+        acting = sim.can_act(b, fight, 0, rng)
+        sim.execute_attack(b, t, acting, 0, 1, np.maximum(skill, 0), multipliers, rng)
+        b.result[acting & (b.hp[1] <= 0)] = sim.WIN
+        dot = acting & (b.result == 0)
+        sim.process_status_dot(b, dot, 0)
+        b.result[dot & (b.hp[0] <= 0)] = sim.LOSE
+        b.protecting[0] &= ~(dot & (b.result == 0))
+
+        enemy = (missed | fight) & (b.result == 0)
+        enemy_turns += enemy
+        sim.enemy_turn(b, t, enemy, multipliers, rng)
+    return b.result, throws, attacks, enemy_turns
+
+
+def simulate_encounters(t, db, zone, balls, attacker, trials, rng, weaken_to, max_rounds):
+    """{(species path, ball name): expectations} for one zone, one batch per
+    weather the zone can roll. weaken_to=1.0 throws from the first round,
+    which is the full_hp strategy."""
+    paths = sorted(set(zone.species))
+    index = {path: i for i, path in enumerate(t.species_paths)}
+    rates = {path: db.get(path).capture_rate for path in paths}
+    rows = np.arange(len(paths) * len(balls) * trials)
+    species_row, ball_row = rows // (len(balls) * trials), rows // trials % len(balls)
+    multiplier = np.array([ball[1] for ball in balls])[ball_row]
+    price = np.array([ball[2] for ball in balls])[ball_row]
+    levels = rng.integers(zone.level_min, zone.level_max + 1, len(rows))
+    weathers = np.where(rng.random(len(rows)) < zone.weather_chance, 1, 0)
+
+    result = np.zeros(len(rows), dtype=np.int8)
+    throws, attacks, enemy_turns = (np.zeros(len(rows), dtype=np.int64) for _ in range(3))
+    for code, weather in enumerate(("clear", zone.weather)):
+        mask = weathers == code
+        if not mask.any():
+            continue
+        species = np.array([index[path] for path in paths])[species_row[mask]]
+        capture_rate = np.array([rates[path] for path in paths])[species_row[mask]]
+        out = simulate_weaken(t, attacker, species, levels[mask], capture_rate, multiplier[mask],
+                              rng, weather, weaken_to, max_rounds)
+        result[mask], throws[mask], attacks[mask], enemy_turns[mask] = out
+
+    caught, won, lost = result == CAUGHT, result == sim.WIN, result == sim.LOSE
+    seconds = (START_SECONDS + throws * THROW_SECONDS + (throws - caught) * BROKE_FREE_SECONDS
+               + attacks * ATTACK_SECONDS + enemy_turns * ENEMY_TURN_SECONDS
+               + caught * CAUGHT_SECONDS + won * WIN_SECONDS + lost * LOSE_SECONDS)
+    gold = throws * price - won * (10 + levels * 5)
+    out = {}
+    for s, path in enumerate(paths):
+        for k, ball in enumerate(balls):
+            sel = (species_row == s) & (ball_row == k)
+            out[path, ball[0]] = {"caught": float(caught[sel].mean()),
+                                  "fainted": float(won[sel].mean()), "lost": float(lost[sel].mean()),
+                                  "throws": float(throws[sel].mean()), "gold": float(gold[sel].mean()),
+                                  "seconds": float(seconds[sel].mean())}
+    return out
+
+
+# ── Dex completion ──
+
+def expected_encounters(weights):
+    """Coupon collector with unequal per-encounter probabilities: expected
+    encounters until every species has been caught once."""
+    weights = [w for w in weights if w > 0]
+    total = 0.0
+    for size in range(1, len(weights) + 1):
+        for subset in itertools.combinations(weights, size):
+            total += (-1) ** (size + 1) / sum(subset)
+    return total
+
+
+def zone_completion(zone, encounters, walk_seconds):
+    """Expected encounters, throws, gold and seconds to catch every species
+    of the zone from per-species engagement expectations, or None when some
+    species is never caught."""
+    counts = {path: zone.species.count(path) / len(zone.species) for path in set(zone.species)}
+    if any(encounters[path]["caught"] <= 0 for path in counts):
+        return None
+    totals = {key: sum(encounters[path][key] / encounters[path]["caught"] for path in counts)
+              for key in ("throws", "gold", "seconds")}
+    totals["encounters"] = expected_encounters([share * encounters[path]["caught"]
+                                                for path, share in counts.items()])
+    totals["seconds"] += totals["encounters"] * walk_seconds
+    return totals
+
+
+def analyze(db=None, trials=TRIALS, attacker=ATTACKER, attacker_level=None, weaken_to=WEAKEN_TO,
+            walk_seconds=WALK_SECONDS, seed=0, max_rounds=MAX_ROUNDS):
+    """The full report as a JSON-ready dict."""
+    db = db or load_database()
+    t = sim.Tables(db)
+    rng = np.random.default_rng(seed)
+    balls = capture_balls(db)
+    attacker_id = t.species.index(attacker)
+    zones = wild_zones()
+
+    report = {"balls": [{"name": name, "catch_multiplier": mult, "price": price}
+                        for name, mult, price in balls],
+              "zones": []}
+    for zone in zones:
+        level = attacker_level or zone.level_max
+        # A ball that always catches needs no simulation
+        simulated = [ball for ball in balls if catch_chance(1.0, ball[1], 1.0) < 1.0]
+        outcomes = {strategy: simulate_encounters(t, db, zone, simulated, (attacker_id, level),
+                                                  trials, rng, ratio, max_rounds)
+                    for strategy, ratio in (("full_hp", 1.0), ("weaken", weaken_to))}
+        entry = {"zone": zone.key, "name": zone.name, "levels": [zone.level_min, zone.level_max],
+                 "weather": [zone.weather, zone.weather_chance], "attacker_level": level,
+                 "species": [db.get(path).species_name for path in zone.species], "balls": {}}
+        for name, mult, price in balls:
+            per_species = {}
+            for path in sorted(set(zone.species)):
+                per_species[path] = {strategy: found.get((path, name)) or certain_encounter(price)
+                                     for strategy, found in outcomes.items()}
+            entry["balls"][name] = {
+                strategy: {"dex": zone_completion(zone, {p: s[strategy] for p, s in per_species.items()},
+                                                  walk_seconds),
+                           "species": {db.get(p).species_name: s[strategy]
+                                       for p, s in per_species.items()}}
+                for strategy in ("full_hp", "weaken")}
+        report["zones"].append(entry)
+
+    wild = {path for zone in zones for path in zone.species}
+    report["not_wild"] = sorted(c.species_name for c in db.creatures if c.path not in wild)
+    return report
+
+
+# ── Report ──
+
+def print_report(report):
+    for zone in report["zones"]:
+        weather, chance = zone["weather"]
+        print(f"\n{zone['name']} (Lv {zone['levels'][0]}-{zone['levels'][1]}, "
+              f"{len(set(zone['species']))} species"
+              + (f", {weather} {chance:.0%}" if chance else "") + ")")
+        print(f"  {'':13}{'full HP: throws':>16}{'gold':>8}{'min':>7}"
+              f"{'weaken: throws':>17}{'gold':>8}{'min':>7}")
+        for ball, strategies in zone["balls"].items():
+            cells = []
+            for strategy in ("full_hp", "weaken"):
+                dex = strategies[strategy]["dex"]
+                cells.append(f"{'never':>31}" if dex is None else
+                             f"{dex['throws']:16.1f}{dex['gold']:8.0f}{dex['seconds'] / 60:7.1f}")
+            print(f"  {ball:13}{cells[0]} {cells[1]}")
+    if report["not_wild"]:
+        print(f"\nNot found in the wild: {', '.join(report['not_wild'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     epilog=__doc__.split("\n", 2)[2],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=TRIALS,
+                        help="simulated weaken encounters per species and ball")
+    parser.add_argument("--attacker", default=ATTACKER, help="species that weakens the wild creature")
+    parser.add_argument("--attacker-level", type=int, help="its level (default: each zone's level_max)")
+    parser.add_argument("--weaken-to", type=float, default=WEAKEN_TO,
+                        help="throw once the enemy's HP ratio is at or below this")
+    parser.add_argument("--walk-seconds", type=float, default=WALK_SECONDS,
+                        help="time to find the next encounter")
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS,
+                        help="rounds before a simulated encounter is given up")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=OUT_PATH, help="report JSON path")
+    parser.add_argument("--no-cache", action="store_true", help="recompute even if the data is unchanged")
+    parser.add_argument("--quiet", action="store_true", help="do not print the tables")
+    args = parser.parse_args(argv)
+    if args.trials < 1:
+        parser.error("--trials must be at least 1")
+    if not 0.0 < args.weaken_to <= 1.0:
+        parser.error("--weaken-to must be in (0, 1]")
+    if args.attacker_level is not None and not 1 <= args.attacker_level <= 50:
+        parser.error("--attacker-level must lie within 1-50")
+
+    start = time.perf_counter()
+    db = load_database()
+    if args.attacker not in {c.species_name for c in db.creatures}:
+        parser.error(f"unknown species: {args.attacker}")
+    params = {"trials": args.trials, "attacker": args.attacker, "attacker_level": args.attacker_level,
+              "weaken_to": args.weaken_to, "walk_seconds": args.walk_seconds,
+              "max_rounds": args.max_rounds, "seed": args.seed}
+    # The model is this file and simulate_battles' turn rules
+    code = data_hash([os.path.abspath(__file__), os.path.abspath(sim.__file__)])
+    key = fingerprint(data_hash(), code, params)
+    cache = BuildCache(enabled=not args.no_cache)
+    if cache.is_fresh(args.out, key):
+        with open(args.out) as f:
+            report = json.load(f)
+        status = "cached"
+    else:
+        report = dict(analyze(db, **params), params=params, key=key)
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=1)
+            f.write("\n")
+        cache.record(args.out, key)
+        cache.save()
+        status = "computed"
+    if not args.quiet:
+        print_report(report)
+    print(f"\nCatch rates {status} in {time.perf_counter() - start:.2f}s -> {os.path.relpath(args.out)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Content-addressed incremental build cache for the asset generators.
+
+Each output is keyed by a fingerprint of its inputs (drawer source, palette
+or glyph entries, seed, ...). Outputs whose fingerprint matches the stored
+manifest, and whose file is untouched since it was written, are skipped.
+The manifest is only rewritten when something changed, so a no-op rebuild
+touches no files.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = os.path.join(ROOT, "tools", ".build_manifest.json")
+
+
+@functools.lru_cache(maxsize=None)
+def _source(obj):
+    # getsource re-parses the whole module for classes; look each object up once
+    return inspect.getsource(obj)
+
+
+def _canonical(part):
+    if inspect.isfunction(part) or inspect.isclass(part) or hasattr(part, "__wrapped__"):
+        return _source(part)
+    return json.dumps(part, sort_keys=True, default=repr)
+
+
+def fingerprint(*parts):
+    """SHA-256 over the given inputs. Functions and classes contribute their
+    source; everything else its canonical JSON form."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(_canonical(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class BuildCache:
+    """Manifest of output path -> (fingerprint, size, mtime) with hit/miss counts."""
+
+    def __init__(self, path=MANIFEST_PATH, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        try:
+            with open(path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def _key(self, output_path):
+        return os.path.relpath(os.path.abspath(output_path), ROOT)
+
+    def _fresh(self, output_path, key):
+        entry = self._entries.get(self._key(output_path))
+        if not (self.enabled and entry and entry["fingerprint"] == key):
+            return False
+        try:
+            st = os.stat(output_path)
+        except OSError:
+            return False
+        return (st.st_size, st.st_mtime_ns) == (entry["size"], entry["mtime_ns"])
+
+    def _count(self, fresh):
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return fresh
+
+    def is_fresh(self, output_path, key):
+        """True if output_path was built from the same inputs and is unchanged."""
+        return self._count(self._fresh(output_path, key))
+
+    def all_fresh(self, output_paths, key):
+        """is_fresh for a group of files written by one build step, counted as
+        a single hit or miss: any missing or edited file makes it stale."""
+        return self._count(all([self._fresh(path, key) for path in output_paths]))
+
+    def record(self, output_path, key):
+        st = os.stat(output_path)
+        self._entries[self._key(output_path)] = {
+            "fingerprint": key,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def report(self):
+        print(f"Cache: {self.hits} hit(s), {self.misses} miss(es)")
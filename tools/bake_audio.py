@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""Bake the procedural music tracks and sound effects to WAV files.
+
+MusicLibrary and SfxLibrary synthesize every AudioStreamWAV at runtime,
+one GDScript call per sample. This reads their note tables (and the
+ToneGenerator defaults) straight from the .gd sources and renders the same
+waveforms with NumPy: sine, square, triangle and noise under the ToneGenerator
+ADSR envelope, 16-bit mono at 22050 Hz, sample for sample as the runtime
+path except for the noise, which comes from a seeded generator.
+
+Outputs, named by each library's BAKED_NAMES (its id order), in --out-dir:
+  music/{track}.wav   looping tracks carry a smpl loop chunk, which Godot's
+                      WAV importer turns into LOOP_FORWARD
+  sfx/{sound}.wav
+
+MusicLibrary.get_track and SfxLibrary.get_sfx load these when they exist
+and fall back to synthesizing otherwise.
+
+  python3 tools/bake_audio.py
+  python3 tools/bake_audio.py battle level_up --out-dir /tmp/audio
+"""
+
+import argparse
+import numpy as np
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+
+from asset_cache import ROOT, BuildCache, fingerprint
+
+OUT_DIR = os.path.join(ROOT, "assets", "audio")
+AUDIO_SCRIPTS = os.path.join(ROOT, "scripts", "audio")
+SEED = 42
+# library script -> (dispatch function, output subdirectory)
+LIBRARIES = {
+    "music_library.gd": ("_generate_track", "music"),
+    "sfx_library.gd": ("_generate_sfx", "sfx"),
+}
+
+
+# ── GDScript sources ──
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def _split_args(text):
+    """Top-level comma-separated arguments of a call or literal."""
+    args, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        if ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            args.append(text[start:i].strip())
+            start = i + 1
+    tail = text[start:].strip()
+    return args + [tail] if tail else args
+
+
+def _enum(text, name):
+    body = re.search(rf"enum {name}\s*\{{([^}}]*)\}}", text).group(1)
+    return [member.strip() for member in body.split(",") if member.strip()]
+
+
+def _consts(text):
+    return {name: float(value) for name, value in
+            re.findall(r"const (\w+)\s*:?=\s*([-+]?\d+\.?\d*)", text)}
+
+
+class Library:
+    """Constants and evaluator for one script's literals: numbers, consts,
+    booleans and ToneGenerator.WaveType members."""
+
+    def __init__(self, text, waves, consts=None):
+        self.text = text
+        self.waves = waves
+        self.consts = dict(consts or {}, **_consts(text))
+
+    def value(self, source):
+        source = source.strip()
+        if source in ("true", "false"):
+            return source == "true"
+        member = re.fullmatch(r"(?:ToneGenerator\.)?WaveType\.(\w+)", source)
+        if member:
+            return self.waves.index(member.group(1))
+        if source in self.consts:
+            return self.consts[source]
+        return float(source)
+
+    def function(self, name):
+        """Body of `static func name(...)` up to the next function."""
+        match = re.search(rf"^static func {name}\(.*?(?=^static func |\Z)", self.text, re.S | re.M)
+        return match.group(0)
+
+
+def tone_defaults(text, waves):
+    """{function: [(parameter, default or None)]} for generate_tone/_melody."""
+    lib = Library(text, waves)
+    signatures = {}
+    for name in ("generate_tone", "generate_melody"):
+        params = re.search(rf"static func {name}\((.*?)\)\s*->", text, re.S).group(1)
+        signatures[name] = []
+        for param in _split_args(params):
+            key, _, default = param.partition("=")
+            signatures[name].append((key.split(":")[0].strip(), lib.value(default) if default else None))
+    return signatures
+
+
+def parse_sound(lib, func, signatures):
+    """Spec of one library function: its generate_tone or generate_melody
+    call with every argument (and each note of `notes`) evaluated."""
+    body = lib.function(func)
+    call = re.search(r"ToneGenerator\.(generate_tone|generate_melody)\((.*)\)\s*$", body, re.S | re.M)
+    kind, args = call.group(1), _split_args(call.group(2))
+    spec = {"kind": kind}
+    for (param, default), source in zip(signatures[kind], args + [None] * len(signatures[kind])):
+        if source is None:
+            spec[param] = default
+        elif source == "notes":
+            notes = re.search(r"notes\s*:?=\s*\[(.*)\]", body, re.S).group(1)
+            spec[param] = [{key: lib.value(value) for key, value in
+                            re.findall(r"(\w+)\s*=\s*([^,}]+)", note)}
+                           for note in re.findall(r"\{([^}]*)\}", notes)]
+        else:
+            spec[param] = lib.value(source)
+    return spec
+
+
+def sound_specs():
+    """{(subdir, name): spec} for every track and sound effect, in id order."""
+    tone_text = _read(os.path.join(AUDIO_SCRIPTS, "tone_generator.gd"))
+    waves = _enum(tone_text, "WaveType")
+    tone = Library(tone_text, waves)
+    signatures = tone_defaults(tone_text, waves)
+    specs = {}
+    for script, (dispatch, subdir) in LIBRARIES.items():
+        lib = Library(_read(os.path.join(AUDIO_SCRIPTS, script)), waves)
+        names = re.findall(r'"(\w+)"', re.search(r"const BAKED_NAMES := \[(.*?)\]", lib.text, re.S).group(1))
+        cases = dict(re.findall(r"^\s*(\d+):.*?return (\w+)\(\)", lib.function(dispatch), re.S | re.M))
+        for index, name in enumerate(names):
+            spec = parse_sound(lib, cases[str(index)], signatures)
+            spec.update(sample_rate=int(tone.consts["SAMPLE_RATE"]), mix_rate=int(tone.consts["MIX_RATE"]))
+            if spec["kind"] == "generate_melody":
+                # Melody notes always use the default envelope
+                spec["envelope"] = [tone.consts[f"DEFAULT_{key}"]
+                                    for key in ("ATTACK", "DECAY", "SUSTAIN", "RELEASE")]
+            specs[subdir, name] = spec
+    return specs
+
+
+# ── Synthesis ──
+
+def wave_samples(freq, t, wave, rng):
+    """ToneGenerator._wave_sample over arrays (SINE, SQUARE, TRIANGLE, NOISE)."""
+    phase = np.fmod(freq * t, 1.0)
+    out = np.zeros(len(t))
+    sine, square, triangle, noise = (wave == kind for kind in range(4))
+    out[sine] = np.sin(2 * np.pi * freq[sine] * t[sine])
+    out[square] = np.where(phase[square] < 0.5, 1.0, -1.0)
+    out[triangle] = 4.0 * np.abs(phase[triangle] - 0.5) - 1.0
+    out[noise] = rng.uniform(-1.0, 1.0, int(noise.sum()))
+    return out
+
+
+def adsr_envelope(t, duration, attack, decay, sustain, release):
+    """ToneGenerator._adsr_envelope over arrays; the guards against zero-length
+    stages select the same branch as the GDScript."""
+    release_start = duration - release
+    with np.errstate(divide="ignore", invalid="ignore"):
+        attacking = np.where(attack > 0.0, t / attack, 1.0)
+        decaying = 1.0 - (1.0 - sustain) * np.where(decay > 0.0, (t - attack) / decay, 1.0)
+        releasing = sustain * (1.0 - np.where(release > 0.0, (t - release_start) / release, 1.0))
+    return np.select([t < attack, t < attack + decay, t < release_start],
+                     [attacking, decaying, sustain], releasing)
+
+
+def to_pcm(values):
+    """int(value) then clampi(-32768, 32767), as 16-bit little endian."""
+    return np.clip(np.trunc(values), -32768, 32767).astype("<i2")
+
+
+def render_tone(spec, rng):
+    rate = spec["sample_rate"]
+    duration = spec["duration"]
+    t = np.arange(int(rate * duration)) / float(rate)
+    freq = np.full(len(t), spec["freq"])
+    sample = wave_samples(freq, t, np.full(len(t), spec["wave_type"]), rng)
+    envelope = adsr_envelope(t, duration, spec["attack"], spec["decay"], spec["sustain_level"],
+                             spec["release"])
+    return to_pcm(sample * envelope * spec["volume"] * 32767.0)
+
+
+def render_melody(spec, rng):
+    """Every note at once: per-sample note index, time since its onset and the
+    note's frequency, wave, volume and duration."""
+    rate = spec["sample_rate"]
+    notes = spec["notes"]
+    beat_duration = 60.0 / spec["bpm"]
+    durations = np.array([note.get("duration_beats", 1.0) for note in notes]) * beat_duration
+    counts = np.trunc(rate * durations).astype(np.int64)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    index = np.repeat(np.arange(len(notes)), counts)
+    t = (np.arange(counts.sum()) - starts[index]) / float(rate)
+
+    freq = np.array([note.get("freq", 440.0) for note in notes])[index]
+    wave = np.array([note.get("wave", spec["wave_type"]) for note in notes])[index]
+    volume = np.array([note.get("volume", spec["volume"]) for note in notes])[index]
+    sounding = freq > 0.0  # REST notes are silence
+    sample = np.zeros(len(t))
+    sample[sounding] = (wave_samples(freq[sounding], t[sounding], wave[sounding], rng)
+                        * adsr_envelope(t[sounding], durations[index][sounding], *spec["envelope"]))
+    return to_pcm(sample * volume * 32767.0)
+
+
+def render(spec, seed=SEED, name=""):
+    rng = np.random.default_rng([seed, zlib.crc32(name.encode())])
+    return (render_tone if spec["kind"] == "generate_tone" else render_melody)(spec, rng)
+
+
+# ── Output ──
+
+def wav_bytes(pcm, rate, loop=False):
+    """16-bit mono PCM RIFF/WAVE. A looping stream gets a smpl chunk with one
+    forward loop over the whole clip; the end is the sample count, the
+    loop_end ToneGenerator.generate_melody sets."""
+    fmt = struct.pack("<HHIIHH", 1, 1, rate, rate * 2, 2, 16)
+    data = pcm.tobytes()
+    chunks = [b"fmt " + struct.pack("<I", len(fmt)) + fmt,
+              b"data" + struct.pack("<I", len(data)) + data + b"\0" * (len(data) & 1)]
+    if loop:
+        smpl = struct.pack("<9I6I", 0, 0, 1000000000 // rate, 60, 0, 0, 0, 1, 0,
+                           0, 0, 0, len(pcm), 0, 0)
+        chunks.append(b"smpl" + struct.pack("<I", len(smpl)) + smpl)
+    body = b"WAVE" + b"".join(chunks)
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def audio_fingerprint(spec, seed, name):
+    return fingerprint("audio", spec, seed, name, wave_samples, adsr_envelope, to_pcm,
+                       render_tone, render_melody, render, wav_bytes)
+
+
+def build(names=None, seed=SEED, out_dir=OUT_DIR, cache=None):
+    """Bake every (or each named) sound, skipping fresh ones. Returns the
+    number of WAVs written."""
+    written = 0
+    for (subdir, name), spec in sound_specs().items():
+        if names and name not in names:
+            continue
+        path = os.path.join(out_dir, subdir, f"{name}.wav")
+        key = audio_fingerprint(spec, seed, name)
+        if cache is not None and cache.is_fresh(path, key):
+            continue
+        pcm = render(spec, seed, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(wav_bytes(pcm, spec["mix_rate"], spec.get("loop", False)))
+        if cache is not None:
+            cache.record(path, key)
+        written += 1
+        print(f"Created {subdir}/{name}.wav ({len(pcm) / spec['mix_rate']:.2f}s"
+              + (", looping" if spec.get("loop") else "") + ")")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     epilog=__doc__.split("\n", 2)[2],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help="tracks or sounds to bake, e.g. battle (default: all)")
+    parser.add_argument("--seed", type=int, default=SEED, help="noise seed")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="rebuild regardless of the build manifest")
+    args = parser.parse_args(argv)
+
+    known = {name for _, name in sound_specs()}
+    unknown = [name for name in args.names if name not in known]
+    if unknown:
+        parser.error(f"unknown sound(s): {', '.join(unknown)}")
+    cache = BuildCache(enabled=not args.no_cache)
+    start = time.perf_counter()
+    build(args.names, args.seed, args.out_dir, cache)
+    cache.save()
+    cache.report()
+    print(f"Total: {(time.perf_counter() - start) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Benchmark the asset generators one asset at a time.
+
+Assets:
+  creature:NAME   the three outputs of one CREATURE_DRAWERS entry
+  player          player_sheet.png
+  tileset         the whole atlas from the legacy stream the default build
+                  uses (its tiles share one stream, so they are timed together)
+  tile:NAME       one TILE_DRAWERS tile (32x32) from its per-tile NumPy
+                  stream; with --numpy-rng, in place of tileset
+  font            pixel_font.png
+
+Each asset is rasterized and PNG-encoded in memory, after --warmup untimed
+runs, --repeats times; the median of each phase is reported. Creature frames
+are re-rasterized every run (the shared frame cache is cleared), so a
+creature's time includes its drawer. "px/s" is output pixels per second of
+raster time.
+
+Examples:
+  python3 tools/benchmark_assets.py --out bench.json
+  python3 tools/benchmark_assets.py 'tile*' --baseline bench.json --threshold 0.15
+  python3 tools/benchmark_assets.py 'tile:*' --numpy-rng
+"""
+
+import argparse
+import fnmatch
+import json
+import numpy as np
+import os
+import platform
+import statistics
+import sys
+import time
+
+import generate_font
+import generate_sprites
+import generate_tileset
+from png_output import png_bytes
+
+
+def creature_asset(name):
+    def raster():
+        generate_sprites._FRAME_CACHE.clear()
+        return [render(name) for _, render, _ in generate_sprites.CREATURE_OUTPUTS]
+    return raster
+
+
+def tile_asset(row, col):
+    return lambda: [generate_tileset.render_tile(row, col)]
+
+
+def collect_assets(legacy_rng=True):
+    """name -> raster function returning a list of images (Canvas, PIL or array).
+    The legacy stream runs across the whole atlas, so with legacy_rng the
+    tiles are timed together as "tileset" rather than one by one."""
+    assets = {f"creature:{name}": creature_asset(name) for name in generate_sprites.CREATURE_DRAWERS}
+    assets["player"] = lambda: [generate_sprites.render_player_sheet()]
+    if legacy_rng:
+        assets["tileset"] = lambda: [generate_tileset.build_atlas(legacy_rng=True)]
+    else:
+        for row, drawers in enumerate(generate_tileset.TILE_DRAWERS):
+            for col, drawer in enumerate(drawers):
+                assets[f"tile:{generate_tileset.tile_name(drawer)}"] = tile_asset(row, col)
+    assets["font"] = lambda: [generate_font.render_font()]
+    return assets
+
+
+def _pixels(img):
+    if isinstance(img, generate_sprites.Canvas):
+        img = img.pixels
+    if isinstance(img, np.ndarray):
+        return img.shape[0] * img.shape[1]
+    return img.width * img.height
+
+
+def _encode(img, indexed):
+    if isinstance(img, generate_sprites.Canvas):
+        img = img.to_image()
+    return png_bytes(img, indexed)
+
+
+def time_asset(raster, warmup, repeats, indexed=False):
+    """Median raster and encode times (ms) and output pixel count."""
+    for _ in range(warmup):
+        for img in raster():
+            _encode(img, indexed)
+    raster_ms, encode_ms = [], []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        images = raster()
+        t1 = time.perf_counter()
+        for img in images:
+            _encode(img, indexed)
+        t2 = time.perf_counter()
+        raster_ms.append((t1 - t0) * 1000)
+        encode_ms.append((t2 - t1) * 1000)
+    raster_med, encode_med = statistics.median(raster_ms), statistics.median(encode_ms)
+    pixels = sum(_pixels(img) for img in images)
+    return {
+        "raster_ms": round(raster_med, 4),
+        "encode_ms": round(encode_med, 4),
+        "total_ms": round(raster_med + encode_med, 4),
+        "pixels": pixels,
+        "px_per_s": round(pixels / (raster_med / 1000)) if raster_med > 0 else None,
+    }
+
+
+def compare(results, baseline, threshold, min_ms):
+    """Assets whose total time grew by more than threshold (fraction) and
+    min_ms over the baseline. Returns [(name, old_ms, new_ms)]."""
+    regressions = []
+    for name, entry in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        new_ms, old_ms = entry["total_ms"], old["total_ms"]
+        if new_ms > old_ms * (1 + threshold) and new_ms - old_ms > min_ms:
+            regressions.append((name, old_ms, new_ms))
+    return regressions
+
+
+def environment():
+    from PIL import __version__ as pillow_version
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "pillow": pillow_version, "machine": platform.machine()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     epilog=__doc__.split("\n", 2)[2],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("patterns", nargs="*", help="glob patterns over asset names (default: all)")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--indexed-png", action="store_true",
+                        help="time the palette PNG encoder instead of Pillow's")
+    parser.add_argument("--numpy-rng", dest="legacy_rng", action="store_false",
+                        help="time tiles one by one from the per-tile NumPy streams instead of the "
+                             "whole legacy-stream tileset")
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON from an earlier --out run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="flag assets slower than baseline by this fraction (default: 0.10)")
+    parser.add_argument("--min-ms", type=float, default=0.05,
+                        help="ignore slowdowns smaller than this many ms (timer noise)")
+    args = parser.parse_args(argv)
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+
+    assets = collect_assets(args.legacy_rng)
+    names = [name for name in assets
+             if not args.patterns or any(fnmatch.fnmatch(name, p) for p in args.patterns)]
+    if not names:
+        parser.error("no assets match the given patterns")
+
+    results = {}
+    print(f"{'asset':28} {'raster ms':>10} {'encode ms':>10} {'total ms':>10} {'Mpx/s':>8}")
+    for name in names:
+        entry = time_asset(assets[name], args.warmup, args.repeats, args.indexed_png)
+        results[name] = entry
+        rate = f"{entry['px_per_s'] / 1e6:8.2f}" if entry["px_per_s"] else f"{'-':>8}"
+        print(f"{name:28} {entry['raster_ms']:10.3f} {entry['encode_ms']:10.3f} "
+              f"{entry['total_ms']:10.3f} {rate}")
+    print(f"{'TOTAL':28} {sum(r['raster_ms'] for r in results.values()):10.3f} "
+          f"{sum(r['encode_ms'] for r in results.values()):10.3f} "
+          f"{sum(r['total_ms'] for r in results.values()):10.3f}")
+
+    if args.out:
+        meta = dict(environment(), warmup=args.warmup, repeats=args.repeats,
+                    indexed_png=args.indexed_png, legacy_rng=args.legacy_rng)
+        with open(args.out, "w") as f:
+            json.dump({"meta": meta, "assets": results}, f, indent=1)
+            f.write("\n")
+        print(f"Wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["assets"]
+        regressions = compare(results, baseline, args.threshold, args.min_ms)
+        for name, old_ms, new_ms in regressions:
+            print(f"REGRESSION {name}: {old_ms:.3f} -> {new_ms:.3f} ms "
+                  f"(+{(new_ms / old_ms - 1) * 100:.0f}%)")
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%} "
+              f"against {os.path.basename(args.baseline)}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
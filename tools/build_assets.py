@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Build generated assets for Game Pikanad from one entry point.
+
+Targets:
+  sprites            player sheet and every creature
+  sprites:NAME       one creature (or sprites:player for the player sheet)
+  tileset            terrain_tileset.png
+  font               pixel_font.png + pixel_font.fnt metrics
+  atlas              packed sprite atlas pages + AtlasTexture .tres (opt-in)
+  autotiles          47-tile blob terrain transition sets + Godot TileSets (opt-in)
+  audio              music tracks and SFX baked to WAV (opt-in)
+  all                sprites, tileset and font (the default)
+
+Examples:
+  python3 tools/build_assets.py --list
+  python3 tools/build_assets.py sprites:flamepup font --dry-run
+  python3 tools/build_assets.py --jobs 8 --out-dir /tmp/assets
+
+The generator modules (Pillow/NumPy) are imported only when a group actually
+builds, so --list and --dry-run start instantly.
+"""
+
+import argparse
+import ast
+import importlib
+import os
+import sys
+import time
+
+from asset_cache import ROOT, BuildCache
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUT_DIR = os.path.join(ROOT, "assets")
+
+# group -> (generator module, output subdirectory), in build order
+GROUPS = {
+    "sprites": ("generate_sprites", "sprites"),
+    "tileset": ("generate_tileset", "tilesets"),
+    "font": ("generate_font", "fonts"),
+    "atlas": ("pack_sprite_atlas", os.path.join("sprites", "atlas")),
+    "autotiles": ("generate_autotiles", "tilesets"),
+    "audio": ("bake_audio", "audio"),
+}
+DEFAULT_GROUPS = ["sprites", "tileset", "font"]
+
+
+def creature_names():
+    """CREATURE_DRAWERS keys, read from the source without importing it."""
+    with open(os.path.join(TOOLS_DIR, "generate_sprites.py")) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict)
+                and any(isinstance(t, ast.Name) and t.id == "CREATURE_DRAWERS" for t in node.targets)):
+            return [key.value for key in node.value.keys]
+    return []
+
+
+def list_targets():
+    return (["sprites", "sprites:player"] + [f"sprites:{name}" for name in creature_names()]
+            + ["tileset", "font", "atlas", "autotiles", "audio"])
+
+
+def resolve_targets(selectors):
+    """Map selectors to {group: None (whole group) or set of names}."""
+    plan = {}
+    names = None
+    for selector in selectors or ["all"]:
+        group, _, name = selector.partition(":")
+        if group == "all" and not name:
+            plan.update({group: None for group in DEFAULT_GROUPS})
+            continue
+        if group not in GROUPS:
+            raise ValueError(f"unknown target {selector!r} (see --list)")
+        if not name:
+            plan[group] = None
+            continue
+        if group != "sprites":
+            raise ValueError(f"{group} has no sub-targets: {selector!r}")
+        if names is None:
+            names = {"player", *creature_names()}
+        if name not in names:
+            raise ValueError(f"unknown sprite {name!r} (see --list)")
+        if group not in plan or plan[group] is not None:
+            plan.setdefault(group, set()).add(name)
+    return {group: plan[group] for group in GROUPS if group in plan}
+
+
+def run_group(group, names, args, cache):
+    module_name, subdir = GROUPS[group]
+    module = importlib.import_module(module_name)
+    out_dir = os.path.join(args.out_dir, subdir)
+    if group == "sprites":
+        module.build(names=names, jobs=args.jobs, out_dir=out_dir, cache=cache,
+                     indexed=args.indexed_png, shapes=args.shapes, shiny=args.shiny)
+    elif group == "atlas":
+        module.build(sprites_dir=os.path.join(args.out_dir, GROUPS["sprites"][1]),
+                     out_dir=out_dir, cache=cache, indexed=args.indexed_png)
+    elif group == "tileset":
+        module.build(legacy_rng=not args.numpy_rng, jobs=args.jobs if args.numpy_rng else 1,
+                     out_dir=out_dir, cache=cache, indexed=args.indexed_png,
+                     grades=args.tile_grades, anim_frames=args.tile_anim_frames)
+    elif group == "autotiles":
+        module.build(out_dir=out_dir, cache=cache, indexed=args.indexed_png)
+    elif group == "audio":
+        module.build(out_dir=out_dir, cache=cache)
+    else:
+        module.build(out_dir=out_dir, cache=cache, indexed=args.indexed_png,
+                     scales=args.font_scales, extended=args.font_extended)
+
+
+def describe(group, names, out_dir):
+    subdir = os.path.join(out_dir, GROUPS[group][1])
+    if group != "sprites":
+        return f"{group} -> {subdir}"
+    selected = "all" if names is None else ", ".join(sorted(names))
+    return f"sprites ({selected}) -> {subdir}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     epilog=__doc__.split("\n", 2)[2],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", help="target selectors (default: all)")
+    parser.add_argument("--list", action="store_true", help="list available targets and exit")
+    parser.add_argument("--dry-run", action="store_true", help="show what would be built")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR,
+                        help="asset root; outputs go to sprites/, tilesets/ and fonts/ below it")
+    parser.add_argument("--numpy-rng", action="store_true",
+                        help="build the tileset from the per-tile NumPy streams (parallel, but not "
+                             "the committed atlas)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="rebuild regardless of the build manifest")
+    parser.add_argument("--indexed-png", action="store_true",
+                        help="write size-optimized, palette-indexed PNGs where possible")
+    parser.add_argument("--tile-grades", action="store_true",
+                        help="also write day/night and weather graded tilesets")
+    parser.add_argument("--tile-anim-frames", type=int, default=0, metavar="N",
+                        help="also write N-frame water/lava/magma loops")
+    parser.add_argument("--font-scales", type=lambda text: [int(s) for s in text.split(",")],
+                        default=[1], help="comma-separated font atlas scales (default: 1)")
+    parser.add_argument("--font-extended", action="store_true",
+                        help="also build packed Latin-1/Latin Extended-A font atlases")
+    parser.add_argument("--shapes", metavar="FILE",
+                        help="rasterize creatures from a shape list (see sprite_shapes.py)")
+    parser.add_argument("--shiny", action="store_true",
+                        help="also write palette-remapped shiny creature sheets")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(list_targets()))
+        return 0
+    if any(scale < 1 for scale in args.font_scales):
+        parser.error("--font-scales must be positive integers")
+    try:
+        plan = resolve_targets(args.targets)
+    except ValueError as e:
+        parser.error(str(e))
+    if "atlas" in plan or "autotiles" in plan:
+        # Their .tres files reference the PNGs by res:// path
+        from pack_sprite_atlas import res_path
+        try:
+            res_path(args.out_dir)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.dry_run:
+        for group, names in plan.items():
+            print(f"would build {describe(group, names, args.out_dir)}")
+        return 0
+
+    cache = BuildCache(enabled=not args.no_cache)
+    start = time.perf_counter()
+    for group, names in plan.items():
+        t0 = time.perf_counter()
+        run_group(group, names, args, cache)
+        print(f"[{group}] {(time.perf_counter() - t0) * 1000:.0f} ms")
+    cache.save()
+    cache.report()
+    print(f"Total: {(time.perf_counter() - start) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
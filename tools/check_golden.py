@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Check that the generators still reproduce the committed PNGs.
+
+Every target is rendered in memory (the tileset from the legacy random
+stream the committed atlas was made with) and compared pixel for pixel
+against its file under assets/. For each mismatch the differing pixel
+count and bounding box are printed, and a diff image is written to
+--diff-dir: committed | generated | changed pixels in red.
+
+  python3 tools/check_golden.py                 # everything, a second or so
+  python3 tools/check_golden.py 'sprites/flame*'
+"""
+
+from PIL import Image
+import argparse
+import fnmatch
+import numpy as np
+import os
+import sys
+import time
+
+import generate_font
+import generate_sprites
+import generate_tileset
+from asset_cache import ROOT
+
+ASSETS_DIR = os.path.join(ROOT, "assets")
+DIFF_DIR = os.path.join(ROOT, "tools", ".golden_diff")
+
+
+def _rgba(img):
+    if isinstance(img, generate_sprites.Canvas):
+        return img.pixels
+    return np.asarray(img.convert("RGBA"))
+
+
+def golden_targets():
+    """Asset path relative to assets/ -> function rendering it in memory."""
+    targets = {"sprites/player_sheet.png": generate_sprites.render_player_sheet}
+    for name in generate_sprites.CREATURE_DRAWERS:
+        for suffix, render, _ in generate_sprites.CREATURE_OUTPUTS:
+            targets[f"sprites/{name}{suffix}.png"] = lambda name=name, render=render: render(name)
+    targets["tilesets/terrain_tileset.png"] = lambda: generate_tileset.build_atlas(legacy_rng=True)
+    targets["fonts/pixel_font.png"] = generate_font.render_font
+    return targets
+
+
+def diff_pixels(expected, actual):
+    """(changed pixel count, (x0, y0, x1, y1) bounding box or None, mask).
+    A size mismatch counts every pixel of the larger image."""
+    if expected.shape != actual.shape:
+        h = max(expected.shape[0], actual.shape[0])
+        w = max(expected.shape[1], actual.shape[1])
+        return h * w, (0, 0, w, h), None
+    mask = (expected != actual).any(axis=2)
+    count = int(mask.sum())
+    if not count:
+        return 0, None, mask
+    ys, xs = np.nonzero(mask)
+    return count, (int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1), mask
+
+
+def diff_image(expected, actual, mask):
+    """Side-by-side committed | generated | mask, with changed pixels in red."""
+    h = max(expected.shape[0], actual.shape[0])
+    w = max(expected.shape[1], actual.shape[1])
+    out = np.zeros((h, w * 3 + 2, 4), dtype=np.uint8)
+    out[:expected.shape[0], :expected.shape[1]] = expected
+    out[:actual.shape[0], w + 1:w + 1 + actual.shape[1]] = actual
+    panel = out[:, 2 * w + 2:]
+    if mask is None:
+        panel[:] = (255, 0, 0, 255)
+    else:
+        panel[:mask.shape[0], :mask.shape[1]] = np.where(
+            mask[..., None], np.array([255, 0, 0, 255], np.uint8), expected // 4)
+    return Image.fromarray(out, "RGBA")
+
+
+def check(patterns=None, diff_dir=DIFF_DIR, assets_dir=ASSETS_DIR):
+    """Compare the selected targets. Returns (number checked, failing paths)."""
+    checked, failures = 0, []
+    for rel, render in golden_targets().items():
+        if patterns and not any(fnmatch.fnmatch(rel, p) for p in patterns):
+            continue
+        checked += 1
+        path = os.path.join(assets_dir, rel)
+        if not os.path.exists(path):
+            print(f"MISSING {rel}")
+            failures.append(rel)
+            continue
+        expected = np.asarray(Image.open(path).convert("RGBA"))
+        actual = _rgba(render())
+        count, box, mask = diff_pixels(expected, actual)
+        if not count:
+            continue
+        failures.append(rel)
+        detail = ("size " + "x".join(map(str, expected.shape[1::-1])) + " -> "
+                  + "x".join(map(str, actual.shape[1::-1])) if mask is None else f"bbox {box}")
+        line = f"FAIL {rel}: {count} pixel(s) differ, {detail}"
+        if diff_dir:
+            out = os.path.join(diff_dir, rel.replace("/", "__"))
+            os.makedirs(diff_dir, exist_ok=True)
+            diff_image(expected, actual, mask).save(out)
+            line += f" -> {os.path.relpath(out)}"
+        print(line)
+    return checked, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     epilog=__doc__.split("\n", 2)[2],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("patterns", nargs="*",
+                        help="glob patterns over paths relative to assets/ (default: all)")
+    parser.add_argument("--diff-dir", default=DIFF_DIR, help="where to write diff images")
+    parser.add_argument("--no-diff-images", action="store_true")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    checked, failures = check(args.patterns, None if args.no_diff_images else args.diff_dir)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Checked {checked} asset(s): {len(failures)} mismatch(es) ({elapsed:.0f} ms)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
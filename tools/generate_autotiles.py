@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Generate 47-tile blob autotile sets for pairs of terrains.
+
+A blob tile is keyed by its 8-neighbour bitmask (N=1, NE=2, E=4, SE=8, S=16,
+SW=32, W=64, NW=128), with a corner bit only counted when both of its sides
+are set, which leaves 47 distinct tiles. Each tile is four 16x16 quadrants,
+and each quadrant is one of five precomputed corner masks (outer corner,
+either edge, inner corner, full), so a whole set is one gather from the mask
+table plus one composite of the two terrain textures.
+
+Outputs per pair, in --out-dir (assets/tilesets by default):
+  autotile_{pair}.png    8x6 atlas: the 47 blob tiles, then a plain outer tile
+  autotile_{pair}.tres   Godot TileSet with the terrain set and peering bits
+  autotile_{pair}.json   bitmask -> atlas coords table
+
+  python3 tools/generate_autotiles.py water_sand --seed 7
+"""
+
+import argparse
+import json
+import numpy as np
+import os
+import sys
+import time
+import zlib
+
+import generate_tileset as tileset
+from asset_cache import BuildCache, fingerprint
+from pack_sprite_atlas import res_path
+from png_output import ENCODER_SOURCES, save_png
+
+OUT_DIR = tileset.OUT_DIR
+TILE = tileset.TILE_SIZE
+HALF = TILE // 2
+COLS, ROWS = 8, 6
+BORDER = 9   # px of outer terrain along an open side
+RADIUS = 5   # corner rounding in px
+WOBBLE = 1.5  # edge waviness in px; periodic in TILE so seams line up
+
+# pair -> (inner terrain, outer terrain, rim color drawn on the inner edge).
+# A terrain is a TILE_DRAWERS tile name or a (base color, variation) fill.
+PAIRS = {
+    "water_sand": ("water", "sand", (150, 190, 235)),
+    "path_grass": (((160, 130, 90), 10), "grass_medium", (125, 100, 65)),
+    "lava_rock": ("lava", "rock_dark", (255, 150, 40)),
+}
+
+# Neighbour bits and the Godot CellNeighbor peering property of each
+N, NE, E, SE, S, SW, W, NW = (1 << i for i in range(8))
+PEERING = {
+    N: "top_side", NE: "top_right_corner", E: "right_side", SE: "bottom_right_corner",
+    S: "bottom_side", SW: "bottom_left_corner", W: "left_side", NW: "top_left_corner",
+}
+# Quadrants (top-left, top-right, bottom-left, bottom-right) as
+# (vertical side bit, horizontal side bit, corner bit)
+QUADRANTS = [(W, N, NW), (E, N, NE), (W, S, SW), (E, S, SE)]
+# Quadrant cases, indexing the corner mask table
+OUTER, EDGE_V, EDGE_H, INNER, FULL = range(5)
+
+
+def blob_masks():
+    """The 47 canonical bitmasks in ascending order."""
+    masks = set()
+    for bits in range(256):
+        for side_a, side_b, corner in QUADRANTS:
+            if not (bits & side_a and bits & side_b):
+                bits &= ~corner
+        masks.add(bits)
+    return sorted(masks)
+
+
+def quadrant_cases(masks):
+    """(tiles, 4) case per quadrant. EDGE_V means the vertical side (W/E)
+    continues, so the outer terrain runs along the horizontal side."""
+    masks = np.asarray(masks)[:, None]
+    side_v = np.array([q[0] for q in QUADRANTS])
+    side_h = np.array([q[1] for q in QUADRANTS])
+    corner = np.array([q[2] for q in QUADRANTS])
+    v, h, c = masks & side_v > 0, masks & side_h > 0, masks & corner > 0
+    return np.select([v & h & c, v & h, v, h], [FULL, INNER, EDGE_V, EDGE_H], OUTER)
+
+
+def corner_masks():
+    """(4 quadrants, 5 cases, HALF, HALF) bool: where the inner terrain shows.
+    Computed in whole-tile coordinates, so each quadrant's wobble is the one
+    its neighbours see across the seam."""
+    ys, xs = np.mgrid[0:TILE, 0:TILE] + 0.5
+    # Distance into the tile from each side, less that side's wavy border
+    border_x = BORDER + WOBBLE * np.sin(2 * np.pi * ys / HALF)
+    border_y = BORDER + WOBBLE * np.sin(2 * np.pi * xs / HALF)
+    out = np.empty((4, 5, HALF, HALF), dtype=bool)
+    for q, (y0, x0) in enumerate([(0, 0), (0, HALF), (HALF, 0), (HALF, HALF)]):
+        cell = (slice(y0, y0 + HALF), slice(x0, x0 + HALF))
+        dist_x = np.minimum(xs, TILE - xs)[cell] - border_x[cell]
+        dist_y = np.minimum(ys, TILE - ys)[cell] - border_y[cell]
+        out[q, OUTER] = np.hypot(np.maximum(RADIUS - dist_x, 0), np.maximum(RADIUS - dist_y, 0)) <= RADIUS
+        out[q, EDGE_V] = dist_y >= 0
+        out[q, EDGE_H] = dist_x >= 0
+        out[q, INNER] = np.hypot(np.maximum(dist_x + RADIUS, 0), np.maximum(dist_y + RADIUS, 0)) >= RADIUS
+        out[q, FULL] = True
+    return out
+
+
+def blob_alpha(masks):
+    """(tiles, TILE, TILE) bool inner-terrain coverage, assembled in one
+    gather: quadrant q of tile t is corner_masks()[q, case[t, q]]."""
+    quads = corner_masks()[np.arange(4), quadrant_cases(masks)]  # (tiles, 4, HALF, HALF)
+    quads = quads.reshape(len(masks), 2, 2, HALF, HALF).transpose(0, 1, 3, 2, 4)
+    return quads.reshape(len(masks), TILE, TILE)
+
+
+def edge_rim(alpha):
+    """Inner pixels with an outer 4-neighbour. Tile borders are padded by
+    replication: an open side already leaves outer terrain at the border."""
+    padded = np.pad(alpha, ((0, 0), (1, 1), (1, 1)), mode="edge")
+    eroded = (padded[:, :-2, 1:-1] & padded[:, 2:, 1:-1]
+              & padded[:, 1:-1, :-2] & padded[:, 1:-1, 2:])
+    return alpha & ~eroded
+
+
+# ── Textures ──
+
+def terrain_texture(terrain, seed=tileset.SEED):
+    """(TILE, TILE, 4) uint8 texture for a PAIRS terrain. Named tiles are
+    cut from the tileset atlas, so they match the committed atlas tile."""
+    if isinstance(terrain, str):
+        return tileset.atlas_tile(terrain, seed)
+    base, variation = terrain
+    gen = np.random.default_rng(np.random.SeedSequence([seed, zlib.crc32(repr(terrain).encode())]))
+    out = np.full((TILE, TILE, 4), 255, dtype=np.uint8)
+    out[..., :3] = np.clip(np.array(base) + gen.integers(-variation, variation + 1, (TILE, TILE, 3)), 0, 255)
+    return out
+
+
+def terrain_label(terrain):
+    return terrain if isinstance(terrain, str) else "path"
+
+
+def render_autotiles(pair, seed=tileset.SEED):
+    """(ROWS * TILE, COLS * TILE, 4) atlas for one pair: blob_masks() in
+    order, row-major, then a plain outer-terrain tile in the last cell."""
+    inner, outer, rim = PAIRS[pair]
+    masks = blob_masks()
+    alpha = blob_alpha(masks)
+    tiles = np.where(alpha[..., None], terrain_texture(inner, seed), terrain_texture(outer, seed))
+    if rim is not None:
+        tiles[edge_rim(alpha)] = (*rim, 255)
+    cells = np.zeros((ROWS * COLS, TILE, TILE, 4), dtype=np.uint8)
+    cells[:len(masks)] = tiles
+    cells[len(masks)] = terrain_texture(outer, seed)
+    return cells.reshape(ROWS, COLS, TILE, TILE, 4).transpose(0, 2, 1, 3, 4).reshape(ROWS * TILE, COLS * TILE, 4)
+
+
+# ── Godot metadata ──
+
+def bitmask_table():
+    """[(bitmask, (col, row))] for the blob tiles, in atlas order."""
+    return [(mask, (i % COLS, i // COLS)) for i, mask in enumerate(blob_masks())]
+
+
+def tileset_tres(pair, png_path):
+    """TileSet resource with one terrain set (match corners and sides):
+    terrain 0 is the pair's inner terrain, terrain 1 the outer one. Every
+    peering bit is set, to 0 where the bitmask connects and 1 elsewhere."""
+    inner, outer, _ = PAIRS[pair]
+    lines = [
+        '[gd_resource type="TileSet" load_steps=3 format=3]',
+        "",
+        f'[ext_resource type="Texture2D" path="{res_path(png_path)}" id="1"]',
+        "",
+        '[sub_resource type="TileSetAtlasSource" id="TileSetAtlasSource_1"]',
+        'texture = ExtResource("1")',
+        f"texture_region_size = Vector2i({TILE}, {TILE})",
+    ]
+    plain = (len(blob_masks()) % COLS, len(blob_masks()) // COLS)
+    for mask, (col, row) in bitmask_table() + [(None, plain)]:
+        tile = f"{col}:{row}/0"
+        lines += [f"{tile} = 0", f"{tile}/terrain_set = 0", f"{tile}/terrain = {1 if mask is None else 0}"]
+        lines += [f"{tile}/terrains_peering_bit/{name} = {0 if mask and mask & bit else 1}"
+                  for bit, name in PEERING.items()]
+    lines += [
+        "",
+        "[resource]",
+        f"tile_size = Vector2i({TILE}, {TILE})",
+        "terrain_set_0/mode = 0",
+        f'terrain_set_0/terrain_0/name = "{terrain_label(inner)}"',
+        "terrain_set_0/terrain_0/color = Color(0.25, 0.5, 1, 1)",
+        f'terrain_set_0/terrain_1/name = "{terrain_label(outer)}"',
+        "terrain_set_0/terrain_1/color = Color(1, 0.75, 0.25, 1)",
+        'sources/0 = SubResource("TileSetAtlasSource_1")',
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def table_meta(pair, seed):
+    inner, outer, _ = PAIRS[pair]
+    plain = len(blob_masks())
+    return {
+        "pair": pair, "inner": terrain_label(inner), "outer": terrain_label(outer), "seed": seed,
+        "tile_size": TILE, "columns": COLS,
+        "bits": {name: bit for bit, name in PEERING.items()},
+        "tiles": {str(mask): list(coords) for mask, coords in bitmask_table()},
+        "outer_tile": [plain % COLS, plain // COLS],
+    }
+
+
+# ── Build ──
+
+def autotile_fingerprint(pair, seed, indexed=False):
+    return fingerprint(pair, PAIRS[pair], seed, TILE, COLS, ROWS, BORDER, RADIUS, WOBBLE,
+                       tileset.atlas_fingerprint(seed), tileset.atlas_tile, blob_masks, quadrant_cases, corner_masks,
+                       blob_alpha, edge_rim, terrain_texture, render_autotiles, tileset_tres,
+                       table_meta, indexed, *(ENCODER_SOURCES if indexed else ()))
+
+
+def build(pairs=None, seed=tileset.SEED, out_dir=OUT_DIR, cache=None, indexed=False):
+    """Write the PNG, .tres and .json for each pair, skipping fresh ones."""
+    os.makedirs(out_dir, exist_ok=True)
+    for pair in pairs or PAIRS:
+        png_path = os.path.join(out_dir, f"autotile_{pair}.png")
+        key = autotile_fingerprint(pair, seed, indexed)
+        if cache is not None and cache.is_fresh(png_path, key):
+            continue
+        save_png(render_autotiles(pair, seed), png_path, indexed)
+        with open(os.path.join(out_dir, f"autotile_{pair}.tres"), "w") as f:
+            f.write(tileset_tres(pair, png_path))
+        with open(os.path.join(out_dir, f"autotile_{pair}.json"), "w") as f:
+            json.dump(table_meta(pair, seed), f, indent=1)
+            f.write("\n")
+        if cache is not None:
+            cache.record(png_path, key)
+        print(f"Created autotile_{pair}.png ({COLS * TILE}x{ROWS * TILE}, {len(blob_masks())} blob tiles)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     epilog=__doc__.split("\n", 2)[2],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pairs", nargs="*", help=f"pairs to build (default: all of {', '.join(PAIRS)})")
+    parser.add_argument("--seed", type=int, default=tileset.SEED)
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="rebuild regardless of the build manifest")
+    parser.add_argument("--indexed-png", action="store_true",
+                        help="write size-optimized PNGs (palette-indexed when possible)")
+    args = parser.parse_args(argv)
+
+    unknown = [pair for pair in args.pairs if pair not in PAIRS]
+    if unknown:
+        parser.error(f"unknown pair(s): {', '.join(unknown)}")
+    # The .tres files reference their PNGs by res:// path
+    try:
+        res_path(args.out_dir)
+    except ValueError as e:
+        parser.error(str(e))
+    cache = BuildCache(enabled=not args.no_cache)
+    start = time.perf_counter()
+    build(args.pairs, args.seed, args.out_dir, cache, args.indexed_png)
+    cache.save()
+    cache.report()
+    print(f"Total: {(time.perf_counter() - start) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
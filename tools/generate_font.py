@@ -1,10 +1,26 @@
 #!/usr/bin/env python3
 """Generate a simple 8x8 pixel bitmap font PNG for Game Pikanad.
-Creates a 128-character ASCII font atlas (16 cols x 8 rows) at 128x64 pixels.
+Creates a 128-character ASCII font atlas (16 cols x 8 rows) at 128x64 pixels,
+plus pixel_font.fnt: BMFont metrics (tight glyph boxes, advances, kerning)
+over the same atlas, which Godot imports as a proportional FontFile.
+
+--scales 1,2,3 also writes pixel_font_2x/_3x atlases and metrics from the
+same bitmaps. --extended adds pixel_font_ext_{N}x.fnt per scale: Latin-1
+and Latin Extended-A (accents composed onto the ASCII glyphs) packed into
+power-of-two pages, with the .fnt as the codepoint lookup table.
 """
 
-from PIL import Image, ImageDraw
+from PIL import Image
+import argparse
+import functools
+import glob
+import numpy as np
 import os
+import unicodedata
+
+from asset_cache import BuildCache, fingerprint
+from pack_sprite_atlas import pack
+from png_output import ENCODER_SOURCES, save_png
 
 OUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "fonts")
 os.makedirs(OUT_DIR, exist_ok=True)
@@ -12,6 +28,17 @@ os.makedirs(OUT_DIR, exist_ok=True)
 CHAR_W, CHAR_H = 8, 8
 COLS, ROWS = 16, 8  # 128 chars total
 IMG_W, IMG_H = COLS * CHAR_W, ROWS * CHAR_H
+GLYPH_W, GLYPH_H = 5, 7
+
+# Proportional metrics: 1px between glyphs, kerning never tightens a pair
+# by more than MAX_KERN or below a 1px gap (diagonal neighbours included)
+TRACKING = 1
+SPACE_ADVANCE = 3
+MAX_KERN = 1
+KERN_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,!?'-"
+
+# Largest page side of a packed extended-codepoint atlas, per unit of scale
+MAX_PAGE = 256
 
 # Simple 5x7 pixel font glyphs (stored as lists of strings)
 # Each glyph is 5 pixels wide, 7 pixels tall, padded to 8x8
@@ -632,32 +659,491 @@ GLYPHS.update({
 })
 
 
-def generate_font():
-    img = Image.new("RGBA", (IMG_W, IMG_H), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+def _rotated(rows, height):
+    """Top `height` rows of a glyph turned 180 degrees (for inverted ! and ?)."""
+    return [row[::-1] for row in rows[:height][::-1]] + ["     "] * (GLYPH_H - height)
 
-    for ascii_code in range(128):
-        char = chr(ascii_code)
-        col = ascii_code % COLS
-        row = ascii_code // COLS
-        ox = col * CHAR_W
-        oy = row * CHAR_H
 
-        glyph = GLYPHS.get(char)
-        if not glyph:
-            continue
+# Latin-1 glyphs that cannot be composed from an ASCII letter and a mark.
+# Lowercase forms (æ, ø, ð, þ, ł) alias these like the ASCII letters do.
+EXTRA_GLYPHS = {
+    '¡': _rotated(GLYPHS['!'], 6),
+    '¿': _rotated(GLYPHS['?'], 5),
+    '«': [
+        "     ",
+        "  # #",
+        " # # ",
+        "  # #",
+        "     ",
+        "     ",
+        "     ",
+    ],
+    '»': [
+        "     ",
+        "# #  ",
+        " # # ",
+        "# #  ",
+        "     ",
+        "     ",
+        "     ",
+    ],
+    '°': [
+        "  #  ",
+        " # # ",
+        "  #  ",
+        "     ",
+        "     ",
+        "     ",
+        "     ",
+    ],
+    '·': [
+        "     ",
+        "     ",
+        "  #  ",
+        "     ",
+        "     ",
+        "     ",
+        "     ",
+    ],
+    '×': [
+        "     ",
+        " # # ",
+        "  #  ",
+        " # # ",
+        "     ",
+        "     ",
+        "     ",
+    ],
+    '£': [
+        "  ## ",
+        " #   ",
+        "#### ",
+        " #   ",
+        "#####",
+        "     ",
+        "     ",
+    ],
+    'ß': [
+        " ##  ",
+        "#  # ",
+        "# #  ",
+        "#  # ",
+        "# ## ",
+        "#    ",
+        "     ",
+    ],
+    'Æ': [
+        " ####",
+        "# #  ",
+        "#### ",
+        "# #  ",
+        "# ###",
+        "     ",
+        "     ",
+    ],
+    'Ø': [
+        " ### ",
+        "#  ##",
+        "# # #",
+        "##  #",
+        " ### ",
+        "     ",
+        "     ",
+    ],
+    'Ð': [
+        "###  ",
+        " #  #",
+        "### #",
+        " #  #",
+        "###  ",
+        "     ",
+        "     ",
+    ],
+    '÷': [
+        "  #  ",
+        "     ",
+        "#####",
+        "     ",
+        "  #  ",
+        "     ",
+        "     ",
+    ],
+    'Œ': [
+        " ####",
+        "# #  ",
+        "# ###",
+        "# #  ",
+        " ####",
+        "     ",
+        "     ",
+    ],
+    'Þ': [
+        "#    ",
+        "#### ",
+        "#   #",
+        "#### ",
+        "#    ",
+        "     ",
+        "     ",
+    ],
+    'Ł': [
+        "#    ",
+        "# #  ",
+        "##   ",
+        "#    ",
+        "#####",
+        "     ",
+        "     ",
+    ],
+}
+
+EXTRA_GLYPHS['Đ'] = EXTRA_GLYPHS['Ð']
+
+# Combining marks (Unicode decomposition) -> (position, 2-row art). "above"
+# marks fill the MARK_H rows over the cap height, "below" marks the two
+# rows under the baseline.
+MARK_H = 2
+MARKS = {
+    "\u0300": ("above", [" #   ", "  #  "]),  # grave
+    "\u0301": ("above", ["   # ", "  #  "]),  # acute
+    "\u0302": ("above", ["  #  ", " # # "]),  # circumflex
+    "\u0303": ("above", [" # # ", "# #  "]),  # tilde
+    "\u0304": ("above", ["     ", " ### "]),  # macron
+    "\u0306": ("above", ["#   #", " ### "]),  # breve
+    "\u0307": ("above", ["     ", "  #  "]),  # dot
+    "\u0308": ("above", ["     ", " # # "]),  # diaeresis
+    "\u030a": ("above", [" ### ", " # # "]),  # ring
+    "\u030b": ("above", ["  # #", " # # "]),  # double acute
+    "\u030c": ("above", [" # # ", "  #  "]),  # caron
+    "\u0327": ("below", ["  #  ", " #   "]),  # cedilla
+    "\u0328": ("below", ["  #  ", "   ##"]),  # ogonek
+}
+EXT_H = MARK_H + GLYPH_H
+BASELINE = 5  # cap height: glyph rows below it are descender space
+
+# Default sparse set for --extended: ASCII, Latin-1 Supplement, Latin Extended-A
+EXTENDED_CHARS = "".join(chr(code) for code in [*range(0x20, 0x7F), *range(0xA0, 0x180)])
+
+
+def _art_bits(rows):
+    """Row bitmasks for string art (bit GLYPH_W-1 is the leftmost column)."""
+    return tuple(sum(1 << (GLYPH_W - 1 - x) for x, pixel in enumerate(row) if pixel == '#')
+                 for row in rows)
+
+
+@functools.lru_cache(maxsize=None)
+def glyph_bits():
+    """char -> GLYPH_H row bitmasks, converted from the GLYPHS and
+    EXTRA_GLYPHS string art on first use."""
+    return {char: _art_bits(rows) for char, rows in {**GLYPHS, **EXTRA_GLYPHS}.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def extended_bits(char):
+    """EXT_H row bitmasks for char, with MARK_H rows of headroom for accents:
+    a drawn glyph, a base glyph plus the marks of its Unicode decomposition,
+    or the glyph of its uppercase form. None if it cannot be drawn."""
+    bits = glyph_bits()
+    headroom = (0,) * MARK_H
+    if char in bits:
+        return headroom + bits[char]
+    base, *marks = unicodedata.normalize("NFD", char)
+    if (marks and base in bits and all(m in MARKS for m in marks)
+            and sum(MARKS[m][0] == "above" for m in marks) <= 1):
+        rows = list(headroom + bits[base])
+        for mark in marks:
+            position, art = MARKS[mark]
+            start = 0 if position == "above" else MARK_H + BASELINE
+            for i, row in enumerate(_art_bits(art)):
+                rows[start + i] |= row
+        return tuple(rows)
+    upper = char.upper()
+    if len(upper) == 1 and upper != char:
+        return extended_bits(upper)
+    return None
+
+
+def _unpack(table, height):
+    table = np.array(table, dtype=np.uint8).reshape(-1, height)
+    shifts = np.arange(GLYPH_W - 1, -1, -1, dtype=np.uint8)
+    return ((table[:, :, None] >> shifts) & 1).astype(bool)
+
 
-        for gy, glyph_row in enumerate(glyph):
-            for gx, pixel in enumerate(glyph_row):
-                if pixel == '#':
-                    # Draw pixel with slight padding (1px left offset for centering)
-                    draw.point((ox + gx + 1, oy + gy), fill=(255, 255, 255, 255))
+def glyph_masks(chars):
+    """(len(chars), GLYPH_H, GLYPH_W) bool array; characters without a glyph are blank."""
+    bits = glyph_bits()
+    blank = (0,) * GLYPH_H
+    return _unpack([bits.get(char, blank) for char in chars], GLYPH_H)
 
-    path = os.path.join(OUT_DIR, "pixel_font.png")
-    img.save(path)
-    print(f"Created pixel_font.png ({IMG_W}x{IMG_H})")
+
+def extended_masks(chars):
+    """(len(chars), EXT_H, GLYPH_W) bool array of extended_bits."""
+    return _unpack([extended_bits(char) or (0,) * EXT_H for char in chars], EXT_H)
+
+
+def render_font(scale=1):
+    """Rasterize the glyph atlas to an RGBA image in one pass, each font
+    pixel drawn as a scale x scale block."""
+    cells = np.zeros((COLS * ROWS, CHAR_H, CHAR_W), dtype=bool)
+    # 1px left offset centers the 5px glyph in its 8px cell
+    cells[:, :GLYPH_H, 1:1 + GLYPH_W] = glyph_masks([chr(code) for code in range(COLS * ROWS)])
+    mask = cells.reshape(ROWS, COLS, CHAR_H, CHAR_W).transpose(0, 2, 1, 3).reshape(IMG_H, IMG_W)
+    mask = mask.repeat(scale, axis=0).repeat(scale, axis=1)
+    rgba = np.zeros(mask.shape + (4,), dtype=np.uint8)
+    rgba[mask] = 255
+    return Image.fromarray(rgba, "RGBA")
+
+
+def glyph_metrics(chars, masks=None):
+    """Per character: tight ink box (x, y, w, h) within its glyph cell and
+    advance. The box is trimmed to the ink and the pen starts at its left
+    edge, so there is no separate left bearing. Blank glyphs get
+    SPACE_ADVANCE and an empty box. masks defaults to glyph_masks(chars)."""
+    masks = glyph_masks(chars) if masks is None else masks
+    height = masks.shape[1]
+    cols, rows = masks.any(axis=1), masks.any(axis=2)
+    inked = cols.any(axis=1)
+    x0, x1 = cols.argmax(axis=1), GLYPH_W - cols[:, ::-1].argmax(axis=1)
+    y0, y1 = rows.argmax(axis=1), height - rows[:, ::-1].argmax(axis=1)
+    metrics = {}
+    for i, char in enumerate(chars):
+        if inked[i]:
+            w = int(x1[i] - x0[i])
+            metrics[char] = {"box": (int(x0[i]), int(y0[i]), w, int(y1[i] - y0[i])),
+                             "advance": w + TRACKING}
+        else:
+            metrics[char] = {"box": (0, 0, 0, 0), "advance": SPACE_ADVANCE}
+    return metrics
+
+
+def kerning_pairs(chars=KERN_CHARS, masks=None):
+    """{(left, right): amount} for pairs of inked glyphs whose closest pixels
+    (same or adjacent rows) are more than 1px apart at the default advance.
+    masks defaults to glyph_masks(chars)."""
+    chars = list(chars)
+    masks = glyph_masks(chars) if masks is None else masks
+    keep = [i for i, char in enumerate(chars) if masks[i].any() and chars.index(char) == i]
+    chars, masks = [chars[i] for i in keep], masks[keep]
+    far = 4 * GLYPH_W
+    has = masks.any(axis=2)
+    x0 = masks.any(axis=1).argmax(axis=1)
+    left = np.where(has, masks.argmax(axis=2), far) - x0[:, None]
+    right = np.where(has, GLYPH_W - 1 - masks[:, :, ::-1].argmax(axis=2), -far) - x0[:, None]
+    metrics = glyph_metrics(chars, masks)
+    advance = np.array([metrics[c]["advance"] for c in chars])
+    # The right glyph's left edge over rows y-1..y+1, so diagonals count as touching
+    padded = np.pad(left, ((0, 0), (1, 1)), constant_values=far)
+    left = np.minimum(np.minimum(padded[:, :-2], padded[:, 1:-1]), padded[:, 2:])
+    gap = (advance[:, None, None] + left[None, :, :] - right[:, None, :] - 1).min(axis=2)
+    amount = np.clip(gap - 1, 0, MAX_KERN)
+    return {(chars[a], chars[b]): -int(amount[a, b]) for a, b in zip(*np.nonzero(amount))}
+
+
+def bmfont_text(glyphs, kerning, pages, line_height, base, scale=1):
+    """BMFont text descriptor (Godot imports .fnt as a FontFile). glyphs maps
+    char -> (page, x, y, glyph_metrics entry), with x, y the atlas position
+    of its ink box; pages is [(file, width, height)]. Atlas positions are in
+    output pixels, metrics in font pixels (multiplied by scale). Boxes are
+    trimmed to the ink, so every xoffset is 0."""
+    lines = [
+        f'info face="Pikanad Pixel" size={CHAR_H * scale} bold=0 italic=0 charset="" unicode=1 '
+        f'stretchH=100 smooth=0 aa=1 padding=0,0,0,0 spacing={TRACKING * scale},{TRACKING * scale}',
+        f"common lineHeight={line_height * scale} base={base * scale} "
+        f"scaleW={pages[0][1]} scaleH={pages[0][2]} pages={len(pages)} packed=0",
+    ]
+    lines += [f'page id={i} file="{file}"' for i, (file, _, _) in enumerate(pages)]
+    lines.append(f"chars count={len(glyphs)}")
+    for char, (page, x, y, m) in glyphs.items():
+        _, by, w, h = m["box"]
+        lines.append(f"char id={ord(char)} x={x} y={y} width={w * scale} "
+                     f"height={h * scale} xoffset=0 yoffset={by * scale} "
+                     f"xadvance={m['advance'] * scale} page={page} chnl=15")
+    lines.append(f"kernings count={len(kerning)}")
+    for (first, second), amount in kerning.items():
+        lines.append(f"kerning first={ord(first)} second={ord(second)} amount={amount * scale}")
+    return "\n".join(lines) + "\n"
+
+
+def font_chars():
+    """Characters in the ASCII atlas that have a glyph."""
+    return [chr(code) for code in range(COLS * ROWS) if chr(code) in GLYPHS]
+
+
+def scaled_name(base, scale, ext):
+    """pixel_font.png at 1x, pixel_font_2x.png etc. above it."""
+    return f"{base}{'' if scale == 1 else f'_{scale}x'}.{ext}"
+
+
+def generate_metrics(out_dir=OUT_DIR, scale=1):
+    """Write the BMFont descriptor for the ASCII grid atlas at scale."""
+    path = os.path.join(out_dir, scaled_name("pixel_font", scale, "fnt"))
+    chars = font_chars()
+    metrics = glyph_metrics(chars)
+    glyphs = {}
+    for char, m in metrics.items():
+        code = ord(char)
+        x, y, _, _ = m["box"]
+        # Glyphs sit 1px in from the left of their cell
+        glyphs[char] = (0, ((code % COLS) * CHAR_W + 1 + x) * scale,
+                        ((code // COLS) * CHAR_H + y) * scale, m)
+    kerning = kerning_pairs([c for c in KERN_CHARS if c in chars])
+    page = (scaled_name("pixel_font", scale, "png"), IMG_W * scale, IMG_H * scale)
+    with open(path, "w") as f:
+        f.write(bmfont_text(glyphs, kerning, [page], CHAR_H, BASELINE, scale))
+    print(f"Created {os.path.basename(path)} ({len(chars)} glyphs, {len(kerning)} kerning pairs)")
+    return path
+
+
+def generate_font(out_dir=OUT_DIR, indexed=False, scale=1):
+    filename = scaled_name("pixel_font", scale, "png")
+    path = os.path.join(out_dir, filename)
+    save_png(render_font(scale), path, indexed)
+    print(f"Created {filename} ({IMG_W * scale}x{IMG_H * scale})")
+    return path
+
+
+def extended_chars(chars=EXTENDED_CHARS):
+    """The drawable subset of chars, in order."""
+    return [char for char in dict.fromkeys(chars) if extended_bits(char) is not None]
+
+
+def generate_extended(out_dir=OUT_DIR, scale=1, chars=EXTENDED_CHARS, indexed=False,
+                      max_page=MAX_PAGE):
+    """Pack the ink boxes of every drawable character in chars into
+    power-of-two pages of up to max_page * scale and write
+    pixel_font_ext_{scale}x.fnt as the codepoint lookup table. Kerning
+    covers the KERN_CHARS pairs only. Returns the .fnt path."""
+    chars = extended_chars(chars)
+    masks = extended_masks(chars)
+    metrics = glyph_metrics(chars, masks)
+    inked = [char for char in chars if metrics[char]["box"][2]]
+    sizes = [(metrics[c]["box"][2] * scale, metrics[c]["box"][3] * scale) for c in inked]
+    page_sizes, where = pack(sizes, max_page * scale, padding=scale)
+
+    base = f"pixel_font_ext_{scale}x"
+    # BMFont pages share one size; the first page is the largest
+    page_w, page_h = page_sizes[0]
+    buffers = [np.zeros((page_h, page_w), dtype=bool) for _ in page_sizes]
+    glyphs = {char: (0, 0, 0, metrics[char]) for char in chars}
+    for i, char in enumerate(inked):
+        page, x, y = where[i]
+        bx, by, w, h = metrics[char]["box"]
+        ink = masks[chars.index(char), by:by + h, bx:bx + w]
+        buffers[page][y:y + h * scale, x:x + w * scale] = ink.repeat(scale, axis=0).repeat(scale, axis=1)
+        glyphs[char] = (page, x, y, metrics[char])
+
+    for stale in glob.glob(os.path.join(out_dir, f"{base}_*.png")):
+        os.remove(stale)
+    pages = []
+    for page, buf in enumerate(buffers):
+        rgba = np.zeros(buf.shape + (4,), dtype=np.uint8)
+        rgba[buf] = 255
+        filename = f"{base}_{page}.png"
+        save_png(rgba, os.path.join(out_dir, filename), indexed)
+        pages.append((filename, buf.shape[1], buf.shape[0]))
+
+    kern_chars = [c for c in KERN_CHARS if c in chars]
+    kerning = kerning_pairs(kern_chars, extended_masks(kern_chars))
+    path = os.path.join(out_dir, f"{base}.fnt")
+    with open(path, "w") as f:
+        f.write(bmfont_text(glyphs, kerning, pages, EXT_H + 1, MARK_H + BASELINE, scale))
+    print(f"Created {base}.fnt ({len(chars)} glyphs on {len(pages)} page(s), "
+          f"{len(kerning)} kerning pairs)")
     return path
 
 
+def font_fingerprint(indexed=False, scale=1):
+    return fingerprint(GLYPHS, CHAR_W, CHAR_H, COLS, ROWS, glyph_bits, glyph_masks, _unpack,
+                       render_font, generate_font, scale, indexed,
+                       *(ENCODER_SOURCES if indexed else ()))
+
+
+def metrics_fingerprint(scale=1):
+    return fingerprint(GLYPHS, CHAR_W, CHAR_H, COLS, ROWS, BASELINE, TRACKING, SPACE_ADVANCE,
+                       MAX_KERN, KERN_CHARS, glyph_bits, glyph_masks, _unpack, glyph_metrics, kerning_pairs,
+                       bmfont_text, font_chars, scaled_name, generate_metrics, scale)
+
+
+def extended_fingerprint(scale=1, chars=EXTENDED_CHARS, indexed=False, max_page=MAX_PAGE):
+    return fingerprint(GLYPHS, EXTRA_GLYPHS, MARKS, MARK_H, BASELINE, chars, TRACKING,
+                       SPACE_ADVANCE, MAX_KERN,
+                       KERN_CHARS, _art_bits, glyph_bits, extended_bits, _unpack, extended_masks,
+                       glyph_metrics, kerning_pairs, bmfont_text, extended_chars, pack,
+                       generate_extended, scale, max_page, indexed,
+                       *(ENCODER_SOURCES if indexed else ()))
+
+
+def bmfont_pages(path):
+    """Paths of the page images a .fnt names, next to it; [] if it is missing."""
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    return [os.path.join(os.path.dirname(path), line.split('file="', 1)[1].rstrip('"'))
+            for line in lines if line.startswith("page id=")]
+
+
+def build(out_dir=OUT_DIR, cache=None, indexed=False, scales=(1,), extended=False):
+    """Build the ASCII atlas and its .fnt metrics at each scale (plus the
+    packed extended-codepoint fonts if asked) into out_dir, skipping
+    whatever the cache says is current."""
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = []
+    for scale in scales:
+        # (path, key, generate, whether the path's .fnt pages are its outputs too)
+        outputs += [
+            (os.path.join(out_dir, scaled_name("pixel_font", scale, "png")),
+             font_fingerprint(indexed, scale),
+             functools.partial(generate_font, out_dir, indexed, scale), False),
+            (os.path.join(out_dir, scaled_name("pixel_font", scale, "fnt")),
+             metrics_fingerprint(scale),
+             functools.partial(generate_metrics, out_dir, scale), False),
+        ]
+        if extended:
+            outputs.append((os.path.join(out_dir, f"pixel_font_ext_{scale}x.fnt"),
+                            extended_fingerprint(scale, indexed=indexed),
+                            functools.partial(generate_extended, out_dir, scale, indexed=indexed),
+                            True))
+    for path, key, generate, paged in outputs:
+        pages = bmfont_pages(path) if paged else []
+        if cache is not None and cache.all_fresh([path, *pages], key):
+            continue
+        generate()
+        if cache is not None:
+            # Rewritten pages may differ in number from the old ones
+            for output in [path, *(bmfont_pages(path) if paged else [])]:
+                cache.record(output, key)
+
+
+def parse_scales(text):
+    scales = [int(part) for part in text.split(",")]
+    if any(scale < 1 for scale in scales):
+        raise ValueError("scales must be positive integers")
+    return list(dict.fromkeys(scales))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--no-cache", action="store_true",
+                        help="rebuild regardless of the build manifest")
+    parser.add_argument("--indexed-png", action="store_true",
+                        help="write a size-optimized palette PNG")
+    parser.add_argument("--scales", default="1",
+                        help="comma-separated integer scales to build, e.g. 1,2,3")
+    parser.add_argument("--extended", action="store_true",
+                        help="also build packed atlases for Latin-1 and Latin Extended-A")
+    args = parser.parse_args(argv)
+    try:
+        scales = parse_scales(args.scales)
+    except ValueError as e:
+        parser.error(str(e))
+
+    cache = BuildCache(enabled=not args.no_cache)
+    build(cache=cache, indexed=args.indexed_png, scales=scales, extended=args.extended)
+    cache.save()
+    cache.report()
+
+
 if __name__ == "__main__":
-    generate_font()
+    main()
@@ -7,8 +7,15 @@ Creates sprite sheets for:
 """
 
 from PIL import Image, ImageDraw
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import functools
+import numpy as np
 import os
 
+from asset_cache import BuildCache, fingerprint
+from png_output import ENCODER_SOURCES, save_png
+
 OUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "sprites")
 os.makedirs(OUT_DIR, exist_ok=True)
 
@@ -73,13 +80,88 @@ CREATURE_PALETTES = {
 }
 
 
+# ── Raster canvas ───────────────────────────────────────────────────────────
+
+class Canvas:
+    """RGBA pixel buffer backed by a (h, w, 4) uint8 ndarray.
+
+    Drop-in target for the drawers below: a rect is one slice assignment and
+    the buffer is converted to a PIL image once, at save time. Out-of-bounds
+    writes are clipped, matching ImageDraw.point.
+    """
+
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        self.pixels = np.zeros((height, width, 4), dtype=np.uint8)
+
+    def rect(self, x, y, w, h, color):
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x0 < x1 and y0 < y1:
+            self.pixels[y0:y1, x0:x1] = color if len(color) == 4 else (*color, 255)
+
+    def resize(self, size):
+        """Nearest-neighbour resize with the same sampling as Image.NEAREST."""
+        w, h = size
+        xs = _nearest_index(self.width, w)
+        ys = _nearest_index(self.height, h)
+        out = Canvas(w, h)
+        out.pixels = self.pixels[ys[:, None], xs[None, :]]
+        return out
+
+    def paste(self, src, pos, masked=False):
+        """Copy src at pos, clipped. With masked=True only opaque source pixels
+        are copied (sprites use 1-bit alpha)."""
+        x, y = pos
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + src.width, self.width), min(y + src.height, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        part = src.pixels[y0 - y:y1 - y, x0 - x:x1 - x]
+        dst = self.pixels[y0:y1, x0:x1]
+        if masked:
+            opaque = part[..., 3] > 0
+            dst[opaque] = part[opaque]
+        else:
+            dst[...] = part
+
+    def to_image(self):
+        return Image.fromarray(self.pixels, "RGBA")
+
+    def save(self, path, indexed=False):
+        save_png(self.to_image(), path, indexed)
+
+
+@functools.lru_cache(maxsize=None)
+def _nearest_index(src_len, dst_len):
+    """Source index for each destination pixel of a NEAREST resize.
+
+    Taken from Pillow itself (an index ramp resized once) so the mapping
+    matches its fixed-point stepping exactly.
+    """
+    ramp = Image.frombytes("I", (src_len, 1), np.arange(src_len, dtype="<i4").tobytes())
+    scaled = ramp.resize((dst_len, 1), Image.NEAREST)
+    return np.frombuffer(scaled.tobytes(), dtype="<i4").astype(np.intp)
+
+
+def get_draw(img):
+    """Return the draw target for img: the Canvas itself, or an ImageDraw."""
+    return img if isinstance(img, Canvas) else ImageDraw.Draw(img)
+
+
 def px(draw, x, y, color):
     """Draw a single pixel."""
-    draw.point((x, y), fill=color)
+    if isinstance(draw, Canvas):
+        draw.rect(x, y, 1, 1, color)
+    else:
+        draw.point((x, y), fill=color)
 
 
 def draw_rect(draw, x, y, w, h, color):
     """Draw a filled rectangle."""
+    if isinstance(draw, Canvas):
+        draw.rect(x, y, w, h, color)
+        return
     for dy in range(h):
         for dx in range(w):
             px(draw, x + dx, y + dy, color)
@@ -93,7 +175,7 @@ def draw_player_frame(img, frame_x, direction, is_walk, walk_phase):
     is_walk: whether this is a walk frame
     walk_phase: 0 or 1 for leg alternation
     """
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = PLAYER_COLORS
     ox = frame_x  # x offset
 
@@ -182,39 +264,34 @@ def draw_player_frame(img, frame_x, direction, is_walk, walk_phase):
         draw_rect(draw, lx + 5, ly + 4, 3, 2, c["shoes"])
 
 
-def generate_player_sheet():
-    """Generate player sprite sheet: 4 rows (down, up, left, right) x 4 cols (idle1, idle2, walk1, walk2).
+def render_player_sheet():
+    """Player sprite sheet: 4 rows (down, up, left, right) x 4 cols (idle1, idle2, walk1, walk2).
     Total: 128x128 (4x4 frames of 32x32)."""
-    sheet = Image.new("RGBA", (128, 128), (0, 0, 0, 0))
+    sheet = Canvas(128, 128)
     directions = ["down", "up", "left", "right"]
 
     for row, direction in enumerate(directions):
-        # Frame 0: idle1
+        # Frames 0-3 (idle1, idle2, walk1, walk2) are first drawn over the
+        # top row; later directions overlap the row-0 strip this way.
         draw_player_frame(sheet, 0, direction, False, 0)
-        frame0 = sheet.crop((0, 0, 32, 32))
-
-        # Frame 1: idle2 (slight bob)
         draw_player_frame(sheet, 32, direction, False, 1)
-        frame1 = sheet.crop((32, 0, 64, 32))
-
-        # Frame 2: walk1
         draw_player_frame(sheet, 64, direction, True, 0)
-        frame2 = sheet.crop((64, 0, 96, 32))
-
-        # Frame 3: walk2
         draw_player_frame(sheet, 96, direction, True, 1)
-        frame3 = sheet.crop((96, 0, 128, 32))
 
         # Clear and redraw properly per-row
-        sheet_row = Image.new("RGBA", (128, 32), (0, 0, 0, 0))
+        sheet_row = Canvas(128, 32)
         draw_player_frame(sheet_row, 0, direction, False, 0)
         draw_player_frame(sheet_row, 32, direction, False, 1)
         draw_player_frame(sheet_row, 64, direction, True, 0)
         draw_player_frame(sheet_row, 96, direction, True, 1)
 
         sheet.paste(sheet_row, (0, row * 32))
+    return sheet
+
 
-    sheet.save(os.path.join(OUT_DIR, "player_sheet.png"))
+def generate_player_sheet(out_dir=OUT_DIR, indexed=False):
+    """Generate player_sheet.png (see render_player_sheet)."""
+    render_player_sheet().save(os.path.join(out_dir, "player_sheet.png"), indexed)
     print("Created player_sheet.png (128x128)")
 
 
@@ -222,7 +299,7 @@ def generate_player_sheet():
 
 def draw_flamepup_overworld(img, ox, oy, frame):
     """Draw flamepup at 32x32 with flame animation."""
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["flamepup"]
 
     bounce = -1 if frame == 1 else 0
@@ -264,7 +341,7 @@ def draw_flamepup_overworld(img, ox, oy, frame):
 
 
 def draw_aquafin_overworld(img, ox, oy, frame):
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["aquafin"]
     bounce = -1 if frame == 1 else 0
 
@@ -303,7 +380,7 @@ def draw_aquafin_overworld(img, ox, oy, frame):
 
 
 def draw_thornsprout_overworld(img, ox, oy, frame):
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["thornsprout"]
     bounce = -1 if frame == 1 else 0
 
@@ -342,7 +419,7 @@ def draw_thornsprout_overworld(img, ox, oy, frame):
 
 
 def draw_zephyrix_overworld(img, ox, oy, frame):
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["zephyrix"]
     bounce = -1 if frame == 1 else 0
 
@@ -382,7 +459,7 @@ def draw_zephyrix_overworld(img, ox, oy, frame):
 
 
 def draw_stoneling_overworld(img, ox, oy, frame):
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["stoneling"]
     bounce = -1 if frame == 1 else 0
 
@@ -535,7 +612,7 @@ CREATURE_PALETTES["boulderkin"] = {
 
 def draw_blazefox_overworld(img, ox, oy, frame):
     """Blazefox: sleek fiery fox with flaming mane."""
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["blazefox"]
     bounce = -1 if frame == 1 else 0
 
@@ -584,7 +661,7 @@ def draw_blazefox_overworld(img, ox, oy, frame):
 
 def draw_pyrodrake_overworld(img, ox, oy, frame):
     """Pyrodrake: small fierce dragon with wings and horns."""
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["pyrodrake"]
     bounce = -1 if frame == 1 else 0
 
@@ -632,7 +709,7 @@ def draw_pyrodrake_overworld(img, ox, oy, frame):
 
 def draw_tidecrab_overworld(img, ox, oy, frame):
     """Tidecrab: wide crab with big claws."""
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["tidecrab"]
     bounce = -1 if frame == 1 else 0
 
@@ -676,7 +753,7 @@ def draw_tidecrab_overworld(img, ox, oy, frame):
 
 def draw_tsunariel_overworld(img, ox, oy, frame):
     """Tsunariel: ethereal water spirit with flowing hair."""
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["tsunariel"]
     bounce = -1 if frame == 1 else 0
 
@@ -717,7 +794,7 @@ def draw_tsunariel_overworld(img, ox, oy, frame):
 
 def draw_vinewhisker_overworld(img, ox, oy, frame):
     """Vinewhisker: cat-like creature with vine whiskers."""
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["vinewhisker"]
     bounce = -1 if frame == 1 else 0
 
@@ -765,7 +842,7 @@ def draw_vinewhisker_overworld(img, ox, oy, frame):
 
 def draw_floravine_overworld(img, ox, oy, frame):
     """Floravine: vine creature with a flower on its head."""
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["floravine"]
     bounce = -1 if frame == 1 else 0
 
@@ -810,7 +887,7 @@ def draw_floravine_overworld(img, ox, oy, frame):
 
 def draw_elderoak_overworld(img, ox, oy, frame):
     """Elderoak: majestic tree creature (legendary). Larger presence."""
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["elderoak"]
     bounce = -1 if frame == 1 else 0
 
@@ -858,7 +935,7 @@ def draw_elderoak_overworld(img, ox, oy, frame):
 
 def draw_breezeling_overworld(img, ox, oy, frame):
     """Breezeling: tiny wind sprite, light and floaty."""
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["breezeling"]
     bounce = -2 if frame == 1 else 0  # more floaty bounce
 
@@ -905,7 +982,7 @@ def draw_breezeling_overworld(img, ox, oy, frame):
 
 def draw_stormraptor_overworld(img, ox, oy, frame):
     """Stormraptor: fierce storm bird with lightning markings."""
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["stormraptor"]
     bounce = -1 if frame == 1 else 0
 
@@ -957,7 +1034,7 @@ def draw_stormraptor_overworld(img, ox, oy, frame):
 
 def draw_boulderkin_overworld(img, ox, oy, frame):
     """Boulderkin: living boulder golem with mossy patches."""
-    draw = ImageDraw.Draw(img)
+    draw = get_draw(img)
     c = CREATURE_PALETTES["boulderkin"]
     bounce = -1 if frame == 1 else 0
 
@@ -1024,72 +1101,308 @@ CREATURE_DRAWERS = {
 }
 
 
+# ── Frame cache ─────────────────────────────────────────────────────────────
+
+# (creature, frame, palette) -> rendered 32x32 Canvas, shared by all outputs
+_FRAME_CACHE = {}
+
+
+def creature_frame(name, frame):
+    """Rendered 32x32 frame, rasterized once per build and reused by the
+    single, overworld and battle outputs. Treat the result as read-only."""
+    key = (name, frame, tuple(sorted(CREATURE_PALETTES[name].items())))
+    canvas = _FRAME_CACHE.get(key)
+    if canvas is None:
+        canvas = Canvas(32, 32)
+        CREATURE_DRAWERS[name](canvas, 0, 0, frame)
+        _FRAME_CACHE[key] = canvas
+    return canvas
+
+
+def prime_frames(name, frames):
+    """Seed the frame cache with pre-rasterized (F, 32, 32, 4) frames, e.g.
+    from sprite_shapes.compile_frames, so the drawer is not called."""
+    palette = tuple(sorted(CREATURE_PALETTES[name].items()))
+    for frame, pixels in enumerate(frames):
+        canvas = Canvas(32, 32)
+        canvas.pixels[:] = pixels
+        _FRAME_CACHE[(name, frame, palette)] = canvas
+
+
+def render_overworld_sheet(name):
+    """2-frame idle sheet (64x32)."""
+    sheet = Canvas(64, 32)
+    sheet.paste(creature_frame(name, 0), (0, 0))   # frame 0
+    sheet.paste(creature_frame(name, 1), (32, 0))  # frame 1
+    return sheet
+
+
 def generate_creature_overworld_sheets():
     """Generate 2-frame idle sheets for each creature (64x32)."""
-    for name, drawer in CREATURE_DRAWERS.items():
-        sheet = Image.new("RGBA", (64, 32), (0, 0, 0, 0))
-        drawer(sheet, 0, 0, 0)   # frame 0
-        drawer(sheet, 32, 0, 1)  # frame 1
+    for name in CREATURE_DRAWERS:
         path = os.path.join(OUT_DIR, f"{name}_overworld.png")
-        sheet.save(path)
+        render_overworld_sheet(name).save(path)
         print(f"Created {name}_overworld.png (64x32)")
 
 
 # ── Battle portraits (48x48) ───────────────────────────────────────────────
 
-def scale_draw(draw_func, img, ox, oy, frame, scale=1.5):
-    """Draw at 32x32 then scale up to 48x48."""
-    temp = Image.new("RGBA", (32, 32), (0, 0, 0, 0))
-    draw_func(temp, 0, 0, frame)
-    scaled = temp.resize((48, 48), Image.NEAREST)
-    img.paste(scaled, (ox, oy), scaled)
+def scale_draw(frame_img, img, ox, oy, scale=1.5):
+    """Scale a 32x32 frame up to 48x48 and paste it."""
+    scaled = frame_img.resize((48, 48))
+    img.paste(scaled, (ox, oy), masked=True)
 
 
-def draw_attack_frame(draw_func, img, ox, oy, phase):
-    """Draw an attack frame: creature lunges forward."""
-    temp = Image.new("RGBA", (32, 32), (0, 0, 0, 0))
-    draw_func(temp, 0, 0, 0)
+def draw_attack_frame(frame_img, img, ox, oy, phase):
+    """Draw an attack frame from idle frame 0: creature lunges forward."""
     # Shift creature right (lunge) and add a slight squash
-    scaled = temp.resize((48, 44), Image.NEAREST)
+    scaled = frame_img.resize((48, 44))
     lunge = 4 if phase == 0 else 8
-    img.paste(scaled, (ox + lunge, oy + 2), scaled)
+    img.paste(scaled, (ox + lunge, oy + 2), masked=True)
+
+
+def render_battle_sheet(name):
+    """4-frame battle sheet (idle1, idle2, attack1, attack2) at 48x48 (192x48)."""
+    idle0, idle1 = creature_frame(name, 0), creature_frame(name, 1)
+    sheet = Canvas(192, 48)
+
+    # Idle frame 1
+    scale_draw(idle0, sheet, 0, 0)
+    # Idle frame 2
+    scale_draw(idle1, sheet, 48, 0)
+    # Attack frame 1 (lunge)
+    draw_attack_frame(idle0, sheet, 96, 0, 0)
+    # Attack frame 2 (full lunge)
+    draw_attack_frame(idle0, sheet, 144, 0, 1)
+    return sheet
 
 
 def generate_creature_battle_sheets():
     """Generate 4-frame battle sheets (idle1, idle2, attack1, attack2) at 48x48.
     Sheet size: 192x48."""
-    for name, drawer in CREATURE_DRAWERS.items():
-        sheet = Image.new("RGBA", (192, 48), (0, 0, 0, 0))
-
-        # Idle frame 1
-        scale_draw(drawer, sheet, 0, 0, 0)
-        # Idle frame 2
-        scale_draw(drawer, sheet, 48, 0, 1)
-        # Attack frame 1 (lunge)
-        draw_attack_frame(drawer, sheet, 96, 0, 0)
-        # Attack frame 2 (full lunge)
-        draw_attack_frame(drawer, sheet, 144, 0, 1)
-
+    for name in CREATURE_DRAWERS:
         path = os.path.join(OUT_DIR, f"{name}_battle.png")
-        sheet.save(path)
+        render_battle_sheet(name).save(path)
         print(f"Created {name}_battle.png (192x48)")
 
 
 # ── Main ────────────────────────────────────────────────────────────────────
 
+def render_single_sprite(name):
+    """Standalone 32x32 single-frame sprite."""
+    return creature_frame(name, 0)
+
+
 def generate_creature_single_sprites():
     """Generate standalone 32x32 single-frame sprites for each creature."""
-    for name, drawer in CREATURE_DRAWERS.items():
-        sprite = Image.new("RGBA", (32, 32), (0, 0, 0, 0))
-        drawer(sprite, 0, 0, 0)
+    for name in CREATURE_DRAWERS:
         path = os.path.join(OUT_DIR, f"{name}.png")
-        sprite.save(path)
+        render_single_sprite(name).save(path)
         print(f"Created {name}.png (32x32)")
 
 
-if __name__ == "__main__":
-    generate_player_sheet()
-    generate_creature_single_sprites()
-    generate_creature_overworld_sheets()
-    generate_creature_battle_sheets()
+# (filename suffix, renderer, size label) for each per-creature output
+CREATURE_OUTPUTS = [
+    ("", render_single_sprite, "32x32"),
+    ("_overworld", render_overworld_sheet, "64x32"),
+    ("_battle", render_battle_sheet, "192x48"),
+]
+
+
+# ── Shiny variants ──────────────────────────────────────────────────────────
+
+# {name}_shiny{suffix}.png is the finished sheet with every CREATURE_PALETTES
+# color remapped; nothing is redrawn. By default a color gets the gold tint
+# wild_creature.gd applies at runtime (modulate = SHINY_TINT), so the baked
+# sheets match what players see today; SHINY_PALETTES overrides single
+# entries per creature ({name: {palette key: (r, g, b)}}).
+SHINY_SUFFIX = "_shiny"
+SHINY_TINT = (1.0, 0.9, 0.4)
+SHINY_PALETTES = {}
+
+
+def shiny_palette(name):
+    overrides = SHINY_PALETTES.get(name, {})
+    return {key: overrides.get(key, tuple(round(c * t) for c, t in zip(rgb, SHINY_TINT)))
+            for key, rgb in CREATURE_PALETTES[name].items()}
+
+
+def palette_remap(pixels, src, dst):
+    """Copy of an (h, w, 4) array with every visible pixel whose RGB is a src
+    palette color replaced by the dst color of the same key (one sorted
+    lookup over the whole sheet). Other colors are left alone."""
+    keys = list(dict.fromkeys(src))
+    src_rgb = np.array([src[key] for key in keys], dtype=np.uint32)
+    dst_rgb = np.array([dst[key] for key in keys], dtype=np.uint8)
+    packed_src = (src_rgb[:, 0] << 16) | (src_rgb[:, 1] << 8) | src_rgb[:, 2]
+    packed_src, first = np.unique(packed_src, return_index=True)
+    dst_rgb = dst_rgb[first]
+
+    rgb = pixels[..., :3].astype(np.uint32)
+    packed = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    idx = np.searchsorted(packed_src, packed).clip(max=len(packed_src) - 1)
+    hit = (packed_src[idx] == packed) & (pixels[..., 3] > 0)
+    out = pixels.copy()
+    out[..., :3][hit] = dst_rgb[idx[hit]]
+    return out
+
+
+def shiny_sheet(name, sheet):
+    shiny = Canvas(sheet.width, sheet.height)
+    shiny.pixels = palette_remap(sheet.pixels, CREATURE_PALETTES[name], shiny_palette(name))
+    return shiny
+
+
+def creature_suffixes(shiny=False):
+    """Filename suffixes of every per-creature output."""
+    suffixes = [suffix for suffix, _, _ in CREATURE_OUTPUTS]
+    return suffixes + [SHINY_SUFFIX + suffix for suffix in suffixes] if shiny else suffixes
+
+
+# Shared raster code every creature output depends on
+RASTER_SOURCES = (Canvas, _nearest_index, get_draw, px, draw_rect, creature_frame,
+                  scale_draw, draw_attack_frame)
+
+
+def _writer_parts(indexed):
+    return (indexed, *(ENCODER_SOURCES if indexed else ()))
+
+
+def creature_fingerprint(name, suffix, indexed=False, shapes=None):
+    """Fingerprint of the output with the given filename suffix. shapes: the
+    creature's shape list when built from sprite_shapes, which then stands
+    in for the drawer source."""
+    if shapes is None:
+        source = (CREATURE_DRAWERS[name],)
+    else:
+        import sprite_shapes
+        source = (shapes, sprite_shapes.compile_frames, prime_frames)
+    shiny = suffix.startswith(SHINY_SUFFIX)
+    render = {s: render for s, render, _ in CREATURE_OUTPUTS}[suffix[len(SHINY_SUFFIX):] if shiny else suffix]
+    remap = (shiny_palette(name), shiny_palette, palette_remap, shiny_sheet) if shiny else ()
+    return fingerprint(*source, CREATURE_PALETTES[name], render, *remap, *RASTER_SOURCES,
+                       *_writer_parts(indexed))
+
+
+def player_fingerprint(indexed=False):
+    return fingerprint(draw_player_frame, render_player_sheet, generate_player_sheet, PLAYER_COLORS, *RASTER_SOURCES,
+                       *_writer_parts(indexed))
+
+
+def build_creature(name, out_dir=OUT_DIR, suffixes=None, indexed=False, frames=None,
+                   shiny=False):
+    """Render and save the outputs for one creature (all of them, shiny
+    variants included if shiny, or only the given filename suffixes).
+    indexed writes palette PNGs via png_output; frames are pre-rasterized
+    idle frames to use instead of the drawer. Returns the log lines."""
+    if frames is not None:
+        prime_frames(name, frames)
+    wanted = creature_suffixes(shiny) if suffixes is None else suffixes
+    lines = []
+    for suffix, render, size in CREATURE_OUTPUTS:
+        targets = [target for target in (suffix, SHINY_SUFFIX + suffix) if target in wanted]
+        if not targets:
+            continue
+        sheet = render(name)
+        for target in targets:
+            filename = f"{name}{target}.png"
+            out = sheet if target == suffix else shiny_sheet(name, sheet)
+            out.save(os.path.join(out_dir, filename), indexed)
+            lines.append(f"Created {filename} ({size})")
+    return lines
+
+
+def _build_creature_job(job):
+    return build_creature(*job)
+
+
+def generate_creatures(jobs=1, out_dir=OUT_DIR, cache=None, names=None, indexed=False, shapes=None,
+                       shiny=False):
+    """Build creature outputs (all, or only names), one task per creature.
+    With jobs > 1 the tasks run on a process pool; logs are always printed in
+    CREATURE_DRAWERS order. With a BuildCache, up-to-date outputs are skipped.
+    shapes ({name: shape list}) rasterizes those creatures' frames in one
+    batch pass up front; creatures without a shape list use their drawer.
+    shiny adds the {name}_shiny*.png palette-remapped variants."""
+    shapes = shapes or {}
+    tasks = []
+    for name in CREATURE_DRAWERS:
+        if names is not None and name not in names:
+            continue
+        stale = [suffix for suffix in creature_suffixes(shiny)
+                 if cache is None or not cache.is_fresh(
+                     os.path.join(out_dir, f"{name}{suffix}.png"),
+                     creature_fingerprint(name, suffix, indexed, shapes.get(name)))]
+        if stale:
+            tasks.append([name, out_dir, stale, indexed, None])
+
+    batch = {task[0]: shapes[task[0]] for task in tasks if task[0] in shapes}
+    if batch:
+        import sprite_shapes
+        compiled = sprite_shapes.compile_frames(batch, CREATURE_PALETTES)
+        for task in tasks:
+            task[4] = compiled.get(task[0])
+
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_build_creature_job, tasks))
+    else:
+        results = map(_build_creature_job, tasks)
+    for lines in results:
+        for line in lines:
+            print(line)
+
+    if cache is not None:
+        for name, _, stale, _, _ in tasks:
+            for suffix in stale:
+                cache.record(os.path.join(out_dir, f"{name}{suffix}.png"),
+                             creature_fingerprint(name, suffix, indexed, shapes.get(name)))
+
+
+def build(names=None, jobs=1, out_dir=OUT_DIR, cache=None, indexed=False, shapes=None,
+          shiny=False):
+    """Build the player sheet and creature outputs. names selects a subset
+    ("player" and/or creature names); None builds everything. shapes is a
+    shape list file or dict (see sprite_shapes) to rasterize from."""
+    if isinstance(shapes, str):
+        import sprite_shapes
+        shapes = sprite_shapes.load_shapes(shapes)
+    if names is not None:
+        unknown = set(names) - set(CREATURE_DRAWERS) - {"player"}
+        if unknown:
+            raise ValueError(f"unknown sprite target(s): {', '.join(sorted(unknown))}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    if names is None or "player" in names:
+        player_path = os.path.join(out_dir, "player_sheet.png")
+        if cache is None or not cache.is_fresh(player_path, player_fingerprint(indexed)):
+            generate_player_sheet(out_dir, indexed)
+            if cache is not None:
+                cache.record(player_path, player_fingerprint(indexed))
+    generate_creatures(jobs, out_dir, cache, names, indexed, shapes, shiny)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="build creatures on N worker processes")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="rebuild every output regardless of the build manifest")
+    parser.add_argument("--indexed-png", action="store_true",
+                        help="write size-optimized palette PNGs")
+    parser.add_argument("--shapes", metavar="FILE",
+                        help="rasterize creatures from a shape list (see sprite_shapes.py)")
+    parser.add_argument("--shiny", action="store_true",
+                        help="also write palette-remapped {name}_shiny*.png variants")
+    args = parser.parse_args(argv)
+    cache = BuildCache(enabled=not args.no_cache)
+
+    build(jobs=args.jobs, cache=cache, indexed=args.indexed_png, shapes=args.shapes,
+          shiny=args.shiny)
+    cache.save()
+    cache.report()
     print("\nAll sprites generated!")
+
+
+if __name__ == "__main__":
+    main()
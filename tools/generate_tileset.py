@@ -9,8 +9,17 @@ Row 3: Earth/Cave (cave_floor, stalactite, crystal, dirt, stone_wall, stone_bric
 """
 
 from PIL import Image, ImageDraw
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import functools
+import json
+import numpy as np
 import os
 import random
+import zlib
+
+from asset_cache import BuildCache, fingerprint
+from png_output import ENCODER_SOURCES, save_png
 
 OUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "tilesets")
 os.makedirs(OUT_DIR, exist_ok=True)
@@ -19,24 +28,79 @@ TILE_SIZE = 32
 COLS, ROWS = 8, 4
 IMG_W, IMG_H = COLS * TILE_SIZE, ROWS * TILE_SIZE
 
-random.seed(42)  # Reproducible
+SEED = 42  # Reproducible
+
+
+# ── Random streams ──
+
+class LegacyRng:
+    """The original stream: one random.randint per channel per pixel, row-major.
+    Reproduces the committed terrain_tileset.png bit-for-bit."""
+
+    def __init__(self, seed):
+        self._random = random.Random(seed)
+        self.randint = self._random.randint
+        self.choice = self._random.choice
+        self.random = self._random.random
+
+    def jitter(self, h, w, channels, variation):
+        randint = self._random.randint
+        return np.array([[[randint(-variation, variation) for _ in range(channels)]
+                          for _ in range(w)] for _ in range(h)], dtype=np.int16)
+
+
+class NumpyRng:
+    """Vectorized stream: a whole block's jitter is one array draw.
+    seed may be an int or a np.random.SeedSequence."""
+
+    def __init__(self, seed):
+        self._gen = np.random.default_rng(seed)
+
+    def randint(self, a, b):
+        return int(self._gen.integers(a, b + 1))
+
+    def choice(self, seq):
+        return seq[int(self._gen.integers(len(seq)))]
+
+    def random(self):
+        return float(self._gen.random())
+
+    def jitter(self, h, w, channels, variation):
+        return self._gen.integers(-variation, variation + 1, size=(h, w, channels), dtype=np.int16)
+
+
+rng = NumpyRng(SEED)
+
+
+class TileDraw:
+    """ImageDraw stand-in that can also paste whole pixel blocks."""
+
+    def __init__(self, img):
+        self.img = img
+        self.point = ImageDraw.Draw(img).point
+
+    def paste_rgb(self, ox, oy, rgb):
+        h, w = rgb.shape[:2]
+        block = np.empty((h, w, 4), dtype=np.uint8)
+        block[..., :3] = rgb
+        block[..., 3] = 255
+        self.img.paste(Image.fromarray(block, "RGBA"), (ox, oy))
+
+
+def noise_block(draw, ox, oy, w, h, base, variation, channels=3):
+    """Fill a w x h block with base color plus uniform jitter in one array pass.
+    base is an (r, g, b) tuple or an (h, w, 3) array of per-pixel colors;
+    channels=1 shares one offset across r, g and b."""
+    rgb = np.asarray(base, dtype=np.int16) + rng.jitter(h, w, channels, variation)
+    draw.paste_rgb(ox, oy, np.clip(rgb, 0, 255).astype(np.uint8))
 
 
 def fill_tile(draw, ox, oy, color):
-    for y in range(TILE_SIZE):
-        for x in range(TILE_SIZE):
-            draw.point((ox + x, oy + y), fill=color)
+    draw.paste_rgb(ox, oy, np.full((TILE_SIZE, TILE_SIZE, 3), color, dtype=np.uint8))
 
 
 def noise_fill(draw, ox, oy, base_color, variation=15):
-    r, g, b = base_color
-    for y in range(TILE_SIZE):
-        for x in range(TILE_SIZE):
-            dr = random.randint(-variation, variation)
-            dg = random.randint(-variation, variation)
-            db = random.randint(-variation, variation)
-            c = (max(0, min(255, r + dr)), max(0, min(255, g + dg)), max(0, min(255, b + db)), 255)
-            draw.point((ox + x, oy + y), fill=c)
+    noise_block(draw, ox, oy, TILE_SIZE, TILE_SIZE, base_color, variation)
 
 
 def draw_rect(draw, x, y, w, h, color):
@@ -60,9 +124,9 @@ def draw_grass_flowers(draw, ox, oy):
     noise_fill(draw, ox, oy, (70, 150, 55), 10)
     # Scatter flowers
     for _ in range(6):
-        fx = random.randint(2, 28)
-        fy = random.randint(2, 28)
-        fc = random.choice([(255, 100, 100), (255, 255, 100), (200, 100, 255), (255, 200, 100)])
+        fx = rng.randint(2, 28)
+        fy = rng.randint(2, 28)
+        fc = rng.choice([(255, 100, 100), (255, 255, 100), (200, 100, 255), (255, 200, 100)])
         draw.point((ox + fx, oy + fy), fill=fc)
         draw.point((ox + fx + 1, oy + fy), fill=fc)
         draw.point((ox + fx, oy + fy + 1), fill=fc)
@@ -87,8 +151,8 @@ def draw_tall_grass(draw, ox, oy):
     noise_fill(draw, ox, oy, (55, 130, 40), 8)
     # Tall grass blades
     for x in range(0, 32, 4):
-        h = random.randint(8, 16)
-        c = (40 + random.randint(0, 30), 120 + random.randint(0, 40), 30)
+        h = rng.randint(8, 16)
+        c = (40 + rng.randint(0, 30), 120 + rng.randint(0, 40), 30)
         for y in range(32 - h, 32):
             draw.point((ox + x, oy + y), fill=c)
             if x + 1 < 32:
@@ -96,14 +160,7 @@ def draw_tall_grass(draw, ox, oy):
 
 
 def noise_fill_rect(draw, ox, oy, w, h, base_color, variation=10):
-    r, g, b = base_color
-    for y in range(h):
-        for x in range(w):
-            dr = random.randint(-variation, variation)
-            dg = random.randint(-variation, variation)
-            db = random.randint(-variation, variation)
-            c = (max(0, min(255, r + dr)), max(0, min(255, g + dg)), max(0, min(255, b + db)), 255)
-            draw.point((ox + x, oy + y), fill=c)
+    noise_block(draw, ox, oy, w, h, base_color, variation)
 
 
 # ── Row 1: Water/Coast ──
@@ -124,52 +181,30 @@ def draw_water_anim(draw, ox, oy):
 def draw_sand(draw, ox, oy):
     noise_fill(draw, ox, oy, (220, 200, 150), 12)
 
+def shore_fill(draw, ox, oy, water_mask):
+    """Water/sand split tile; water_mask is a (32, 32) bool array."""
+    base = np.where(water_mask[..., None], (40, 80, 180), (220, 200, 150))
+    noise_block(draw, ox, oy, TILE_SIZE, TILE_SIZE, base, 10, channels=1)
+
+SHORE_ROWS, SHORE_COLS = np.mgrid[0:TILE_SIZE, 0:TILE_SIZE]
+
 def draw_shore_top(draw, ox, oy):
     # Top half water, bottom half sand
-    for y in range(16):
-        for x in range(32):
-            v = random.randint(-10, 10)
-            draw.point((ox + x, oy + y), fill=(40 + v, 80 + v, 180 + v, 255))
-    for y in range(16, 32):
-        for x in range(32):
-            v = random.randint(-10, 10)
-            draw.point((ox + x, oy + y), fill=(220 + v, 200 + v, 150 + v, 255))
+    shore_fill(draw, ox, oy, SHORE_ROWS < 16)
 
 def draw_shore_bot(draw, ox, oy):
-    for y in range(16):
-        for x in range(32):
-            v = random.randint(-10, 10)
-            draw.point((ox + x, oy + y), fill=(220 + v, 200 + v, 150 + v, 255))
-    for y in range(16, 32):
-        for x in range(32):
-            v = random.randint(-10, 10)
-            draw.point((ox + x, oy + y), fill=(40 + v, 80 + v, 180 + v, 255))
+    shore_fill(draw, ox, oy, SHORE_ROWS >= 16)
 
 def draw_shore_left(draw, ox, oy):
-    for y in range(32):
-        for x in range(16):
-            v = random.randint(-10, 10)
-            draw.point((ox + x, oy + y), fill=(40 + v, 80 + v, 180 + v, 255))
-        for x in range(16, 32):
-            v = random.randint(-10, 10)
-            draw.point((ox + x, oy + y), fill=(220 + v, 200 + v, 150 + v, 255))
+    shore_fill(draw, ox, oy, SHORE_COLS < 16)
 
 def draw_shore_right(draw, ox, oy):
-    for y in range(32):
-        for x in range(16):
-            v = random.randint(-10, 10)
-            draw.point((ox + x, oy + y), fill=(220 + v, 200 + v, 150 + v, 255))
-        for x in range(16, 32):
-            v = random.randint(-10, 10)
-            draw.point((ox + x, oy + y), fill=(40 + v, 80 + v, 180 + v, 255))
+    shore_fill(draw, ox, oy, SHORE_COLS >= 16)
 
 def draw_dock(draw, ox, oy):
     noise_fill(draw, ox, oy, (40, 80, 180), 10)
     # Wooden planks
-    for y in range(8, 24):
-        for x in range(4, 28):
-            v = random.randint(-8, 8)
-            draw.point((ox + x, oy + y), fill=(140 + v, 100 + v, 60 + v, 255))
+    noise_block(draw, ox + 4, oy + 8, 24, 16, (140, 100, 60), 8, channels=1)
     # Plank gaps
     for x_gap in [12, 20]:
         for y in range(8, 24):
@@ -182,15 +217,15 @@ def draw_lava(draw, ox, oy):
     noise_fill(draw, ox, oy, (200, 60, 20), 20)
     # Bright spots
     for _ in range(5):
-        lx = random.randint(2, 28)
-        ly = random.randint(2, 28)
+        lx = rng.randint(2, 28)
+        ly = rng.randint(2, 28)
         draw_rect(draw, ox + lx, oy + ly, 3, 3, (255, 200, 50))
 
 def draw_lava_anim(draw, ox, oy):
     noise_fill(draw, ox, oy, (210, 70, 25), 20)
     for _ in range(5):
-        lx = random.randint(2, 28)
-        ly = random.randint(1, 27)
+        lx = rng.randint(2, 28)
+        ly = rng.randint(1, 27)
         draw_rect(draw, ox + lx, oy + ly, 2, 4, (255, 220, 60))
 
 def draw_rock_dark(draw, ox, oy):
@@ -207,7 +242,7 @@ def draw_magma_crack(draw, ox, oy):
     # Glowing cracks
     for y in range(4, 28, 6):
         for x in range(32):
-            if random.random() < 0.3:
+            if rng.random() < 0.3:
                 draw.point((ox + x, oy + y), fill=(255, 120, 30, 255))
                 draw.point((ox + x, oy + y + 1), fill=(200, 80, 20, 255))
 
@@ -215,16 +250,16 @@ def draw_obsidian(draw, ox, oy):
     noise_fill(draw, ox, oy, (30, 25, 35), 5)
     # Reflective highlights
     for _ in range(3):
-        hx = random.randint(4, 26)
-        hy = random.randint(4, 26)
+        hx = rng.randint(4, 26)
+        hy = rng.randint(4, 26)
         draw.point((ox + hx, oy + hy), fill=(80, 70, 100, 255))
 
 def draw_ember_ground(draw, ox, oy):
     noise_fill(draw, ox, oy, (90, 60, 40), 10)
     # Embers
     for _ in range(4):
-        ex = random.randint(2, 28)
-        ey = random.randint(2, 28)
+        ex = rng.randint(2, 28)
+        ey = rng.randint(2, 28)
         draw.point((ox + ex, oy + ey), fill=(255, 160, 40, 255))
 
 
@@ -237,7 +272,7 @@ def draw_stalactite(draw, ox, oy):
     noise_fill(draw, ox, oy, (70, 60, 55), 6)
     # Stalactites hanging
     for x in range(4, 28, 8):
-        h = random.randint(6, 14)
+        h = rng.randint(6, 14)
         for y in range(h):
             w = max(1, 4 - y // 3)
             for dx in range(w):
@@ -248,9 +283,9 @@ def draw_crystal(draw, ox, oy):
     # Purple/blue crystals
     crystal_colors = [(120, 80, 200), (80, 120, 200), (140, 100, 220)]
     for _ in range(3):
-        cx = random.randint(4, 24)
-        cy = random.randint(8, 24)
-        cc = random.choice(crystal_colors)
+        cx = rng.randint(4, 24)
+        cy = rng.randint(8, 24)
+        cc = rng.choice(crystal_colors)
         for dy in range(6):
             w = max(1, 3 - abs(dy - 2))
             for dx in range(w):
@@ -313,19 +348,315 @@ TILE_DRAWERS = [
 ]
 
 
-def main():
-    img = Image.new("RGBA", (IMG_W, IMG_H), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+def tile_name(drawer):
+    return drawer.__name__[len("draw_"):]
+
+
+def tile_rng(row, col, seed=SEED):
+    """Independent stream for one tile, derived from (row, col, name, seed).
+    Editing or inserting a tile never reshuffles the pixels of any other."""
+    name_key = zlib.crc32(tile_name(TILE_DRAWERS[row][col]).encode())
+    return NumpyRng(np.random.SeedSequence([seed, row, col, name_key]))
+
+
+def render_tile(row, col, seed=SEED, stream=None):
+    """Render one tile to a (32, 32, 4) uint8 array.
+    stream overrides the per-tile RNG (the legacy mode shares one stream)."""
+    global rng
+    rng = stream if stream is not None else tile_rng(row, col, seed)
+    tile = Image.new("RGBA", (TILE_SIZE, TILE_SIZE), (0, 0, 0, 0))
+    TILE_DRAWERS[row][col](TileDraw(tile), 0, 0)
+    return np.asarray(tile)
+
+
+def _render_tile_job(job):
+    row, col, seed = job
+    return render_tile(row, col, seed)
+
 
-    for row_idx, row_drawers in enumerate(TILE_DRAWERS):
-        for col_idx, drawer in enumerate(row_drawers):
-            ox = col_idx * TILE_SIZE
-            oy = row_idx * TILE_SIZE
-            drawer(draw, ox, oy)
+def build_atlas(seed=SEED, legacy_rng=True, jobs=1):
+    """Render every tile in TILE_DRAWERS and stitch them into the atlas.
+    The default legacy stream reproduces the committed terrain_tileset.png;
+    legacy_rng=False uses the per-tile NumPy streams, and with jobs > 1 those
+    tiles render on a process pool (output matches the serial run)."""
+    cells = [(row, col) for row in range(ROWS) for col in range(COLS)]
+    if legacy_rng:
+        stream = LegacyRng(seed)
+        tiles = [render_tile(row, col, stream=stream) for row, col in cells]
+    elif jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            tiles = list(pool.map(_render_tile_job, [(row, col, seed) for row, col in cells]))
+    else:
+        tiles = [render_tile(row, col, seed) for row, col in cells]
 
-    path = os.path.join(OUT_DIR, "terrain_tileset.png")
-    img.save(path)
-    print(f"Created terrain_tileset.png ({IMG_W}x{IMG_H})")
+    atlas = np.zeros((IMG_H, IMG_W, 4), dtype=np.uint8)
+    for (row, col), tile in zip(cells, tiles):
+        atlas[row * TILE_SIZE:(row + 1) * TILE_SIZE, col * TILE_SIZE:(col + 1) * TILE_SIZE] = tile
+    return Image.fromarray(atlas, "RGBA")
+
+
+# ── Animated tiles ──
+
+# Tiles with an N-frame loop (terrain_{name}_anim.png strips) and their
+# seconds per frame. Each frame is a periodic function of the phase
+# 2*pi*k/N evaluated over all frames at once, so the loop is seamless; the
+# spatial periods divide TILE_SIZE, so animated tiles also tile seamlessly.
+ANIMATED_TILES = {"water": 0.20, "lava": 0.15, "magma_crack": 0.12}
+ANIM_FRAMES = 8
+ANIM_Y, ANIM_X = np.mgrid[0:TILE_SIZE, 0:TILE_SIZE]
+TAU = 2 * np.pi
+
+
+def _lerp(a, b, t):
+    return np.asarray(a) + (np.asarray(b) - np.asarray(a)) * t[..., None]
+
+
+def animate_water(gen, phase):
+    """Wave crests that roll down the tile and sway sideways, over a shimmer."""
+    base = np.array((40, 80, 180)) + gen.integers(-15, 16, size=(TILE_SIZE, TILE_SIZE, 3))
+    wave = np.sin(TAU * ANIM_Y / 8 - phase + 0.8 * np.sin(TAU * ANIM_X / TILE_SIZE + phase))
+    shimmer = 6 * np.sin(phase + TAU * (ANIM_X + ANIM_Y) / TILE_SIZE)
+    rgb = base + shimmer[..., None]
+    return np.where((wave > 0.85)[..., None], (70, 120, 220), rgb)
+
+
+def animate_lava(gen, phase):
+    """Hot spots that swell and drift across molten rock."""
+    base = np.array((200, 60, 20)) + gen.integers(-20, 21, size=(TILE_SIZE, TILE_SIZE, 3))
+    heat = (np.sin(TAU * ANIM_X / 16 + phase) * np.sin(TAU * ANIM_Y / 16 - phase)
+            + 0.5 * np.sin(TAU * (ANIM_X + ANIM_Y) / TILE_SIZE + 2 * phase))
+    return _lerp(base, (255, 200, 50), np.clip((heat - 0.6) / 0.6, 0, 1))
+
+
+def animate_magma_crack(gen, phase):
+    """Fixed cracks in dark rock with a glow pulse running along them."""
+    rgb = np.broadcast_to(np.array((70, 55, 50)) + gen.integers(-8, 9, size=(TILE_SIZE, TILE_SIZE, 3)),
+                          phase.shape[:1] + (TILE_SIZE, TILE_SIZE, 3)).astype(np.float64)
+    pulse = 0.5 + 0.5 * np.sin(phase - TAU * ANIM_X / TILE_SIZE)
+    for y in range(4, 28, 6):
+        crack = gen.random(TILE_SIZE) < 0.3
+        rgb[:, y, crack] = _lerp((200, 90, 25), (255, 170, 60), pulse[:, y, crack])
+        rgb[:, y + 1, crack] = _lerp((150, 60, 15), (220, 110, 30), pulse[:, y + 1, crack])
+    return rgb
+
+
+ANIMATORS = {"water": animate_water, "lava": animate_lava, "magma_crack": animate_magma_crack}
+
+
+def tile_cell(name):
+    """(row, col) of a tile in TILE_DRAWERS."""
+    for row, drawers in enumerate(TILE_DRAWERS):
+        for col, drawer in enumerate(drawers):
+            if tile_name(drawer) == name:
+                return row, col
+    raise KeyError(name)
+
+
+@functools.lru_cache(maxsize=None)
+def _atlas_pixels(seed, legacy_rng):
+    return np.asarray(build_atlas(seed, legacy_rng))
+
+
+def atlas_tile(name, seed=SEED, legacy_rng=True):
+    """(32, 32, 4) pixels of a named tile as it appears in build_atlas.
+    The legacy stream runs across the whole atlas, so its tiles are cut out
+    of a full (cached) render rather than drawn alone."""
+    row, col = tile_cell(name)
+    return _atlas_pixels(seed, legacy_rng)[row * TILE_SIZE:(row + 1) * TILE_SIZE,
+                                           col * TILE_SIZE:(col + 1) * TILE_SIZE]
+
+
+def render_animation(name, frames=ANIM_FRAMES, seed=SEED):
+    """(frames, TILE_SIZE, TILE_SIZE, 4) uint8 loop for an ANIMATED_TILES tile."""
+    row, col = tile_cell(name)
+    gen = np.random.default_rng(np.random.SeedSequence([seed, row, col, zlib.crc32(f"{name}_anim".encode())]))
+    phase = (TAU * np.arange(frames) / frames)[:, None, None]
+    rgb = ANIMATORS[name](gen, phase)
+    out = np.full((frames, TILE_SIZE, TILE_SIZE, 4), 255, dtype=np.uint8)
+    out[..., :3] = np.clip(np.rint(rgb), 0, 255)
+    return out
+
+
+def animation_strip(frames):
+    """(N, h, w, 4) frames side by side as an (h, N * w, 4) strip."""
+    n, h, w, _ = frames.shape
+    return frames.transpose(1, 0, 2, 3).reshape(h, n * w, 4)
+
+
+def animation_meta(frames):
+    meta = {}
+    for name, duration in ANIMATED_TILES.items():
+        row, col = tile_cell(name)
+        meta[name] = {"file": f"terrain_{name}_anim.png", "frames": frames,
+                      "frame_duration": duration, "frame_size": [TILE_SIZE, TILE_SIZE],
+                      "atlas_coords": [col, row]}
+    return {"tiles": meta}
+
+
+def animation_fingerprint(name, frames, seed, indexed=False):
+    return fingerprint(name, frames, seed, TILE_SIZE, tile_cell, ANIMATORS[name], _lerp,
+                       render_animation, animation_strip, indexed,
+                       *(ENCODER_SOURCES if indexed else ()))
+
+
+def build_animations(frames=ANIM_FRAMES, seed=SEED, out_dir=OUT_DIR, cache=None, indexed=False):
+    """Write a strip per ANIMATED_TILES tile plus terrain_anim.json timing."""
+    for name in ANIMATED_TILES:
+        path = os.path.join(out_dir, f"terrain_{name}_anim.png")
+        key = animation_fingerprint(name, frames, seed, indexed)
+        if cache is not None and cache.is_fresh(path, key):
+            continue
+        save_png(animation_strip(render_animation(name, frames, seed)), path, indexed)
+        if cache is not None:
+            cache.record(path, key)
+        print(f"Created terrain_{name}_anim.png ({frames * TILE_SIZE}x{TILE_SIZE}, {frames} frames)")
+    path = os.path.join(out_dir, "terrain_anim.json")
+    key = fingerprint(ANIMATED_TILES, frames, TILE_SIZE, tile_cell, animation_meta)
+    if cache is None or not cache.is_fresh(path, key):
+        with open(path, "w") as f:
+            json.dump(animation_meta(frames), f, indent=1)
+            f.write("\n")
+        if cache is not None:
+            cache.record(path, key)
+        print("Created terrain_anim.json")
+
+
+# ── Graded variants ──
+
+# Time-phase and weather grades for terrain_tileset_{grade}.png. Phase tints
+# are TimeManager.PHASE_COLORS, so a graded atlas looks like the base atlas
+# under today's CanvasModulate; weather adds saturation/brightness/haze.
+# AFTERNOON and CLEAR are neutral and use the base atlas.
+GRADES = {
+    "morning": {"tint": (1.0, 0.95, 0.9)},
+    "evening": {"tint": (0.9, 0.7, 0.5)},
+    "night": {"tint": (0.4, 0.4, 0.7)},
+    "rain": {"saturation": 0.75, "brightness": 0.85, "tint": (0.9, 0.95, 1.05)},
+    "snow": {"saturation": 0.6, "haze": ((0.9, 0.93, 1.0), 0.25)},
+    "sandstorm": {"saturation": 0.8, "haze": ((0.85, 0.7, 0.45), 0.3)},
+    "leaves": {"saturation": 1.1, "tint": (1.05, 1.0, 0.85)},
+}
+LUT_SIZE = 33
+LUMA = np.array([0.299, 0.587, 0.114])
+
+
+def grade_colors(rgb, tint=(1.0, 1.0, 1.0), saturation=1.0, brightness=1.0, haze=None):
+    """Apply a grade to float RGB in [0, 1] (any leading shape)."""
+    luma = (rgb @ LUMA)[..., None]
+    rgb = (luma + (rgb - luma) * saturation) * brightness
+    if haze is not None:
+        color, amount = haze
+        rgb = rgb * (1 - amount) + np.array(color) * amount
+    return np.clip(rgb * np.array(tint), 0.0, 1.0)
+
+
+def grade_lut(grade, size=LUT_SIZE):
+    """(size, size, size, 3) float LUT indexed [r, g, b] sampling the grade."""
+    axis = np.linspace(0.0, 1.0, size)
+    lattice = np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1)
+    return grade_colors(lattice, **grade)
+
+
+def apply_lut(rgba, lut):
+    """Grade an (h, w, 4) uint8 array through a 3D LUT with trilinear
+    interpolation, in one pass over all pixels. Alpha is kept."""
+    size = lut.shape[0]
+    pos = rgba[..., :3].astype(np.float64) * ((size - 1) / 255.0)
+    lo = np.minimum(pos.astype(np.int64), size - 2)
+    frac = pos - lo
+    out = np.zeros(pos.shape)
+    for corner in np.ndindex(2, 2, 2):
+        idx = lo + corner
+        weight = np.prod(np.where(corner, frac, 1.0 - frac), axis=-1, keepdims=True)
+        out += weight * lut[idx[..., 0], idx[..., 1], idx[..., 2]]
+    graded = rgba.copy()
+    graded[..., :3] = np.rint(out * 255.0).astype(np.uint8)
+    return graded
+
+
+def grade_fingerprint(name, atlas_key, indexed=False):
+    return fingerprint(atlas_key, name, GRADES[name], LUT_SIZE, LUMA.tolist(), grade_colors,
+                       grade_lut, apply_lut, indexed, *(ENCODER_SOURCES if indexed else ()))
+
+
+def atlas_fingerprint(seed=SEED, legacy_rng=True, indexed=False):
+    """Fingerprint of every tile drawer with its cell, the shared fill
+    helpers, the per-tile stream derivation and atlas assembly, and the
+    seed. The worker count does not affect the output."""
+    tiles = [(row, col, tile_name(drawer), drawer)
+             for row, row_drawers in enumerate(TILE_DRAWERS)
+             for col, drawer in enumerate(row_drawers)]
+    return fingerprint(seed, legacy_rng, LegacyRng if legacy_rng else NumpyRng, TileDraw,
+                       tile_name, tile_rng, render_tile, build_atlas, noise_block, fill_tile,
+                       noise_fill, noise_fill_rect, draw_rect, shore_fill,
+                       *[part for tile in tiles for part in tile],
+                       indexed, *(ENCODER_SOURCES if indexed else ()))
+
+
+def build(seed=SEED, legacy_rng=True, jobs=1, out_dir=OUT_DIR, cache=None, indexed=False,
+          grades=False, anim_frames=0):
+    """Build terrain_tileset.png (and with grades, every GRADES variant; with
+    anim_frames, the animated tile strips) into out_dir, skipping whatever
+    the cache says is current."""
+    os.makedirs(out_dir, exist_ok=True)
+    if anim_frames:
+        build_animations(anim_frames, seed, out_dir, cache, indexed)
+    path = os.path.join(out_dir, "terrain_tileset.png")
+    key = atlas_fingerprint(seed, legacy_rng, indexed)
+    stale_grades = []
+    if grades:
+        # Variants are keyed on the atlas inputs, not its PNG encoding
+        atlas_key = atlas_fingerprint(seed, legacy_rng)
+        for name in GRADES:
+            grade_path = os.path.join(out_dir, f"terrain_tileset_{name}.png")
+            grade_key = grade_fingerprint(name, atlas_key, indexed)
+            if cache is None or not cache.is_fresh(grade_path, grade_key):
+                stale_grades.append((name, grade_path, grade_key))
+    base_fresh = cache is not None and cache.is_fresh(path, key)
+    if base_fresh and not stale_grades:
+        return
+
+    atlas = np.asarray(build_atlas(seed, legacy_rng, jobs))
+    if not base_fresh:
+        save_png(atlas, path, indexed)
+        if cache is not None:
+            cache.record(path, key)
+        print(f"Created terrain_tileset.png ({IMG_W}x{IMG_H})")
+    for name, grade_path, grade_key in stale_grades:
+        save_png(apply_lut(atlas, grade_lut(GRADES[name])), grade_path, indexed)
+        if cache is not None:
+            cache.record(grade_path, grade_key)
+        print(f"Created terrain_tileset_{name}.png ({IMG_W}x{IMG_H})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--numpy-rng", dest="legacy_rng", action="store_false",
+                        help="use the per-tile NumPy streams instead of the original per-pixel "
+                             "stream the committed atlas was made with")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="render tiles on N worker processes")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="rebuild regardless of the build manifest")
+    parser.add_argument("--indexed-png", action="store_true",
+                        help="write a size-optimized PNG (palette-indexed when possible)")
+    parser.add_argument("--grades", action="store_true",
+                        help="also write a graded atlas per time phase and weather (see GRADES)")
+    parser.add_argument("--animate", type=int, nargs="?", const=ANIM_FRAMES, default=0, metavar="N",
+                        help=f"also write N-frame loops for {', '.join(ANIMATED_TILES)} "
+                             f"(default N: {ANIM_FRAMES})")
+    args = parser.parse_args(argv)
+    if args.animate < 0:
+        parser.error("--animate needs a positive frame count")
+    if args.legacy_rng and args.jobs > 1:
+        parser.error("--jobs needs --numpy-rng: the legacy stream is one sequential stream")
+
+    cache = BuildCache(enabled=not args.no_cache)
+    build(args.seed, args.legacy_rng, args.jobs, cache=cache, indexed=args.indexed_png,
+          grades=args.grades, anim_frames=args.animate)
+    cache.save()
+    cache.report()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""Lay out zone maps with wave function collapse over edge-matched tiles.
+
+Adjacency rules come from the tiles themselves: each edge of every
+TILE_DRAWERS tile is reduced to EDGE_SEGMENTS mean colors over its outer
+EDGE_DEPTH pixels, and tile b may sit right of (or below) tile a when a's
+right (bottom) profile is within --threshold of b's left (top) profile.
+Pairs that bridge otherwise separate groups of a zone's tiles are added
+back cheapest first, as in Kruskal's algorithm, so every tile of the zone
+stays reachable (lava meets dark rock through ember ground, say).
+
+Each cell holds its remaining tiles as a uint64 bitmask. Constraints are
+propagated over the whole map at once: a byte lookup table turns every
+neighbour's bitmask into the set of tiles it allows, and the four shifted
+support arrays are ANDed in until nothing changes. Cells collapse in
+strided phases (a sparse seeding lattice first, then 3x3 strides), so no
+two cells collapsing together share a neighbour. A contradiction reopens
+the cells around it and the next sweep fills them in again. The same zone,
+size and seed always give the same map.
+
+Tiles are drawn by the zone weights of generate_zone_maps.ZONES, scaled
+before each phase of the first sweep towards the tiles that are behind
+their share so far. The weights only bias each pick, though: tiles the
+rules force between others (water_anim between water and grass,
+stalactite around cave_dark) end up well above their weight, and tiles
+that fit next to few others well below it.
+
+Outputs per zone, in --out-dir:
+  {zone}.npy        uint8 (height, width) terrain_tileset.png tile indices
+  {zone}.json       size, seed, the tile table and the derived rules
+  {zone}.png        optional preview (--preview)
+
+  python3 tools/generate_wfc_maps.py forest_grove --size 256 --preview
+"""
+
+import argparse
+import json
+import numpy as np
+import os
+import sys
+import time
+import zlib
+
+import generate_tileset as tileset
+from asset_cache import ROOT
+from generate_zone_maps import ZONES, tile_indices, tile_preview_colors
+from png_output import PngStream
+
+OUT_DIR = os.path.join(ROOT, "build", "maps", "wfc")
+SIZE = 256
+THRESHOLD = 24.0    # mean absolute RGB difference between edge profiles
+EDGE_SEGMENTS = 4   # mean colors per edge
+EDGE_DEPTH = 2      # pixels in from the edge
+REPAIR_RADIUS = 2   # cells reopened around a contradiction, grown per retry
+MAX_SWEEPS = 32
+SHARE_GAIN = 2.0    # exponent of the target / placed share weight correction
+SHARE_BIAS = 16.0   # largest factor the correction scales a weight by
+SEED_STRIDE = 8
+PHASE_STRIDE = 3
+
+
+# ── Rules ──
+
+def edge_profiles(atlas):
+    """(tiles, 4, EDGE_SEGMENTS, 3) mean colors of the top, bottom, left and
+    right edges of every tile in atlas order."""
+    size = tileset.TILE_SIZE
+    rgb = np.asarray(atlas)[..., :3].astype(np.float64)
+    tiles = rgb.reshape(tileset.ROWS, size, tileset.COLS, size, 3).transpose(0, 2, 1, 3, 4)
+    tiles = tiles.reshape(-1, size, size, 3)
+    edges = [tiles[:, :EDGE_DEPTH], tiles[:, -EDGE_DEPTH:],
+             tiles[:, :, :EDGE_DEPTH].transpose(0, 2, 1, 3), tiles[:, :, -EDGE_DEPTH:].transpose(0, 2, 1, 3)]
+    # (tiles, depth, along, 3) -> (tiles, segments, 3)
+    return np.stack([edge.reshape(len(tiles), EDGE_DEPTH, EDGE_SEGMENTS, -1, 3).mean(axis=(1, 3))
+                     for edge in edges], axis=1)
+
+
+def edge_distances(profiles):
+    """(horizontal, vertical) (tiles, tiles) distances: [a, b] compares a's
+    right edge with b's left, or a's bottom edge with b's top."""
+    top, bottom, left, right = (profiles[:, k] for k in range(4))
+    horizontal = np.abs(right[:, None] - left[None]).mean(axis=(2, 3))
+    vertical = np.abs(bottom[:, None] - top[None]).mean(axis=(2, 3))
+    return horizontal, vertical
+
+
+def adjacency_rules(horizontal, vertical, threshold=THRESHOLD):
+    """(H, V) bool (k, k) rules over k tiles: H[a, b] lets b sit right of a,
+    V[a, b] lets b sit below a.
+
+    Pairs under the threshold are allowed, and so is each tile's closest
+    other tile on each side, so no tile forces a run of itself to the map
+    edge. Groups still apart are then joined cheapest pair first, in every
+    orientation."""
+    h, v = horizontal <= threshold, vertical <= threshold
+    k = len(horizontal)
+    others = ~np.eye(k, dtype=bool)
+    if k > 1:
+        for rules, distances in ((h, horizontal), (v, vertical)):
+            apart = np.where(others, distances, np.inf)
+            rules[np.arange(k), apart.argmin(axis=1)] = True
+            rules[apart.argmin(axis=0), np.arange(k)] = True
+
+    group = list(range(k))
+
+    def find(a):
+        while group[a] != a:
+            group[a] = group[group[a]]
+            a = group[a]
+        return a
+
+    for a, b in zip(*np.nonzero(h | v)):
+        group[find(a)] = find(b)
+    joined = np.minimum.reduce([horizontal, horizontal.T, vertical, vertical.T])
+    for flat in np.argsort(joined, axis=None, kind="stable"):
+        a, b = divmod(int(flat), k)
+        if find(a) != find(b):
+            group[find(a)] = find(b)
+            h[a, b] = h[b, a] = v[a, b] = v[b, a] = True
+    return h, v
+
+
+def zone_tiles(zone):
+    """(tile names, weights) for a zone: elevation bands by the share of the
+    noise range they cover, sprinkles by their chance of replacing a base."""
+    bands, sprinkles = ZONES[zone]
+    weights, lower = {}, 0.0
+    for upper, name in bands:
+        weights[name] = upper - lower
+        lower = upper
+    for base, (variant, chance) in sprinkles.items():
+        weights[variant] = weights[base] * chance
+        weights[base] -= weights[variant]
+    return list(weights), np.array(list(weights.values()))
+
+
+def rules_for_zone(zone, atlas):
+    names, weights = zone_tiles(zone)
+    index = tile_indices()
+    ids = [index[name] for name in names]
+    horizontal, vertical = edge_distances(edge_profiles(atlas))
+    return names, weights, horizontal[np.ix_(ids, ids)], vertical[np.ix_(ids, ids)]
+
+
+# ── Solver ──
+
+def support_tables(rules):
+    """(bytes, 256) uint64 lookup: for byte c of a bitmask holding value x,
+    the OR of rules[t] over the tiles t = 8c + bit set in x."""
+    k = len(rules)
+    masks = (rules.astype(np.uint64) << np.arange(k, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+    tables = np.zeros(((k + 7) // 8, 256), dtype=np.uint64)
+    values = np.arange(256)
+    for t in range(k):
+        chunk, bit = divmod(t, 8)
+        tables[chunk, (values >> bit) & 1 == 1] |= masks[t]
+    return tables
+
+
+def supported(cells, tables):
+    """Bitmask of the tiles allowed next to each cell."""
+    out = np.zeros_like(cells)
+    for chunk, table in enumerate(tables):
+        out |= table[(cells >> np.uint64(8 * chunk)) & np.uint64(0xFF)]
+    return out
+
+
+class Wave:
+    """uint64 (height, width) possibility bitmasks with the four directional
+    support tables: right/below allowed by a cell, and left/above."""
+
+    def __init__(self, height, width, h, v):
+        self.full = np.uint64((1 << len(h)) - 1)
+        self.cells = np.full((height, width), self.full, dtype=np.uint64)
+        self.tables = [support_tables(h), support_tables(h.T), support_tables(v), support_tables(v.T)]
+
+    def propagate(self):
+        """AND every cell with what its four neighbours allow until stable.
+        Returns the number of passes."""
+        cells, passes = self.cells, 0
+        right, left, below, above = self.tables
+        while True:
+            passes += 1
+            # A contradiction constrains nothing, so it stays local until repaired
+            source = np.where(cells == 0, self.full, cells)
+            allowed = np.full_like(cells, self.full)
+            allowed[:, 1:] &= supported(source[:, :-1], right)
+            allowed[:, :-1] &= supported(source[:, 1:], left)
+            allowed[1:] &= supported(source[:-1], below)
+            allowed[:-1] &= supported(source[1:], above)
+            narrowed = cells & allowed
+            if np.array_equal(narrowed, cells):
+                return passes
+            cells[:] = narrowed
+
+    def collapse(self, mask, weights, rng):
+        """Pick one remaining tile per masked cell, weighted."""
+        cells = self.cells[mask]
+        bits = (cells[:, None] >> np.arange(len(weights), dtype=np.uint64)) & np.uint64(1)
+        cumulative = np.cumsum(bits * weights, axis=1)
+        roll = rng.random(len(cells)) * cumulative[:, -1]
+        choice = (cumulative <= roll[:, None]).sum(axis=1)
+        self.cells[mask] = np.uint64(1) << choice.astype(np.uint64)
+
+    def reopen(self, mask, radius, initial):
+        """Reset the cells within radius (Chebyshev) of the masked ones to
+        their initial possibilities. Returns how many were reset."""
+        height, width = mask.shape
+        padded = np.pad(mask, radius)
+        grown = np.zeros_like(mask)
+        for dy in range(2 * radius + 1):
+            for dx in range(2 * radius + 1):
+                grown |= padded[dy:dy + height, dx:dx + width]
+        self.cells[grown] = initial[grown]
+        return int(grown.sum())
+
+
+def undecided(cells):
+    """Cells with more than one tile left."""
+    return (cells & (cells - np.uint64(1))) != 0
+
+
+def share_bias(cells, target):
+    """Per tile weight factor, (target / share) ** SHARE_GAIN within
+    SHARE_BIAS, from the shares of the cells decided so far."""
+    decided = cells[(cells != 0) & ~undecided(cells)]
+    if not len(decided):
+        return np.ones(len(target))
+    placed = np.bincount(np.log2(decided.astype(np.float64)).astype(np.int64),
+                         minlength=len(target)) / len(decided)
+    # The small offset keeps unplaced and zero-weight tiles finite
+    ratio = (target + 1e-3) / (placed + 1e-3)
+    return np.clip(ratio ** SHARE_GAIN, 1.0 / SHARE_BIAS, SHARE_BIAS)
+
+
+def collapse_phases(height, width):
+    """Masks of cells collapsed together: a coarse SEED_STRIDE lattice first,
+    so regions are placed with room for the transitions between them, then
+    the rest in PHASE_STRIDE-spaced batches whose cells share no neighbour."""
+    ys, xs = np.mgrid[:height, :width]
+    half = SEED_STRIDE // 2
+    phases = [(ys % SEED_STRIDE == dy) & (xs % SEED_STRIDE == dx)
+              for dy, dx in ((0, 0), (half, half), (0, half), (half, 0))]
+    phases += [(ys % PHASE_STRIDE == dy) & (xs % PHASE_STRIDE == dx)
+               for dy in range(PHASE_STRIDE) for dx in range(PHASE_STRIDE)]
+    return phases
+
+
+def solve(height, width, h, v, weights, rng, max_sweeps=MAX_SWEEPS, stats=None):
+    """(height, width) tile choices (indices into the rules) satisfying h and v."""
+    wave = Wave(height, width, h, v)
+    wave.propagate()
+    if not wave.cells.all():
+        raise ValueError("the adjacency rules admit no tile")
+    initial = wave.cells.copy()
+    phases = collapse_phases(height, width)
+    target = weights / weights.sum()
+    stats = stats if stats is not None else {}
+    stats.update(sweeps=0, passes=0, reopened=0)
+    for sweep in range(max_sweeps):
+        stats["sweeps"] += 1
+        for phase in phases:
+            open_cells = phase & undecided(wave.cells)
+            if not open_cells.any():
+                continue
+            # Repair sweeps keep the plain weights: chasing the shares there
+            # keeps picking tiles that just failed to fit
+            bias = share_bias(wave.cells, target) if sweep == 0 else 1.0
+            wave.collapse(open_cells, weights * bias, rng)
+            stats["passes"] += wave.propagate()
+            # Reopen wider until the neighbourhood of every contradiction fits
+            radius = REPAIR_RADIUS + sweep
+            while True:
+                broken = wave.cells == 0
+                if not broken.any():
+                    break
+                stats["reopened"] += wave.reopen(broken, radius, initial)
+                stats["passes"] += wave.propagate()
+                radius += 1
+        if not undecided(wave.cells).any():
+            return np.log2(wave.cells.astype(np.float64)).astype(np.int64)
+    raise RuntimeError(f"no consistent layout after {max_sweeps} sweeps")
+
+
+def violations(layout, h, v):
+    """Adjacent pairs the rules do not allow (0 for a solved layout)."""
+    return int((~h[layout[:, :-1], layout[:, 1:]]).sum() + (~v[layout[:-1], layout[1:]]).sum())
+
+
+# ── Output ──
+
+def zone_seed(zone, seed):
+    return [seed, zlib.crc32(zone.encode())]
+
+
+def write_zone(zone, width, height, out_dir=OUT_DIR, seed=tileset.SEED, threshold=THRESHOLD,
+               preview_scale=0, atlas=None):
+    """Solve one zone and write its map, metadata and optional preview.
+    Returns (path, solver stats)."""
+    if atlas is None:
+        atlas = np.asarray(tileset.build_atlas(seed))
+    names, weights, horizontal, vertical = rules_for_zone(zone, atlas)
+    h, v = adjacency_rules(horizontal, vertical, threshold)
+    stats = {}
+    layout = solve(height, width, h, v, weights, np.random.default_rng(zone_seed(zone, seed)),
+                   stats=stats)
+    stats["violations"] = violations(layout, h, v)
+    index = tile_indices()
+    tiles = np.array([index[name] for name in names], dtype=np.uint8)[layout]
+
+    os.makedirs(out_dir, exist_ok=True)
+    npy_path = os.path.join(out_dir, f"{zone}.npy")
+    np.save(npy_path, tiles)
+    if preview_scale:
+        colors = tile_preview_colors(atlas, preview_scale)
+        blocks = colors[tiles].transpose(0, 2, 1, 3, 4)
+        preview = PngStream(os.path.join(out_dir, f"{zone}.png"), width * preview_scale,
+                            height * preview_scale)
+        preview.write(blocks.reshape(height * preview_scale, width * preview_scale, 3))
+        preview.close()
+    meta = {"zone": zone, "width": width, "height": height, "seed": seed, "threshold": threshold,
+            "tileset": "res://assets/tilesets/terrain_tileset.png",
+            "atlas_columns": tileset.COLS,
+            "tiles": {str(index[name]): name for name in names},
+            "weights": dict(zip(names, np.round(weights, 4).tolist())),
+            # name -> tiles allowed to its right / below
+            "right": {a: [b for b, ok in zip(names, row) if ok] for a, row in zip(names, h)},
+            "below": {a: [b for b, ok in zip(names, row) if ok] for a, row in zip(names, v)}}
+    with open(os.path.join(out_dir, f"{zone}.json"), "w") as f:
+        json.dump(meta, f, indent=1)
+    return npy_path, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     epilog=__doc__.split("\n", 2)[2],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("zones", nargs="*", help=f"zones to build (default: all of {', '.join(ZONES)})")
+    parser.add_argument("--size", type=int, default=SIZE, help="map width and height in tiles")
+    parser.add_argument("--width", type=int, help="map width in tiles (overrides --size)")
+    parser.add_argument("--height", type=int, help="map height in tiles (overrides --size)")
+    parser.add_argument("--seed", type=int, default=tileset.SEED, help="any non-negative integer")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="largest edge profile difference two neighbours may have")
+    parser.add_argument("--preview", action="store_true", help="also write a PNG preview")
+    parser.add_argument("--preview-scale", type=int, default=4,
+                        help="preview pixels per tile: 1, 2, 4, 8, 16 or 32 (full tiles)")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    args = parser.parse_args(argv)
+
+    unknown = [zone for zone in args.zones if zone not in ZONES]
+    if unknown:
+        parser.error(f"unknown zone(s): {', '.join(unknown)}")
+    width, height = args.width or args.size, args.height or args.size
+    if width < 1 or height < 1:
+        parser.error("map size must be positive")
+    if args.seed < 0:
+        parser.error("--seed must not be negative")
+    scale = args.preview_scale if args.preview else 0
+    if scale and tileset.TILE_SIZE % scale:
+        parser.error(f"--preview-scale must divide {tileset.TILE_SIZE}")
+
+    atlas = np.asarray(tileset.build_atlas(args.seed))
+    for zone in args.zones or ZONES:
+        start = time.perf_counter()
+        path, stats = write_zone(zone, width, height, args.out_dir, args.seed, args.threshold, scale, atlas)
+        print(f"Created {os.path.relpath(path)} ({width}x{height}) in {time.perf_counter() - start:.2f}s: "
+              f"{stats['sweeps']} sweep(s), {stats['passes']} propagation passes, "
+              f"{stats['reopened']} cell(s) reopened, {stats['violations']} violation(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
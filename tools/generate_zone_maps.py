@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Lay out tile-index maps for the zones, streamed to disk in row bands.
+
+Each map cell holds a terrain_tileset.png tile index (row * 8 + col), chosen
+from fractal value noise per zone (ZONES). Noise is a pure function of the
+cell coordinates and seed, so every band is computed on its own and memory
+stays bounded by --band-tiles whatever the map size.
+
+Outputs per zone, in --out-dir:
+  {zone}.npy        uint8 (height, width) tile indices; np.load(..., mmap_mode="r")
+  {zone}.json       size, seed and the index -> tile name table
+  {zone}.png        optional preview (--preview), --preview-scale px per tile
+
+  python3 tools/generate_zone_maps.py water_coast --size 20000 --preview
+"""
+
+import argparse
+import json
+import numpy as np
+import os
+import sys
+import time
+import zlib
+
+import generate_tileset as tileset
+from asset_cache import ROOT
+from png_output import PngStream
+
+OUT_DIR = os.path.join(ROOT, "build", "maps")
+SIZE = 256
+BAND_TILES = 1 << 21  # cells per band; bounds peak memory
+NOISE_PERIOD = 48     # tiles per lattice cell of the lowest octave
+OCTAVES = 4
+
+# zone -> (elevation bands [(upper bound, tile)], sprinkles {tile: (variant, chance)})
+ZONES = {
+    "overworld": (
+        [(0.30, "grass_dark"), (0.55, "grass_medium"), (0.82, "grass_light"), (1.0, "tall_grass")],
+        {"grass_light": ("grass_flowers", 0.05)},
+    ),
+    "forest_grove": (
+        [(0.40, "grass_dark"), (0.70, "tall_grass"), (0.90, "grass_medium"), (1.0, "dirt")],
+        {"grass_dark": ("mushroom", 0.02), "grass_medium": ("grass_flowers", 0.03)},
+    ),
+    "water_coast": (
+        [(0.42, "water"), (0.48, "sand"), (0.75, "grass_light"), (1.0, "grass_medium")],
+        {"water": ("water_anim", 0.15), "sand": ("dock", 0.005)},
+    ),
+    "fire_volcano": (
+        [(0.25, "lava"), (0.33, "magma_crack"), (0.60, "rock_dark"), (0.82, "ash"), (1.0, "rock_light")],
+        {"lava": ("lava_anim", 0.15), "ash": ("ember_ground", 0.10)},
+    ),
+    "earth_caves": (
+        [(0.30, "cave_dark"), (0.68, "cave_floor"), (0.85, "dirt"), (1.0, "stone_wall")],
+        {"cave_floor": ("crystal", 0.02), "dirt": ("stalactite", 0.03)},
+    ),
+    "sky_peaks": (
+        [(0.35, "rock_light"), (0.62, "stone_wall"), (0.82, "grass_light"), (1.0, "rock_dark")],
+        {"grass_light": ("grass_flowers", 0.03)},
+    ),
+    "lava_core": (
+        [(0.45, "lava"), (0.55, "magma_crack"), (0.80, "obsidian"), (1.0, "rock_dark")],
+        {"lava": ("lava_anim", 0.20)},
+    ),
+    "champion_arena": (
+        [(0.55, "stone_brick"), (0.85, "stone_wall"), (1.0, "obsidian")],
+        {},
+    ),
+}
+
+
+def tile_indices():
+    """Tile name -> atlas index (row * COLS + col)."""
+    return {tileset.tile_name(drawer): row * tileset.COLS + col
+            for row, drawers in enumerate(tileset.TILE_DRAWERS)
+            for col, drawer in enumerate(drawers)}
+
+
+# ── Noise ──
+
+def _hash(x, y, salt):
+    """Uniform [0, 1) per integer lattice point (splitmix64 finalizer)."""
+    h = (x.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+         ^ y.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)
+         ^ np.uint64(salt & 0xFFFFFFFFFFFFFFFF))
+    h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(31)
+    return (h >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def value_noise(ys, xs, period, salt):
+    """Smoothly interpolated lattice noise in [0, 1) over the grid of rows ys
+    and columns xs. The grid is axis-aligned, so the lattice is hashed once
+    and interpolated along x per lattice row, then along y per cell row."""
+    fx, fy = xs / period, ys / period
+    x0, y0 = np.floor(fx).astype(np.int64), np.floor(fy).astype(np.int64)
+    tx, ty = fx - x0, fy - y0
+    tx, ty = tx * tx * (3 - 2 * tx), ty * ty * (3 - 2 * ty)
+    lx, ly = np.arange(x0[0], x0[-1] + 2), np.arange(y0[0], y0[-1] + 2)
+    lattice = _hash(lx[None, :], ly[:, None], salt).astype(np.float32)
+    xi, yi = x0 - lx[0], y0 - ly[0]
+    rows = lattice[:, xi] * (1 - tx) + lattice[:, xi + 1] * tx
+    return rows[yi] * (1 - ty)[:, None] + rows[yi + 1] * ty[:, None]
+
+
+def fractal_noise(ys, xs, salt, period=NOISE_PERIOD, octaves=OCTAVES):
+    """Sum of octaves over the grid ys x xs, normalized to [0, 1)."""
+    total, weight, norm = 0.0, 1.0, 0.0
+    for octave in range(octaves):
+        total = total + weight * value_noise(ys, xs, period / (1 << octave), salt + octave)
+        norm += weight
+        weight *= 0.5
+    return total / norm
+
+
+def zone_salt(zone, seed):
+    """64-bit noise salt: the seed's low 32 bits over the zone name's CRC."""
+    return ((seed & 0xFFFFFFFF) << 32) ^ zlib.crc32(zone.encode())
+
+
+def layout_band(zone, y0, y1, width, seed=tileset.SEED):
+    """Tile indices for map rows y0..y1 as a (y1 - y0, width) uint8 array."""
+    bands, sprinkles = ZONES[zone]
+    index = tile_indices()
+    salt = zone_salt(zone, seed)
+    ys, xs = np.arange(y0, y1, dtype=np.float32), np.arange(width, dtype=np.float32)
+    elevation = fractal_noise(ys, xs, salt)
+    # Stretch the noise (which clusters around 0.5) to spread the bands evenly
+    elevation = (elevation - 0.5) * 2.2 + 0.5
+
+    bounds = np.array([upper for upper, _ in bands[:-1]], dtype=np.float32)
+    tiles = np.array([index[name] for _, name in bands], dtype=np.uint8)
+    out = tiles[np.searchsorted(bounds, elevation, side="right")]
+    for name, (variant, chance) in sprinkles.items():
+        cy, cx = np.nonzero(out == index[name])
+        roll = _hash(cx, cy + y0, salt ^ 0x5EED)
+        out[cy[roll < chance], cx[roll < chance]] = index[variant]
+    return out
+
+
+# ── Output ──
+
+def band_rows(width, band_tiles=BAND_TILES):
+    return max(1, band_tiles // max(width, 1))
+
+
+def tile_preview_colors(atlas, scale):
+    """(tiles, scale, scale, 3) block-averaged tile images for the preview."""
+    size = tileset.TILE_SIZE
+    if size % scale:
+        raise ValueError(f"preview scale must divide {size}")
+    rgb = atlas[..., :3].astype(np.float64)
+    tiles = rgb.reshape(tileset.ROWS, size, tileset.COLS, size, 3).transpose(0, 2, 1, 3, 4)
+    tiles = tiles.reshape(-1, scale, size // scale, scale, size // scale, 3).mean(axis=(2, 4))
+    return np.rint(tiles).astype(np.uint8)
+
+
+def write_zone(zone, width, height, out_dir=OUT_DIR, seed=tileset.SEED, preview_scale=0,
+               band_tiles=BAND_TILES, atlas=None):
+    """Stream one zone map (and optional preview) to out_dir band by band.
+    Returns the .npy path."""
+    os.makedirs(out_dir, exist_ok=True)
+    npy_path = os.path.join(out_dir, f"{zone}.npy")
+    rows = band_rows(width * max(preview_scale, 1) ** 2, band_tiles)
+    colors = None
+    if preview_scale:
+        if atlas is None:
+            atlas = np.asarray(tileset.build_atlas(seed))
+        colors = tile_preview_colors(atlas, preview_scale)
+
+    preview = (PngStream(os.path.join(out_dir, f"{zone}.png"),
+                         width * preview_scale, height * preview_scale)
+               if preview_scale else None)
+    with open(npy_path, "wb") as f:
+        np.lib.format.write_array_header_1_0(
+            f, {"descr": "|u1", "fortran_order": False, "shape": (height, width)})
+        for y0 in range(0, height, rows):
+            band = layout_band(zone, y0, min(y0 + rows, height), width, seed)
+            f.write(band.tobytes())
+            if preview is not None:
+                # (rows, width, s, s, 3) -> (rows * s, width * s, 3)
+                blocks = colors[band].transpose(0, 2, 1, 3, 4)
+                preview.write(blocks.reshape(len(band) * preview_scale, width * preview_scale, 3))
+    if preview is not None:
+        preview.close()
+
+    names = {index: name for name, index in tile_indices().items()}
+    meta = {"zone": zone, "width": width, "height": height, "seed": seed,
+            "tileset": "res://assets/tilesets/terrain_tileset.png",
+            "atlas_columns": tileset.COLS,
+            "tiles": {str(i): names[i] for i in sorted(names)}}
+    with open(os.path.join(out_dir, f"{zone}.json"), "w") as f:
+        json.dump(meta, f, indent=1)
+    return npy_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     epilog=__doc__.split("\n", 2)[2],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("zones", nargs="*", help=f"zones to build (default: all of {', '.join(ZONES)})")
+    parser.add_argument("--size", type=int, default=SIZE, help="map width and height in tiles")
+    parser.add_argument("--width", type=int, help="map width in tiles (overrides --size)")
+    parser.add_argument("--height", type=int, help="map height in tiles (overrides --size)")
+    parser.add_argument("--seed", type=int, default=tileset.SEED, help="0 to 2**32 - 1")
+    parser.add_argument("--preview", action="store_true", help="also write a PNG preview")
+    parser.add_argument("--preview-scale", type=int, default=1,
+                        help="preview pixels per tile: 1, 2, 4, 8, 16 or 32 (full tiles)")
+    parser.add_argument("--band-tiles", type=int, default=BAND_TILES,
+                        help="cells computed per band (bounds memory)")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    args = parser.parse_args(argv)
+
+    unknown = [zone for zone in args.zones if zone not in ZONES]
+    if unknown:
+        parser.error(f"unknown zone(s): {', '.join(unknown)}")
+    width, height = args.width or args.size, args.height or args.size
+    if width < 1 or height < 1:
+        parser.error("map size must be positive")
+    if not 0 <= args.seed < 1 << 32:
+        parser.error("--seed must lie within 0 to 2**32 - 1")
+    scale = args.preview_scale if args.preview else 0
+    if scale and tileset.TILE_SIZE % scale:
+        parser.error(f"--preview-scale must divide {tileset.TILE_SIZE}")
+
+    atlas = np.asarray(tileset.build_atlas(args.seed)) if scale else None
+    for zone in args.zones or ZONES:
+        start = time.perf_counter()
+        path = write_zone(zone, width, height, args.out_dir, args.seed, scale, args.band_tiles, atlas)
+        print(f"Created {os.path.relpath(path)} ({width}x{height})"
+              + (" + preview" if scale else "")
+              + f" in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Pack the creature and player sprite sheets into power-of-two atlas pages.
+
+Reads every PNG in assets/sprites, shelf-packs them into as few pages as fit
+within --max-page, and writes next to the pages:
+- one Godot AtlasTexture .tres per sheet (a drop-in Texture2D for the
+  sprite_texture / battle_texture / overworld_texture slots),
+- atlas.json with the page list and each sheet's region.
+
+Sheets are packed whole, so frame slicing in wild_creature.gd and
+battle_hud.gd works unchanged on the AtlasTexture. A sheet identical to the
+top-left corner of a larger one (e.g. flamepup.png is frame 0 of
+flamepup_overworld.png) shares that region instead of being packed twice.
+--relink points the creature .tres files at the AtlasTextures.
+"""
+
+from PIL import Image
+import argparse
+import glob
+import hashlib
+import json
+import numpy as np
+import os
+import re
+
+from asset_cache import ROOT, BuildCache, fingerprint
+from png_output import ENCODER_SOURCES, save_png
+
+SPRITES_DIR = os.path.join(ROOT, "assets", "sprites")
+CREATURES_DIR = os.path.join(ROOT, "resources", "creatures")
+MAX_PAGE = 512
+PADDING = 1
+
+
+def res_path(path):
+    """res:// path of a file in the project. Godot cannot load anything
+    outside it, so a path not under ROOT raises ValueError."""
+    rel = os.path.relpath(os.path.abspath(path), ROOT)
+    if rel == os.pardir or rel.startswith(os.pardir + os.sep) or os.path.isabs(rel):
+        raise ValueError(f"{path} is outside the project ({ROOT}), so it has no res:// path")
+    return "res://" + rel.replace(os.sep, "/")
+
+
+def load_sheets(sprites_dir):
+    """name -> RGBA array for every PNG directly in sprites_dir."""
+    sheets = {}
+    for path in sorted(glob.glob(os.path.join(sprites_dir, "*.png"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        sheets[name] = np.asarray(Image.open(path).convert("RGBA"))
+    return sheets
+
+
+def find_aliases(sheets):
+    """Map each sheet that equals the top-left corner of a larger kept sheet
+    to that sheet's name. Returns (kept names, aliases)."""
+    kept, aliases = [], {}
+    by_area = sorted(sheets, key=lambda n: (-sheets[n].shape[0] * sheets[n].shape[1], n))
+    for name in by_area:
+        h, w = sheets[name].shape[:2]
+        for other in kept:
+            oh, ow = sheets[other].shape[:2]
+            if oh >= h and ow >= w and np.array_equal(sheets[other][:h, :w], sheets[name]):
+                aliases[name] = other
+                break
+        else:
+            kept.append(name)
+    return kept, aliases
+
+
+def shelf_pack(sizes, page_w, page_h, padding):
+    """Place as many (w, h) items as fit, tallest first, each on the first
+    shelf with room (first-fit shelves). Returns ({index: (x, y)}, [left over])."""
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0], i))
+    placed, left = {}, []
+    shelves = []  # [y, height, next free x]
+    next_y = 0
+    for i in order:
+        w, h = sizes[i]
+        for shelf in shelves:
+            if h <= shelf[1] and shelf[2] + w <= page_w:
+                placed[i] = (shelf[2], shelf[0])
+                shelf[2] += w + padding
+                break
+        else:
+            if w <= page_w and next_y + h <= page_h:
+                placed[i] = (0, next_y)
+                shelves.append([next_y, h, w + padding])
+                next_y += h + padding
+            else:
+                left.append(i)
+    return placed, left
+
+
+def page_sizes(max_page):
+    """Power-of-two page sizes up to max_page, smallest area first."""
+    sides = [1 << k for k in range(4, max_page.bit_length()) if 1 << k <= max_page]
+    return sorted(((w, h) for w in sides for h in sides if h <= w <= 2 * h),
+                  key=lambda s: (s[0] * s[1], s[0]))
+
+
+def pack(sizes, max_page=MAX_PAGE, padding=PADDING):
+    """Pack item sizes into pages. Each page is the smallest power-of-two size
+    that takes all remaining items, or a full max_page page when none does.
+    Returns ([(page_w, page_h)], {index: (page, x, y)})."""
+    if any(w > max_page or h > max_page for w, h in sizes):
+        raise ValueError(f"a sheet is larger than the {max_page}px page limit")
+    pages, where = [], {}
+    remaining = list(range(len(sizes)))
+    while remaining:
+        sub = [sizes[i] for i in remaining]
+        for page_w, page_h in page_sizes(max_page):
+            placed, left = shelf_pack(sub, page_w, page_h, padding)
+            if not left:
+                break
+        for j, (x, y) in placed.items():
+            where[remaining[j]] = (len(pages), x, y)
+        pages.append((page_w, page_h))
+        remaining = [remaining[j] for j in left]
+    return pages, where
+
+
+def atlas_texture_tres(page_path, x, y, w, h):
+    return (
+        '[gd_resource type="AtlasTexture" load_steps=2 format=3]\n\n'
+        f'[ext_resource type="Texture2D" path="{res_path(page_path)}" id="1"]\n\n'
+        "[resource]\n"
+        'atlas = ExtResource("1")\n'
+        f"region = Rect2({x}, {y}, {w}, {h})\n"
+    )
+
+
+def write_atlas(sheets, out_dir, max_page=MAX_PAGE, padding=PADDING, indexed=False):
+    """Pack sheets into pages under out_dir and write the .tres/.json metadata.
+    Returns the atlas.json dict."""
+    kept, aliases = find_aliases(sheets)
+    sizes = [(sheets[n].shape[1], sheets[n].shape[0]) for n in kept]
+    pages, where = pack(sizes, max_page, padding)
+
+    os.makedirs(out_dir, exist_ok=True)
+    buffers = [np.zeros((h, w, 4), dtype=np.uint8) for w, h in pages]
+    regions = {}
+    for i, name in enumerate(kept):
+        page, x, y = where[i]
+        h, w = sheets[name].shape[:2]
+        buffers[page][y:y + h, x:x + w] = sheets[name]
+        regions[name] = {"page": page, "x": x, "y": y, "w": w, "h": h}
+    for name, parent in aliases.items():
+        h, w = sheets[name].shape[:2]
+        regions[name] = dict(regions[parent], w=w, h=h)
+
+    for stale in glob.glob(os.path.join(out_dir, "sprites_*.png")):
+        os.remove(stale)
+    page_files = []
+    for page, buf in enumerate(buffers):
+        filename = f"sprites_{page}.png"
+        save_png(buf, os.path.join(out_dir, filename), indexed)
+        page_files.append({"file": filename, "width": buf.shape[1], "height": buf.shape[0]})
+    for name, r in sorted(regions.items()):
+        page_path = os.path.join(out_dir, page_files[r["page"]]["file"])
+        with open(os.path.join(out_dir, f"{name}.tres"), "w") as f:
+            f.write(atlas_texture_tres(page_path, r["x"], r["y"], r["w"], r["h"]))
+
+    meta = {"pages": page_files, "regions": dict(sorted(regions.items()))}
+    with open(os.path.join(out_dir, "atlas.json"), "w") as f:
+        json.dump(meta, f, indent=1)
+    return meta
+
+
+def relink_creatures(meta, atlas_dir, sprites_dir=SPRITES_DIR, creatures_dir=CREATURES_DIR):
+    """Point creature .tres texture ext_resources at the AtlasTextures.
+    Returns the list of files changed."""
+    pattern = re.compile(r'path="' + re.escape(res_path(sprites_dir)) + r'/([A-Za-z0-9_]+)\.png"')
+    changed = []
+    for path in sorted(glob.glob(os.path.join(creatures_dir, "*.tres"))):
+        with open(path) as f:
+            text = f.read()
+        new = pattern.sub(
+            lambda m: (f'path="{res_path(os.path.join(atlas_dir, m.group(1) + ".tres"))}"'
+                       if m.group(1) in meta["regions"] else m.group(0)), text)
+        if new != text:
+            with open(path, "w") as f:
+                f.write(new)
+            changed.append(path)
+    return changed
+
+
+def atlas_outputs(meta, out_dir):
+    """Every file write_atlas wrote for meta: pages, AtlasTextures, atlas.json."""
+    return ([os.path.join(out_dir, page["file"]) for page in meta["pages"]]
+            + [os.path.join(out_dir, f"{name}.tres") for name in meta["regions"]]
+            + [os.path.join(out_dir, "atlas.json")])
+
+
+def atlas_fingerprint(sprites_dir, max_page, padding, out_dir, indexed=False):
+    inputs = []
+    for path in sorted(glob.glob(os.path.join(sprites_dir, "*.png"))):
+        with open(path, "rb") as f:
+            inputs.append((os.path.basename(path), hashlib.sha256(f.read()).hexdigest()))
+    return fingerprint(inputs, max_page, padding, res_path(out_dir),
+                       find_aliases, shelf_pack, page_sizes, pack, atlas_texture_tres, write_atlas,
+                       indexed, *(ENCODER_SOURCES if indexed else ()))
+
+
+def build(sprites_dir=SPRITES_DIR, out_dir=None, cache=None, max_page=MAX_PAGE, padding=PADDING,
+          indexed=False):
+    """Build the atlas pages for sprites_dir into out_dir (default sprites_dir/atlas)."""
+    out_dir = out_dir or os.path.join(sprites_dir, "atlas")
+    key = atlas_fingerprint(sprites_dir, max_page, padding, out_dir, indexed)
+    if cache is not None:
+        try:
+            with open(os.path.join(out_dir, "atlas.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {"pages": [], "regions": {}}
+        if cache.all_fresh(atlas_outputs(meta, out_dir), key):
+            return meta
+    meta = write_atlas(load_sheets(sprites_dir), out_dir, max_page, padding, indexed)
+    if cache is not None:
+        for path in atlas_outputs(meta, out_dir):
+            cache.record(path, key)
+    for page in meta["pages"]:
+        print(f"Created atlas/{page['file']} ({page['width']}x{page['height']})")
+    print(f"Packed {len(meta['regions'])} sheets into {len(meta['pages'])} page(s)")
+    return meta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-page", type=int, default=MAX_PAGE,
+                        help="largest page side in pixels (power of two)")
+    parser.add_argument("--padding", type=int, default=PADDING,
+                        help="transparent gap between sheets")
+    parser.add_argument("--relink", action="store_true",
+                        help="point resources/creatures/*.tres at the AtlasTextures")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="rebuild regardless of the build manifest")
+    parser.add_argument("--indexed-png", action="store_true",
+                        help="write size-optimized palette PNG pages")
+    args = parser.parse_args(argv)
+
+    cache = BuildCache(enabled=not args.no_cache)
+    out_dir = os.path.join(SPRITES_DIR, "atlas")
+    meta = build(out_dir=out_dir, cache=cache, max_page=args.max_page, padding=args.padding,
+                 indexed=args.indexed_png)
+    cache.save()
+    cache.report()
+    if args.relink:
+        for path in relink_creatures(meta, out_dir):
+            print(f"Relinked {os.path.relpath(path, ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Size-optimized PNG writer for the asset generators.
+
+Images with at most 256 distinct RGBA colors are written palette-indexed,
+with a tRNS chunk for alpha and the smallest bit depth (1/2/4/8) that holds
+the palette; others fall back to 8-bit RGBA. Every combination of scanline
+filter strategy, zlib level and zlib strategy in SEARCH is encoded and the
+smallest stream is kept. Candidates are tried in a fixed order and ties keep
+the first, so output is deterministic for a given zlib build.
+"""
+
+from PIL import Image
+import io
+import itertools
+import numpy as np
+import struct
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+FILTERS = ("none", "sub", "up", "average", "paeth", "adaptive")
+SEARCH = {
+    "filters": FILTERS,
+    "levels": (6, 9),
+    "strategies": (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE),
+}
+
+
+def _chunk(kind, data):
+    return (struct.pack(">I", len(data)) + kind + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+
+def palettize(rgba):
+    """(palette (n, 4), index array) if rgba has <= 256 colors, else None.
+    The palette is sorted by alpha then RGB so transparent entries come first
+    and the tRNS chunk can stop at the last translucent one."""
+    flat = rgba.reshape(-1, 4)
+    packed = np.ascontiguousarray(flat).view(">u4").ravel()
+    colors, inverse = np.unique(packed, return_inverse=True)
+    if len(colors) > 256:
+        return None
+    palette = colors.astype(">u4").view(np.uint8).reshape(-1, 4)
+    order = np.lexsort((palette[:, 2], palette[:, 1], palette[:, 0], palette[:, 3]))
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return palette[order], rank[inverse].reshape(rgba.shape[:2]).astype(np.uint8)
+
+
+def _bit_depth(n_colors):
+    for depth in (1, 2, 4):
+        if n_colors <= 1 << depth:
+            return depth
+    return 8
+
+
+def _pack_rows(indices, depth):
+    """Pack 8-bit palette indices into rows of `depth`-bit samples."""
+    if depth == 8:
+        return indices
+    per_byte = 8 // depth
+    h, w = indices.shape
+    padded = np.zeros((h, -(-w // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :w] = indices
+    groups = padded.reshape(h, -1, per_byte)
+    shifts = np.arange(per_byte - 1, -1, -1, dtype=np.uint8) * depth
+    return np.bitwise_or.reduce(groups << shifts, axis=2).astype(np.uint8)
+
+
+def _filter_all(raw, bpp):
+    """All five PNG filter types applied to every row at once (computed from
+    the unfiltered bytes, so no row depends on another's output)."""
+    raw = raw.astype(np.int16)
+    left = np.zeros_like(raw)
+    left[:, bpp:] = raw[:, :-bpp]
+    up = np.zeros_like(raw)
+    up[1:] = raw[:-1]
+    up_left = np.zeros_like(raw)
+    up_left[1:, bpp:] = raw[:-1, :-bpp]
+
+    p = left + up - up_left
+    pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - up_left)
+    paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+
+    return np.stack([raw, raw - left, raw - up, raw - (left + up) // 2, raw - paeth]).astype(np.uint8)
+
+
+def _scanlines(raw, bpp, strategy):
+    filtered = _filter_all(raw, bpp)
+    if strategy == "adaptive":
+        # Per row, the filter with the smallest sum of signed-byte magnitudes
+        cost = np.abs(filtered.view(np.int8).astype(np.int32)).sum(axis=2)
+        types = cost.argmin(axis=0)
+    else:
+        types = np.full(raw.shape[0], FILTERS.index(strategy))
+    rows = filtered[types, np.arange(raw.shape[0])]
+    return np.concatenate([types.astype(np.uint8)[:, None], rows], axis=1).tobytes()
+
+
+def encode_png(rgba, search=SEARCH):
+    """Smallest PNG encoding of an (h, w, 4) uint8 array."""
+    h, w = rgba.shape[:2]
+    indexed = palettize(rgba)
+    if indexed is not None:
+        palette, indices = indexed
+        depth = _bit_depth(len(palette))
+        raw, bpp, color_type = _pack_rows(indices, depth), 1, 3
+        header = [_chunk(b"PLTE", palette[:, :3].tobytes())]
+        translucent = np.nonzero(palette[:, 3] < 255)[0]
+        if len(translucent):
+            header.append(_chunk(b"tRNS", palette[:translucent[-1] + 1, 3].tobytes()))
+    else:
+        raw, bpp, color_type, depth = rgba.reshape(h, w * 4), 4, 6, 8
+        header = []
+
+    best = None
+    for strategy in search["filters"]:
+        data = _scanlines(raw, bpp, strategy)
+        for level, zstrategy in itertools.product(search["levels"], search["strategies"]):
+            comp = zlib.compressobj(level, zlib.DEFLATED, 15, 9, zstrategy)
+            idat = comp.compress(data) + comp.flush()
+            if best is None or len(idat) < len(best):
+                best = idat
+
+    ihdr = struct.pack(">IIBBBBB", w, h, depth, color_type, 0, 0, 0)
+    return b"".join([PNG_SIGNATURE, _chunk(b"IHDR", ihdr), *header,
+                     _chunk(b"IDAT", best), _chunk(b"IEND", b"")])
+
+
+class PngStream:
+    """Write an 8-bit RGB PNG one band of rows at a time, so memory stays
+    bounded by the band rather than the image. Rows use the Sub filter (no
+    dependency on the previous band) and each band becomes one IDAT chunk.
+
+        with PngStream(path, width, height) as png:
+            for band in bands:          # (rows, width, 3) uint8
+                png.write(band)
+    """
+
+    def __init__(self, path, width, height, level=6):
+        self.width, self.height = width, height
+        self.rows_written = 0
+        self._file = open(path, "wb")
+        self._zlib = zlib.compressobj(level)
+        ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+        self._file.write(PNG_SIGNATURE + _chunk(b"IHDR", ihdr))
+
+    def write(self, rows):
+        if rows.shape[1:] != (self.width, 3):
+            raise ValueError(f"expected (n, {self.width}, 3) rows, got {rows.shape}")
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError("more rows than the declared image height")
+        flat = rows.reshape(len(rows), -1)
+        filtered = flat.copy()
+        filtered[:, 3:] -= flat[:, :-3]  # uint8 wraparound is the Sub filter
+        data = np.concatenate([np.ones((len(rows), 1), dtype=np.uint8), filtered], axis=1)
+        self._write_idat(self._zlib.compress(data.tobytes()))
+        self.rows_written += len(rows)
+
+    def _write_idat(self, data):
+        if data:
+            self._file.write(_chunk(b"IDAT", data))
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.rows_written != self.height:
+            self._file.close()
+            raise ValueError(f"wrote {self.rows_written} of {self.height} rows")
+        self._write_idat(self._zlib.flush())
+        self._file.write(_chunk(b"IEND", b""))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+
+# Code that determines indexed output bytes, for build fingerprints
+ENCODER_SOURCES = (palettize, _bit_depth, _pack_rows, _filter_all, _scanlines, encode_png, SEARCH)
+
+
+def png_bytes(img, indexed=False):
+    """PNG file contents for a PIL image or RGBA array. indexed=False keeps
+    Pillow's default encoder (the committed assets); indexed=True uses
+    encode_png."""
+    if not indexed:
+        if not isinstance(img, Image.Image):
+            img = Image.fromarray(img, "RGBA")
+        buf = io.BytesIO()
+        img.save(buf, "PNG")
+        return buf.getvalue()
+    rgba = np.asarray(img.convert("RGBA") if isinstance(img, Image.Image) else img)
+    return encode_png(np.ascontiguousarray(rgba, dtype=np.uint8))
+
+
+def save_png(img, path, indexed=False):
+    """Save a PIL image or RGBA array (see png_bytes)."""
+    with open(path, "wb") as f:
+        f.write(png_bytes(img, indexed))
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""Offline battle simulator: species-vs-species win rates per level band.
+
+Reads resources/creatures/*.tres and resources/skills/*.tres through
+tres_loader and replays the rules of scripts/battle/battle_manager.gd for
+1v1 battles, with thousands of battles advancing in lockstep as NumPy
+arrays. Reproduced from the game:
+_calc_damage (attack/defense at level, TYPE_CHART, the 0.85-1.15 variance
+roll, _get_weather_multiplier), accuracy and status-chance rolls, drain,
+heal, Protect, stat buffs and penalties, sleep and paralysis skips, and the
+burn/poison/shield ticks of _process_status_dot at the points the turn flow
+calls it (the player takes its DoT twice in a round it attacks in).
+
+Side 0 is the player, who always acts first as in the game, and both sides
+pick uniformly from their active skills like a wild creature. Both sides
+share a level drawn uniformly from the band. win_rate[band][a][b] is how
+often a beats b as the player; battles still running after --max-rounds
+count as draws. Held items, trainer AI and party switching are not modelled.
+
+  python3 tools/simulate_battles.py --trials 2000 --bands 1-10,11-20,21-30
+  python3 tools/simulate_battles.py --weather rain --out /tmp/rain.json
+"""
+
+import argparse
+import json
+import numpy as np
+import os
+import sys
+import time
+
+from asset_cache import ROOT
+from tres_loader import load_database
+
+OUT_PATH = os.path.join(ROOT, "build", "balance", "win_rates.json")
+BANDS = [(1, 10), (11, 20), (21, 30), (31, 40), (41, 50)]
+TRIALS = 1000
+MAX_ROUNDS = 100
+CHUNK = 1 << 18  # battles simulated together; bounds memory
+
+# battle_manager.gd TYPE_CHART[attacker][defender]; 0=Fire 1=Water 2=Grass 3=Wind 4=Earth 5=Neutral
+TYPE_CHART = np.array([
+    [1.0, 0.67, 1.5, 1.0, 1.0, 1.0],
+    [1.5, 1.0, 0.67, 1.0, 1.0, 1.0],
+    [0.67, 1.5, 1.0, 1.0, 1.0, 1.0],
+    [1.0, 1.0, 1.0, 1.0, 1.5, 1.0],
+    [1.0, 1.0, 1.0, 0.67, 1.0, 1.0],
+    [1.0, 1.0, 1.0, 1.0, 1.0, 1.0],
+])
+# _get_weather_multiplier per skill element, by WeatherSystem.WeatherType name
+WEATHER = {
+    "clear": [1.0] * 6,
+    "rain": [0.8, 1.2, 1.0, 1.0, 1.0, 1.0],
+    "snow": [1.0] * 6,
+    "sandstorm": [1.0, 1.0, 1.0, 1.0, 1.1, 1.0],
+    "leaves": [1.0] * 6,
+}
+
+# StatusEffect.Type and SkillData.Category
+NONE, BURN, POISON, SLEEP, PARALYZE, SHIELD = range(6)
+ATTACK, STATUS, HEAL = range(3)
+BUFFS = {"": 0, "atk": 1, "def": 2, "spd": 3}
+WIN, LOSE = 1, 2
+
+
+# ── Resources ──
+
+class Tables:
+    """Skill and species properties as arrays indexed by skill / species id."""
+
+    def __init__(self, db=None, max_level=50):
+        db = db or load_database()
+        skills = db.skills
+        skill_id = {skill.path: i for i, skill in enumerate(skills)}
+        self.skill_names = [s.skill_name for s in skills]
+        for key in ("element", "category", "inflicts_status", "status_duration",
+                    "self_inflicts", "self_status_duration", "buff_duration"):
+            setattr(self, key, np.array([s.props[key] for s in skills], dtype=np.int64))
+        for key in ("power", "accuracy", "status_chance", "drain_percent", "heal_percent",
+                    "self_stat_penalty"):
+            setattr(self, key, np.array([s.props[key] for s in skills], dtype=np.float64))
+        self.is_protect = np.array([s.is_protect for s in skills])
+        self.ends_wild_battle = np.array([s.ends_wild_battle for s in skills])
+        self.buff = np.array([BUFFS[s.buff_stat] for s in skills])
+
+        species = sorted(db.creatures, key=lambda s: (s.dex_number, s.species_name))
+        self.species = [s.species_name for s in species]
+        self.species_paths = [s.path for s in species]
+        self.species_element = np.array([s.element for s in species])
+        self.base = np.array([[s.base_hp, s.base_attack, s.base_defense] for s in species])
+        # Active skills per (species, level), as CreatureInstance._init_skills_for_level
+        self.moves = np.zeros((len(species), max_level + 1, 4), dtype=np.int64)
+        self.move_count = np.zeros((len(species), max_level + 1), dtype=np.int64)
+        for i, s in enumerate(species):
+            learn_set = sorted(((entry["level"], skill_id[entry["skill_path"]]) for entry in s.learn_set),
+                               key=lambda entry: entry[0])
+            fallback = [skill_id[ref.path] for ref in s.skills][:4]
+            for level in range(1, max_level + 1):
+                learned = [skill for req, skill in learn_set if req <= level][-4:] or fallback
+                self.moves[i, level, :len(learned)] = learned
+                self.move_count[i, level] = len(learned)
+
+
+def stat_at_level(base, level):
+    """CreatureData.stat_at_level."""
+    return base + (base * (level - 1) * 0.12).astype(np.int64)
+
+
+# ── Battle state ──
+
+class Battles:
+    """Struct of arrays for a batch of battles. Per-side arrays are (2, n),
+    side first (0 = player), so each side's row is contiguous."""
+
+    def __init__(self, tables, species, levels):
+        species, levels = species.T, levels.T
+        stats = stat_at_level(tables.base[species], levels[..., None])  # (2, n, 3)
+        self.max_hp, self.atk_base, self.def_base = stats[..., 0], stats[..., 1], stats[..., 2]
+        self.hp = self.max_hp.copy()
+        self.element = tables.species_element[species]
+        self.moves = tables.moves[species, levels]
+        self.move_count = tables.move_count[species, levels]
+        self.atk_mod = np.zeros(species.shape)
+        self.def_mod = np.zeros(species.shape)
+        self.status = np.zeros(species.shape, dtype=np.int64)
+        self.turns = np.zeros(species.shape, dtype=np.int64)
+        self.protecting = np.zeros(species.shape, dtype=bool)
+        self.result = np.zeros(species.shape[1], dtype=np.int8)
+
+    def keep(self, mask):
+        for key, value in vars(self).items():
+            setattr(self, key, value[:, mask] if value.ndim > 1 else value[mask])
+
+    def attack(self, side):
+        return np.maximum(1, np.trunc(self.atk_base[side] * (1.0 + self.atk_mod[side])))
+
+    def defense(self, side):
+        modified = self.def_base[side] * (1.0 + self.def_mod[side])
+        modified = np.where(self.status[side] == SHIELD, modified * 1.5, modified)
+        return np.maximum(1, np.trunc(modified))
+
+    def heal(self, mask, side, amount):
+        self.hp[side] = np.where(mask, np.minimum(self.max_hp[side], self.hp[side] + amount),
+                                    self.hp[side])
+
+    def set_status(self, mask, side, status, turns):
+        self.status[side] = np.where(mask, status, self.status[side])
+        self.turns[side] = np.where(mask, turns, self.turns[side])
+
+    def tick(self, mask, side):
+        """StatusEffect.tick on the masked rows. Returns the rows that expired."""
+        self.turns[side] -= mask
+        expired = mask & (self.turns[side] <= 0)
+        self.set_status(expired, side, NONE, 0)
+        return expired
+
+
+def pick_skills(b, side, rng):
+    """Uniform choice among each row's active skills (wild creature AI)."""
+    slot = (rng.random(len(b.result)) * b.move_count[side]).astype(np.int64)
+    return b.moves[side, np.arange(len(slot)), slot]
+
+
+def can_act(b, mask, side, rng):
+    """Paralysis (25% skip) and sleep (tick, skip until it wears off)."""
+    paralyzed = mask & (b.status[side] == PARALYZE) & (rng.random(len(mask)) < 0.25)
+    mask = mask & ~paralyzed
+    asleep = mask & (b.status[side] == SLEEP)
+    woke = b.tick(asleep, side)
+    return mask & ~(asleep & ~woke)
+
+
+def process_status_dot(b, mask, side):
+    """_process_status_dot: burn 6% and poison 8% of max HP, then tick;
+    shield only ticks."""
+    status = b.status[side]
+    rate = np.select([status == BURN, status == POISON], [0.06, 0.08], 0.0)
+    hurt = mask & (rate > 0)
+    damage = np.maximum(1, np.trunc(b.max_hp[side] * rate).astype(np.int64))
+    b.hp[side] = np.where(hurt, np.maximum(0, b.hp[side] - damage), b.hp[side])
+    b.tick(mask & ((rate > 0) | (status == SHIELD)), side)
+
+
+def inflict(b, t, mask, target, skill, rng):
+    """Status infliction roll shared by attack and status skills."""
+    roll = rng.random(len(mask))
+    hit = (mask & (t.inflicts_status[skill] != NONE) & (t.status_chance[skill] > 0.0)
+           & (roll <= t.status_chance[skill]) & (b.status[target] == NONE))
+    b.set_status(hit, target, t.inflicts_status[skill], t.status_duration[skill])
+
+
+def execute_attack(b, t, mask, user, target, skill, multipliers, rng):
+    n = len(mask)
+    blocked = mask & b.protecting[target]
+    b.protecting[target] &= ~blocked
+    mask = mask & ~blocked
+
+    # _calc_damage, in the game's order of float operations
+    element = t.element[skill]
+    base = t.power[skill] * (b.attack(user) / b.defense(target))
+    effectiveness = TYPE_CHART[element, b.element[target]]
+    variance = rng.uniform(0.85, 1.15, n)
+    damage = np.maximum(1, np.trunc(base * effectiveness * variance * multipliers[element] * 0.5)).astype(np.int64)
+
+    hit = mask & (rng.random(n) <= t.accuracy[skill])
+    b.hp[target] = np.where(hit, np.maximum(0, b.hp[target] - damage), b.hp[target])
+    drain = hit & (t.drain_percent[skill] > 0.0)
+    b.heal(drain, user, np.trunc(damage * t.drain_percent[skill]).astype(np.int64))
+    inflict(b, t, hit, target, skill, rng)
+    b.def_mod[user] += np.where(hit, t.self_stat_penalty[skill], 0.0)
+    b.set_status(hit & (t.self_inflicts[skill] != NONE), user,
+                 t.self_inflicts[skill], t.self_status_duration[skill])
+
+
+def execute_heal(b, t, mask, user, skill):
+    b.heal(mask, user, np.trunc(b.max_hp[user] * t.heal_percent[skill]).astype(np.int64))
+    b.set_status(mask & (t.self_inflicts[skill] != NONE), user,
+                 t.self_inflicts[skill], t.self_status_duration[skill])
+
+
+def execute_status_skill(b, t, mask, user, target, skill, rng):
+    mask = mask & ~(rng.random(len(mask)) > t.accuracy[skill])
+    buffed = mask & (t.buff_duration[skill] > 0)
+    b.atk_mod[user] += np.where(buffed & (t.buff[skill] == BUFFS["atk"]), 0.25, 0.0)
+    b.def_mod[user] += np.where(buffed & (t.buff[skill] == BUFFS["def"]), 0.25, 0.0)
+    inflict(b, t, mask, target, skill, rng)
+
+
+def play_round(b, t, multipliers, rng):
+    """One player action and one enemy action, following player_fight,
+    _check_battle, _enemy_turn and _process_end_of_turn."""
+    live = b.result == 0
+
+    # Player turn
+    acting = can_act(b, live, 0, rng)
+    skill = pick_skills(b, 0, rng)
+    protect = acting & t.is_protect[skill]
+    b.protecting[0] |= protect
+    # Roar fails (trainer rules), so it only passes the turn
+    acting &= ~protect & ~t.ends_wild_battle[skill]
+    category = t.category[skill]
+    execute_heal(b, t, acting & (category == HEAL), 0, skill)
+    execute_status_skill(b, t, acting & (category == STATUS), 0, 1, skill, rng)
+    attacked = acting & (category == ATTACK)
+    execute_attack(b, t, attacked, 0, 1, skill, multipliers, rng)
+    # _check_battle(true) after an attack: win, or player DoT before the enemy turn
+    b.result[attacked & (b.hp[1] <= 0)] = WIN
+    dot = attacked & (b.result == 0)
+    process_status_dot(b, dot, 0)
+    b.result[dot & (b.hp[0] <= 0)] = LOSE
+    b.protecting[0] &= ~(dot & (b.result == 0))
+    enemy_turn(b, t, b.result == 0, multipliers, rng)
+
+
+def enemy_turn(b, t, live, multipliers, rng):
+    """_enemy_turn for the live rows: its DoT, then its action; the enemy
+    never protects. Updates live in place."""
+    process_status_dot(b, live, 1)
+    b.result[live & (b.hp[1] <= 0)] = WIN
+    live &= b.result == 0
+    b.protecting[1] &= ~live
+    acting = can_act(b, live, 1, rng)
+    skill = pick_skills(b, 1, rng)
+    category = t.category[skill]
+    execute_heal(b, t, acting & (category == HEAL), 1, skill)
+    execute_status_skill(b, t, acting & (category == STATUS), 1, 0, skill, rng)
+    execute_attack(b, t, acting & (category == ATTACK), 1, 0, skill, multipliers, rng)
+
+    # _check_battle(false), then _process_end_of_turn
+    b.result[live & (b.hp[1] <= 0)] = WIN
+    b.result[live & (b.result == 0) & (b.hp[0] <= 0)] = LOSE
+    live &= b.result == 0
+    process_status_dot(b, live, 0)
+    b.result[live & (b.hp[0] <= 0)] = LOSE
+    b.protecting[0] &= ~(live & (b.result == 0))
+
+
+def simulate(t, species, levels, rng, weather="clear", max_rounds=MAX_ROUNDS):
+    """Play the (n, 2) species / level matchups to the end. Returns (n,)
+    results: WIN (player), LOSE, or 0 for a draw at max_rounds."""
+    b = Battles(t, species, levels)
+    ids = np.arange(len(species))
+    results = np.zeros(len(species), dtype=np.int8)
+    multipliers = np.array(WEATHER[weather])
+    for _ in range(max_rounds):
+        play_round(b, t, multipliers, rng)
+        done = b.result != 0
+        # Finished rows sit out under the live masks; drop them in bulk
+        if done.sum() * 4 >= len(done):
+            results[ids[done]] = b.result[done]
+            ids = ids[~done]
+            b.keep(~done)
+            if not len(ids):
+                break
+    results[ids] = b.result
+    return results
+
+
+def win_rates(t, bands=BANDS, trials=TRIALS, seed=0, weather="clear", max_rounds=MAX_ROUNDS,
+              chunk=CHUNK):
+    """(bands, species, species) win and draw rates of the row species as the
+    player against the column species."""
+    rng = np.random.default_rng(seed)
+    n_species = len(t.species)
+    pairs = np.stack(np.meshgrid(np.arange(n_species), np.arange(n_species), indexing="ij"), -1).reshape(-1, 2)
+    wins = np.zeros((len(bands), n_species * n_species))
+    draws = np.zeros_like(wins)
+    for band, (low, high) in enumerate(bands):
+        matchups = np.repeat(np.arange(len(pairs)), trials)
+        for start in range(0, len(matchups), chunk):
+            rows = matchups[start:start + chunk]
+            levels = rng.integers(low, high + 1, len(rows))
+            results = simulate(t, pairs[rows], np.repeat(levels[:, None], 2, axis=1), rng,
+                               weather, max_rounds)
+            wins[band] += np.bincount(rows, results == WIN, len(pairs))
+            draws[band] += np.bincount(rows, results == 0, len(pairs))
+    shape = (len(bands), n_species, n_species)
+    return (wins / trials).reshape(shape), (draws / trials).reshape(shape)
+
+
+def parse_bands(text):
+    bands = []
+    for part in text.split(","):
+        low, _, high = part.partition("-")
+        bands.append((int(low), int(high or low)))
+    return bands
+
+
+def print_matrix(species, matrix, band):
+    labels = [name[:5] for name in species]
+    print(f"\nLevels {band[0]}-{band[1]}: win rate of row (player) vs column")
+    print(f"{'':12}" + "".join(f"{label:>6}" for label in labels) + f"{'mean':>7}")
+    for name, row in zip(species, matrix):
+        print(f"{name:12}" + "".join(f"{rate:6.2f}" for rate in row) + f"{row.mean():7.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     epilog=__doc__.split("\n", 2)[2],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=TRIALS, help="battles per species pair and band")
+    parser.add_argument("--bands", type=parse_bands, default=BANDS,
+                        help="comma-separated level bands, e.g. 1-10,11-20 (default: 1-50 in tens)")
+    parser.add_argument("--weather", choices=list(WEATHER), default="clear")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS,
+                        help="rounds before a battle counts as a draw")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="battles per batch (bounds memory)")
+    parser.add_argument("--out", default=OUT_PATH, help="win-rate JSON path")
+    parser.add_argument("--quiet", action="store_true", help="do not print the matrices")
+    args = parser.parse_args(argv)
+    if args.trials < 1:
+        parser.error("--trials must be at least 1")
+    if any(not 1 <= low <= high <= 50 for low, high in args.bands):
+        parser.error("level bands must lie within 1-50")
+
+    start = time.perf_counter()
+    t = Tables()
+    wins, draws = win_rates(t, args.bands, args.trials, args.seed, args.weather, args.max_rounds,
+                            args.chunk)
+    elapsed = time.perf_counter() - start
+    battles = len(args.bands) * len(t.species) ** 2 * args.trials
+    if not args.quiet:
+        for band, matrix in zip(args.bands, wins):
+            print_matrix(t.species, matrix, band)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump({"species": t.species, "bands": args.bands, "trials": args.trials,
+                   "weather": args.weather, "seed": args.seed, "max_rounds": args.max_rounds,
+                   "win_rate": np.round(wins, 4).tolist(), "draw_rate": np.round(draws, 4).tolist()},
+                  f, indent=1)
+        f.write("\n")
+    print(f"\nSimulated {battles} battles in {elapsed:.2f}s "
+          f"({battles / elapsed / 1e6:.2f}M/s) -> {os.path.relpath(args.out)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
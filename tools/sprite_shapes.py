@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Declarative creature shape lists and a batch rasterizer for them.
+
+A creature is an ordered list of shapes, painted back to front:
+
+    {"part": "tail_flame", "rect": [x, y, w, h], "color": "tail",
+     "offsets": [[0, 0], [0, -2]]}
+
+rect is the frame-0 rectangle inside the 32x32 cell, color is a key of the
+creature's CREATURE_PALETTES entry (or a literal [r, g, b]), and offsets
+holds the (dx, dy) applied to the rect in each animation frame.
+
+compile_frames() rasterizes every frame of every creature in one vectorized
+pass: each pixel takes the color of the last shape covering it. Existing
+creatures are migrated by recording the rects their drawers paint:
+
+    python3 tools/sprite_shapes.py --migrate      # writes creature_shapes.json
+    python3 tools/sprite_shapes.py --check        # compiled == drawers
+"""
+
+import argparse
+import inspect
+import json
+import numpy as np
+import os
+import re
+import sys
+
+import generate_sprites as sprites
+
+SHAPES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "creature_shapes.json")
+FRAME_SIZE = 32
+FRAME_COUNT = 2
+
+
+# ── Recording ───────────────────────────────────────────────────────────────
+
+class RecordingCanvas(sprites.Canvas):
+    """Canvas that also logs each rect with the drawer source line it came from."""
+
+    def __init__(self, width, height, drawer):
+        super().__init__(width, height)
+        self.calls = []
+        self._code = drawer.__code__
+
+    def rect(self, x, y, w, h, color):
+        frame = inspect.currentframe()
+        while frame is not None and frame.f_code is not self._code:
+            frame = frame.f_back
+        self.calls.append((frame.f_lineno if frame else 0, x, y, w, h, tuple(color)))
+        super().rect(x, y, w, h, color)
+
+
+def _part_names(drawer):
+    """Source line number -> slug of the nearest comment above it."""
+    lines, start = inspect.getsourcelines(drawer)
+    names, current = {}, "shape"
+    for offset, line in enumerate(lines):
+        text = line.strip()
+        if text.startswith("#"):
+            current = re.sub(r"[^a-z0-9]+", "_", text.lstrip("#").strip().lower()).strip("_") or current
+        names[start + offset] = current
+    return names
+
+
+def _color_key(color, palette):
+    for key, value in palette.items():
+        if tuple(value) == color:
+            return key
+    return list(color)
+
+
+def record_shapes(name, frames=FRAME_COUNT):
+    """Shape list for one creature, recorded from its CREATURE_DRAWERS entry.
+    Each frame must paint the same sequence of rect sizes and colors."""
+    drawer = sprites.CREATURE_DRAWERS[name]
+    palette = sprites.CREATURE_PALETTES[name]
+    recorded = []
+    for frame in range(frames):
+        canvas = RecordingCanvas(FRAME_SIZE, FRAME_SIZE, drawer)
+        drawer(canvas, 0, 0, frame)
+        recorded.append(canvas.calls)
+
+    base = recorded[0]
+    for frame, calls in enumerate(recorded[1:], 1):
+        if [(c[0], c[3], c[4], c[5]) for c in calls] != [(c[0], c[3], c[4], c[5]) for c in base]:
+            raise ValueError(f"{name}: frame {frame} paints a different shape sequence than frame 0")
+
+    parts = _part_names(drawer)
+    shapes = []
+    for i, (line, x, y, w, h, color) in enumerate(base):
+        shapes.append({
+            "part": parts.get(line, "shape"),
+            "rect": [x, y, w, h],
+            "color": _color_key(color, palette),
+            "offsets": [[calls[i][1] - x, calls[i][2] - y] for calls in recorded],
+        })
+    return shapes
+
+
+def record_all(frames=FRAME_COUNT):
+    return {name: record_shapes(name, frames) for name in sprites.CREATURE_DRAWERS}
+
+
+# ── Storage ─────────────────────────────────────────────────────────────────
+
+def dumps_shapes(shape_lists):
+    """JSON with one shape per line, so shape lists diff cleanly."""
+    out = ["{"]
+    for n, (name, shapes) in enumerate(shape_lists.items()):
+        out.append(f"  {json.dumps(name)}: [")
+        for i, shape in enumerate(shapes):
+            out.append("    " + json.dumps(shape) + ("," if i < len(shapes) - 1 else ""))
+        out.append("  ]" + ("," if n < len(shape_lists) - 1 else ""))
+    out.append("}")
+    return "\n".join(out) + "\n"
+
+
+def load_shapes(path=SHAPES_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+# ── Batch rasterizer ────────────────────────────────────────────────────────
+
+def compile_frames(shape_lists, palettes=None, size=FRAME_SIZE):
+    """Rasterize all frames of all creatures at once.
+    Returns {name: (frames, size, size, 4) uint8 array}."""
+    palettes = palettes or sprites.CREATURE_PALETTES
+    names = list(shape_lists)
+    n_shapes = max(len(shapes) for shapes in shape_lists.values())
+    n_frames = max(len(s["offsets"]) for shapes in shape_lists.values() for s in shapes)
+
+    # (creature, frame, shape) rect bounds; unused slots stay empty (x0 == x1)
+    x0 = np.zeros((len(names), n_frames, n_shapes), dtype=np.int32)
+    y0, x1, y1 = x0.copy(), x0.copy(), x0.copy()
+    colors = np.zeros((len(names), n_shapes, 4), dtype=np.uint8)
+    for c, name in enumerate(names):
+        for k, shape in enumerate(shape_lists[name]):
+            x, y, w, h = shape["rect"]
+            dx, dy = np.array(shape["offsets"]).T
+            x0[c, :len(dx), k], y0[c, :len(dy), k] = x + dx, y + dy
+            x1[c, :len(dx), k], y1[c, :len(dy), k] = x + dx + w, y + dy + h
+            color = shape["color"]
+            rgb = palettes[name][color] if isinstance(color, str) else color
+            colors[c, k] = (*rgb, 255) if len(rgb) == 3 else rgb
+
+    px = np.arange(size)
+    cover = ((px[None, :] >= x0[..., None, None]) & (px[None, :] < x1[..., None, None])
+             & (px[:, None] >= y0[..., None, None]) & (px[:, None] < y1[..., None, None]))
+    painted = cover.any(axis=2)
+    top = n_shapes - 1 - cover[:, :, ::-1].argmax(axis=2)
+    frames = colors[np.arange(len(names))[:, None, None, None], top]
+    frames[~painted] = 0
+    return {name: frames[c] for c, name in enumerate(names)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--migrate", action="store_true",
+                        help="record the current drawers into the shape file")
+    parser.add_argument("--check", action="store_true",
+                        help="verify compiled shape lists match the drawers pixel for pixel")
+    parser.add_argument("--path", default=SHAPES_PATH, help="shape list JSON")
+    args = parser.parse_args(argv)
+
+    if args.migrate:
+        shape_lists = record_all()
+        with open(args.path, "w") as f:
+            f.write(dumps_shapes(shape_lists))
+        total = sum(len(s) for s in shape_lists.values())
+        print(f"Recorded {total} shapes for {len(shape_lists)} creatures -> {args.path}")
+    if args.check:
+        compiled = compile_frames(load_shapes(args.path))
+        mismatched = [name for name, frames in compiled.items()
+                      for f in range(len(frames))
+                      if not np.array_equal(frames[f], sprites.creature_frame(name, f).pixels)]
+        for name in mismatched:
+            print(f"MISMATCH {name}")
+        print(f"Checked {len(compiled)} creatures: {len(mismatched)} mismatched frame(s)")
+        return 1 if mismatched else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""Load the game's .tres resources (creatures, skills, items, trainers).
+
+Each .tres becomes a Record of its script class (CreatureData, SkillData,
+...) with every @export of the script, defaults filled in from the .gd
+source where the file leaves a property out. ExtResource("id") values are
+resolved to ExtRef(type, path), and db.get() follows an ExtRef or a
+res:// path string (e.g. a learn_set skill_path) to its Record:
+
+    db = load_database()
+    pup = db.get("res://resources/creatures/flamepup.tres")
+    pup.sprite_texture.path          # res://assets/sprites/flamepup.png
+    db.get(pup.evolves_into).species_name
+    [db.get(entry["skill_path"]).skill_name for entry in pup.learn_set]
+
+The parsed database is pickled to tools/.tres_cache.pickle with each
+source file's mtime, size and SHA-256. When every file still matches, a
+load is one stat per file plus the unpickle; a file whose mtime changed but
+whose content hash did not is not re-parsed.
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import pickle
+import re
+import sys
+import time
+
+from asset_cache import ROOT
+
+RESOURCES_DIR = os.path.join(ROOT, "resources")
+CACHE_PATH = os.path.join(ROOT, "tools", ".tres_cache.pickle")
+CACHE_VERSION = 1
+
+
+class ExtRef:
+    """A resolved ExtResource: the referenced file's type and res:// path."""
+
+    __slots__ = ("type", "path")
+
+    def __init__(self, type, path):
+        self.type = type
+        self.path = path
+
+    def __eq__(self, other):
+        return isinstance(other, ExtRef) and (self.type, self.path) == (other.type, other.path)
+
+    def __hash__(self):
+        return hash((self.type, self.path))
+
+    def __repr__(self):
+        return f"ExtRef({self.type!r}, {self.path!r})"
+
+    def __getstate__(self):
+        return self.type, self.path
+
+    def __setstate__(self, state):
+        self.type, self.path = state
+
+
+class Constructor:
+    """Any other Godot constructor value, e.g. Vector2i(32, 32)."""
+
+    __slots__ = ("name", "args")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __eq__(self, other):
+        return isinstance(other, Constructor) and (self.name, self.args) == (other.name, other.args)
+
+    def __repr__(self):
+        return f"{self.name}({', '.join(map(repr, self.args))})"
+
+    def __getstate__(self):
+        return self.name, self.args
+
+    def __setstate__(self, state):
+        self.name, self.args = state
+
+
+class Record:
+    """One resource: its script class, res:// path and properties.
+    Properties read as attributes: record.base_hp, record.skills, ..."""
+
+    def __init__(self, script_class, path, props):
+        self.script_class = script_class
+        self.path = path
+        self.props = props
+
+    def __getattr__(self, name):
+        # Via __dict__: unpickling probes attributes before props exists
+        props = self.__dict__.get("props")
+        if props is None or name not in props:
+            raise AttributeError(f"{self.__dict__.get('script_class') or 'Resource'} has no property {name!r}")
+        return props[name]
+
+    def __repr__(self):
+        return f"<{self.script_class} {self.path}>"
+
+
+# ── Variant text ──
+
+_TOKEN = re.compile(r'\s*(?:(?P<str>"(?:[^"\\]|\\.)*")|(?P<num>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)'
+                    r'|(?P<name>[A-Za-z_][\w.]*)|(?P<punct>[\[\]{}(),:]))')
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+
+
+def _tokens(text):
+    pos = 0
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m:
+            if text[pos:].strip():
+                raise ValueError(f"unexpected text: {text[pos:pos + 20]!r}")
+            return
+        pos = m.end()
+        yield m.lastgroup, m.group(m.lastgroup)
+
+
+class _Parser:
+    """Recursive-descent parser for one Godot variant value."""
+
+    def __init__(self, text, names=None):
+        self.tokens = list(_tokens(text))
+        self.pos = 0
+        self.names = names or {}
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        kind, text = self.peek()
+        if value is not None and text != value:
+            raise ValueError(f"expected {value!r}, got {text!r}")
+        self.pos += 1
+        return kind, text
+
+    def items(self, close):
+        out = []
+        while self.peek()[1] != close:
+            out.append(self.value())
+            if self.peek()[1] == ",":
+                self.take()
+        self.take(close)
+        return out
+
+    def value(self):
+        kind, text = self.take()
+        if kind == "str":
+            return re.sub(r"\\(.)", lambda m: _ESCAPES.get(m.group(1), m.group(1)), text[1:-1])
+        if kind == "num":
+            return float(text) if any(c in text for c in ".eE") else int(text)
+        if text == "[":
+            return self.items("]")
+        if text == "{":
+            out = {}
+            while self.peek()[1] != "}":
+                key = self.value()
+                self.take(":")
+                out[key] = self.value()
+                if self.peek()[1] == ",":
+                    self.take()
+            self.take("}")
+            return out
+        if kind != "name":
+            raise ValueError(f"unexpected {text!r}")
+        if text in ("true", "false"):
+            return text == "true"
+        if text == "null":
+            return None
+        if self.peek()[1] == "[":  # typed collection: Array[Resource]([...])
+            self.take()
+            self.items("]")
+        if self.peek()[1] == "(":
+            self.take()
+            args = self.items(")")
+            if text in ("ExtResource", "SubResource"):
+                return self.names.get((text, args[0]), Constructor(text, args))
+            if text in ("Array", "Dictionary") and len(args) == 1:
+                return args[0]
+            return Constructor(text, args)
+        if text in self.names:
+            return self.names[text]
+        raise ValueError(f"unknown name {text!r}")
+
+
+def parse_value(text, names=None):
+    parser = _Parser(text, names)
+    value = parser.value()
+    if parser.pos != len(parser.tokens):
+        raise ValueError(f"trailing text in {text!r}")
+    return value
+
+
+# ── Files ──
+
+_SECTION = re.compile(r"^\[(\w+)((?:\s+\w+=(?:\"[^\"]*\"|\S+?))*)\s*\]\s*$", re.M)
+_ATTR = re.compile(r'(\w+)=("[^"]*"|\S+)')
+
+
+def _attrs(text):
+    return {key: value.strip('"') for key, value in _ATTR.findall(text)}
+
+
+def parse_tres(text):
+    """(header attributes, {(kind, id): ExtRef}, [resource] properties,
+    {sub_resource id: properties}) of .tres source text."""
+    sections = list(_SECTION.finditer(text))
+    header, refs, props, subs = {}, {}, {}, {}
+    for i, m in enumerate(sections):
+        kind, attrs = m.group(1), _attrs(m.group(2))
+        if kind == "gd_resource":
+            header = attrs
+        elif kind == "ext_resource":
+            refs[("ExtResource", attrs["id"])] = ExtRef(attrs.get("type"), attrs.get("path"))
+        elif kind in ("sub_resource", "resource"):
+            end = sections[i + 1].start() if i + 1 < len(sections) else len(text)
+            body = _properties(text[m.end():end], refs)
+            if kind == "resource":
+                props = body
+            else:
+                subs[attrs["id"]] = body
+                refs[("SubResource", attrs["id"])] = Record(attrs.get("type"), None, body)
+    return header, refs, props, subs
+
+
+def _properties(body, names):
+    """key = value pairs; a value may span lines until its brackets close."""
+    props, key, chunk, depth = {}, None, [], 0
+    for line in body.splitlines():
+        if key is None:
+            m = re.match(r"\s*([\w/.:]+)\s*=\s*(.*)$", line)
+            if not m:
+                continue
+            key, line = m.group(1), m.group(2)
+        chunk.append(line)
+        bare = re.sub(r'"(?:[^"\\]|\\.)*"', "", line)
+        depth += sum(bare.count(c) for c in "[{(") - sum(bare.count(c) for c in "]})")
+        if depth <= 0:
+            props[key] = parse_value("\n".join(chunk), names)
+            key, chunk, depth = None, [], 0
+    return props
+
+
+_ENUM = re.compile(r"^enum\s+(\w+)\s*\{([^}]*)\}", re.M)
+_EXPORT = re.compile(r"^@export\w*(?:\([^)]*\))?\s+var\s+(\w+)\s*(?::\s*([^=#]+?))?\s*(?:=\s*([^#\n]+?))?\s*(?:#.*)?$",
+                     re.M)
+
+
+def parse_script(text):
+    """(class_name, {enum: {member: value}}, [(export, type, default source)])
+    of a .gd script."""
+    m = re.search(r"^class_name\s+(\w+)", text, re.M)
+    enums = {}
+    for name, body in _ENUM.findall(text):
+        members, value = {}, 0
+        for member in filter(None, (part.strip() for part in body.split(","))):
+            member, _, explicit = member.partition("=")
+            value = int(explicit) if explicit.strip() else value
+            members[member.strip()] = value
+            value += 1
+        enums[name] = members
+    exports = [(name, (kind or "").strip(), default) for name, kind, default in _EXPORT.findall(text)]
+    return m.group(1) if m else None, enums, exports
+
+
+def _default(source, kind, names):
+    if source:
+        return parse_value(source, names)
+    if kind.startswith("Array"):
+        return []
+    return {"int": 0, "float": 0.0, "bool": False, "String": "", "Dictionary": {}}.get(kind)
+
+
+# ── Database ──
+
+class Database:
+    """Every parsed .tres Record by res:// path, plus the script enums."""
+
+    def __init__(self, records, enums):
+        self.records = records
+        self.enums = enums
+
+    def get(self, ref):
+        """Record for an ExtRef, a res:// path or a Record (returned as is)."""
+        if isinstance(ref, Record) or ref is None:
+            return ref
+        return self.records[ref.path if isinstance(ref, ExtRef) else ref]
+
+    def by_class(self, script_class):
+        """Records of one script class, in path order."""
+        return [r for path, r in sorted(self.records.items()) if r.script_class == script_class]
+
+    @property
+    def creatures(self):
+        return self.by_class("CreatureData")
+
+    @property
+    def skills(self):
+        return self.by_class("SkillData")
+
+    @property
+    def items(self):
+        return self.by_class("ItemData")
+
+    @property
+    def trainers(self):
+        return self.by_class("TrainerData")
+
+    def ext_refs(self):
+        """(record path, property, ExtRef) for every reference in every record."""
+        def walk(value):
+            if isinstance(value, ExtRef):
+                yield value
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    yield from walk(item)
+            elif isinstance(value, dict):
+                for item in value.values():
+                    yield from walk(item)
+        for path, record in sorted(self.records.items()):
+            for key, value in record.props.items():
+                for ref in walk(value):
+                    yield path, key, ref
+
+
+def res_path(path):
+    return "res://" + os.path.relpath(os.path.abspath(path), ROOT).replace(os.sep, "/")
+
+
+def source_files(resources_dir=RESOURCES_DIR):
+    return sorted(glob.glob(os.path.join(resources_dir, "*.gd"))
+                  + glob.glob(os.path.join(resources_dir, "**", "*.tres"), recursive=True))
+
+
+def _parse_file(path, text):
+    if path.endswith(".gd"):
+        return parse_script(text)
+    return parse_tres(text)
+
+
+def build_database(parsed):
+    """Database from {path: parse_script() or parse_tres() result}."""
+    scripts = {res_path(p): value for p, value in parsed.items() if p.endswith(".gd")}
+    enums = {cls: script_enums for cls, script_enums, _ in scripts.values() if cls}
+    # Enum members resolve as Enum.MEMBER inside their script, Class.Enum.MEMBER anywhere
+    names = {f"{cls}.{enum}.{member}": value for cls, script_enums in enums.items()
+             for enum, members in script_enums.items() for member, value in members.items()}
+    records = {}
+    for path, value in parsed.items():
+        if path.endswith(".gd"):
+            continue
+        header, refs, props, _ = value
+        script_ref = props.get("script")
+        script = scripts.get(script_ref.path) if isinstance(script_ref, ExtRef) else None
+        fields = {}
+        if script:
+            cls, script_enums, exports = script
+            local = dict(names, **{f"{enum}.{member}": v for enum, members in script_enums.items()
+                                   for member, v in members.items()})
+            fields = {name: _default(source, kind, local) for name, kind, source in exports}
+        fields.update((key, value) for key, value in props.items() if key != "script")
+        records[res_path(path)] = Record(header.get("script_class") or header.get("type"), res_path(path), fields)
+    return Database(records, enums)
+
+
+def _file_key(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def load_database(resources_dir=RESOURCES_DIR, cache_path=CACHE_PATH, use_cache=True):
+    """Parse (or load from the cache) every .tres and resource script."""
+    files = source_files(resources_dir)
+    cache = {}
+    if use_cache:
+        try:
+            with open(cache_path, "rb") as f:
+                cache = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            cache = {}
+        if cache.get("version") != CACHE_VERSION:
+            cache = {}
+    entries = cache.get("files", {})
+    keys = {path: _file_key(path) for path in files}
+    if entries.keys() == keys.keys() and all(entries[p]["key"] == k for p, k in keys.items()):
+        return cache["database"]
+
+    fresh, changed = {}, False
+    for path in files:
+        entry = entries.get(path)
+        if entry is not None and entry["key"] == keys[path]:
+            fresh[path] = entry
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry is None or entry["sha256"] != digest:
+            entry = {"sha256": digest, "parsed": _parse_file(path, data.decode("utf-8"))}
+            changed = True
+        fresh[path] = dict(entry, key=keys[path])
+    if changed or cache.get("database") is None or entries.keys() != fresh.keys():
+        database = build_database({path: entry["parsed"] for path, entry in fresh.items()})
+    else:
+        database = cache["database"]
+    if use_cache:
+        tmp = cache_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": CACHE_VERSION, "files": fresh, "database": database}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path)
+    return database
+
+
+def missing_refs(db):
+    """(record path, property, ExtRef) whose target file does not exist."""
+    return [(path, key, ref) for path, key, ref in db.ext_refs()
+            if ref.path and ref.path.startswith("res://")
+            and not os.path.exists(os.path.join(ROOT, ref.path[len("res://"):]))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     epilog=__doc__.split("\n", 2)[2],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="res:// paths of records to print")
+    parser.add_argument("--no-cache", action="store_true", help="parse everything, ignore the cache")
+    parser.add_argument("--check-refs", action="store_true",
+                        help="report ext_resource references to files that do not exist")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    db = load_database(use_cache=not args.no_cache)
+    elapsed = (time.perf_counter() - start) * 1000
+    counts = ", ".join(f"{len(db.by_class(cls))} {cls}" for cls in
+                       sorted({r.script_class for r in db.records.values()}, key=str))
+    print(f"Loaded {len(db.records)} resources ({counts}) in {elapsed:.1f} ms")
+    for path in args.paths:
+        record = db.get(path)
+        print(record)
+        for key, value in record.props.items():
+            print(f"  {key} = {value!r}")
+    if args.check_refs:
+        missing = missing_refs(db)
+        for path, key, ref in missing:
+            print(f"MISSING {path}: {key} -> {ref.path}")
+        print(f"Checked {sum(1 for _ in db.ext_refs())} references: {len(missing)} missing")
+        return 1 if missing else 0
+    return 0
+
+
+if __name__ == "__main__":
+    # Run the importable module, so the cache pickles tres_loader.Record
+    # rather than __main__.Record and the other tools can load it back
+    import tres_loader
+    sys.exit(tres_loader.main())